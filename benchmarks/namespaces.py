@@ -0,0 +1,10 @@
+"""
+Namespaces used by the benchmarked classes that released sempyro versions do not provide.
+
+The imports configuration of the HealthRI model imports HRI from sempyro.hri,
+which is not in a sempyro release yet.
+"""
+
+from rdflib import Namespace
+
+HRI = Namespace("http://data.health-ri.nl/core/p2#")
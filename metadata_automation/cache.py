@@ -0,0 +1,32 @@
+"""
+Location of the on-disk caches used by metadata-automation.
+
+The cache directory defaults to ``$XDG_CACHE_HOME/metadata-automation``
+(``~/.cache/metadata-automation``) and can be moved with the
+``METADATA_AUTOMATION_CACHE_DIR`` environment variable.
+"""
+
+import os
+from pathlib import Path
+
+CACHE_DIR_ENV = "METADATA_AUTOMATION_CACHE_DIR"
+
+
+def get_cache_dir(*parts: str) -> Path:
+    """
+    Get (and create) a directory inside the metadata-automation cache.
+
+    Args:
+        *parts: Sub-directory components, e.g. 'sempyro'
+
+    Returns:
+        Path to the cache directory
+    """
+    if os.environ.get(CACHE_DIR_ENV):
+        base = Path(os.environ[CACHE_DIR_ENV])
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "metadata-automation"
+
+    cache_dir = base.joinpath(*parts)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
@@ -5,19 +5,142 @@ Excel files. Supports generation of SHACL shapes, SHACLPlay Excel files,
 and SeMPyRO Pydantic classes.
 """
 
+import os
+import shutil
 import subprocess
 import sys
+import tempfile
 import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime
 from pathlib import Path
+from typing import Callable, List, Optional, Tuple
 
 import click
 import pandas as pd
-
-from metadata_automation.linkml.creator import LinkMLCreator
-from metadata_automation.sempyro.cleanup import remove_unwanted_classes
-from metadata_automation.sempyro.utils import generate_from_linkml, load_yaml
+from rdflib import Graph
+
+from metadata_automation.dependencies import ClassGraph
+from metadata_automation.linkml.creator import SEMPYRO_INPUTS, SHARED_SCHEMAS, LinkMLCreator
+from metadata_automation.manifest import BuildProfile, load_manifest, profiles_from_workbooks
+from metadata_automation.model import Class, Property
+from metadata_automation.output import OutputWriter, intermediate_directory
+from metadata_automation.profiles import BaseProfile, content_fingerprint, file_digest
+from metadata_automation.reproducible import SOURCE_DATE_EPOCH, canonical_turtle, parse_build_date
+from metadata_automation.sempyro.benchmark import (
+    ModuleBenchmark,
+    benchmark_directory,
+    find_regressions,
+    load_baseline,
+    write_baseline,
+)
+from metadata_automation.sempyro.cleanup import find_class_ranges, remove_unwanted_classes
+from metadata_automation.sempyro.import_registry import ImportRegistry
+from metadata_automation.sempyro.import_resolver import ImportResolver, get_import_resolver
+from metadata_automation.sempyro.template_env import template_fingerprint
+from metadata_automation.sempyro.utils import (
+    generate_combined_from_linkml,
+    generate_from_linkml,
+    load_yaml,
+)
+from metadata_automation.shacl.shaclplay_reader import SHACL_ENGINES, nodeshape_uri, read_shaclplay
+from metadata_automation.shacl.sparql import (
+    STORE_BACKENDS,
+    compile_shapes,
+    load_store,
+    run_queries,
+    violations_report,
+    write_queries,
+)
+from metadata_automation.shacl.split import split_shapes
+from metadata_automation.shacl.validation import load_graph, validate_partitioned
+from metadata_automation.shacl.xls2rdf import (
+    DEFAULT_JVM_OPTIONS,
+    JVM_OPTIONS_ENV,
+    cds_archive,
+    cds_options,
+    java_version,
+    parse_jvm_options,
+    xls2rdf_command,
+)
 from metadata_automation.shaclplay.converter import SHACLPlayConverter
 from metadata_automation.shaclplay.utils import write_shaclplay_excel
+from metadata_automation.vocabularies import DEFAULT_VOCABULARIES_PATH, VocabularyStore
+from metadata_automation.workbook import (
+    DEFAULT_READER,
+    READER_BACKENDS,
+    READER_ENV,
+    SOURCE_FORMATS,
+    benchmark_reader_backends,
+    read_excel,
+)
+from metadata_automation.workbook import export_source as export_source_files
+from metadata_automation.workbook import import_source as import_source_files
+
+
+def format_with_ruff(paths: List[Path]) -> None:
+    """Format Python files with ruff, reporting problems as warnings."""
+    try:
+        # Find ruff in the same environment as this Python interpreter
+        python_bin_dir = Path(sys.executable).parent
+        ruff_path = python_bin_dir / "ruff"
+
+        # Fall back to system ruff if not found in environment
+        if not ruff_path.exists():
+            ruff_path = "ruff"
+
+        format_cmd = [str(ruff_path), "format"] + [str(path) for path in paths]
+
+        result = subprocess.run(format_cmd, capture_output=True, text=True, check=True)
+
+        click.echo(f"  ✓ Formatted files in {', '.join(str(path) for path in paths)}")
+
+        if result.stdout:
+            click.echo(f"  {result.stdout.strip()}")
+
+    except subprocess.CalledProcessError as e:
+        click.echo("  ⚠ Warning: ruff format failed", err=True)
+        if e.stderr:
+            click.echo(f"  {e.stderr.strip()}", err=True)
+    except FileNotFoundError:
+        click.echo(
+            "  ⚠ Warning: ruff not found. Install with: pip install ruff",
+            err=True,
+        )
+
+
+def _parse_build_date_option(ctx: click.Context, param: click.Parameter, value: str) -> Optional[datetime]:
+    """Parse the --build-date option, which enables reproducible mode when given."""
+    if value is None or value == "":
+        return None
+    try:
+        return parse_build_date(value)
+    except ValueError:
+        raise click.BadParameter(f"'{value}' is not a Unix timestamp or ISO 8601 date") from None
+
+
+def build_date_option(help_text: str):
+    """Decorator adding the --build-date option, read from SOURCE_DATE_EPOCH by default."""
+    return click.option(
+        "--build-date",
+        type=str,
+        default=None,
+        envvar=SOURCE_DATE_EPOCH,
+        callback=_parse_build_date_option,
+        help=help_text + " Unix timestamp or ISO 8601 date (default: the SOURCE_DATE_EPOCH environment variable).",
+    )
+
+
+reader_option = click.option(
+    "--reader",
+    type=click.Choice(READER_BACKENDS),
+    default=None,
+    envvar=READER_ENV,
+    help="Excel reader backend parsing the workbooks; calamine requires the calamine extra "
+    f"(default: {DEFAULT_READER}, or the {READER_ENV} environment variable).",
+)
 
 
 @click.group()
@@ -30,13 +153,232 @@ def main() -> None:
     pass
 
 
+def _load_vocabulary_store(vocabularies: tuple) -> VocabularyStore:
+    """Load the controlled vocabularies, by default those in inputs/vocabularies, exiting on failure."""
+    try:
+        vocabulary_store = VocabularyStore(vocabularies or (DEFAULT_VOCABULARIES_PATH,))
+    except Exception as e:
+        click.echo(f"Error: Failed to load controlled vocabularies: {e}", err=True)
+        exit(1)
+    click.echo(f"  ✓ Loaded {len(vocabulary_store.schemes)} controlled vocabularies")
+    return vocabulary_store
+
+
+def _read_required_sheet(excel_path: Path, sheet_name: str, reader: Optional[str]) -> pd.DataFrame:
+    """Read a sheet the workbook must have, exiting if it is missing or unreadable."""
+    try:
+        return read_excel(excel_path, sheet_name=sheet_name, reader=reader)
+    except ValueError:
+        click.echo(f"Error: '{sheet_name}' sheet not found in {excel_path}", err=True)
+        exit(1)
+    except Exception as e:
+        click.echo(f"Error: Failed to read {sheet_name} sheet: {e}", err=True)
+        exit(1)
+
+
+def _check_shaclplay_prerequisites(
+    template_p: Path, excel_path: Path, build_date: Optional[datetime], reader: Optional[str]
+) -> pd.DataFrame:
+    """Check the template and the input workbook of a SHACLPlay run, returning its 'classes' sheet."""
+    if not template_p.exists():
+        click.echo(
+            f"Error: SHACLPlay template not found at {template_p}",
+            err=True,
+        )
+        exit(1)
+    click.echo(f"  ✓ Template found: {template_p}")
+
+    if not excel_path.exists():
+        click.echo(f"Error: Input Excel file not found at {excel_path}", err=True)
+        exit(1)
+    click.echo(f"  ✓ Input Excel found: {excel_path}")
+    if build_date is not None:
+        click.echo(f"  ✓ Reproducible mode, build date {build_date.isoformat()}")
+
+    prefixes_df = _read_required_sheet(excel_path, "prefixes", reader)
+    click.echo(f"  ✓ Prefixes sheet found with {len(prefixes_df)} entries")
+    classes_df = _read_required_sheet(excel_path, "classes", reader)
+    click.echo(f"  ✓ Classes sheet found with {len(classes_df)} entries")
+
+    if len(classes_df) == 0:
+        click.echo("Error: 'classes' sheet is empty", err=True)
+        exit(1)
+    return classes_df
+
+
+def _init_shaclplay_converter(
+    template_p: Path, excel_path: Path, vocabularies: tuple, build_date: Optional[datetime], reader: Optional[str]
+) -> Tuple[VocabularyStore, SHACLPlayConverter]:
+    """Load the controlled vocabularies and the SHACLPlay converter, exiting if either fails."""
+    vocabulary_store = _load_vocabulary_store(vocabularies)
+    try:
+        click.echo(f"Loading template from {template_p}...")
+        converter = SHACLPlayConverter(template_p, excel_path, vocabulary_store, build_date, reader)
+    except Exception as e:
+        click.echo(f"Error: Failed to initialize converter: {e}", err=True)
+        exit(1)
+    return vocabulary_store, converter
+
+
+def _load_shaclplay_class(
+    idx: int, class_row: pd.Series, excel_path: Path, namespace: Optional[str], reader: Optional[str]
+) -> Class:
+    """Load a class of the 'classes' sheet and its class sheet, exiting if either is invalid."""
+    sheet_name = class_row["sheet_name"]
+    class_uri = class_row["class_URI"]
+    target_class = class_row["SHACL_target_ontology_name"]
+
+    for column, value in (
+        ("sheet_name", sheet_name),
+        ("class_URI", class_uri),
+        ("SHACL_target_ontology_name", target_class),
+    ):
+        if pd.isna(value):
+            click.echo(f"Error: Row {idx} missing '{column}' column", err=True)
+            exit(1)
+
+    # Override namespace if provided (only for class_uri)
+    if namespace:
+        class_name_only = class_uri.split(":")[-1]
+        class_uri = f"{namespace}:{class_name_only}"
+
+    click.echo(f"Processing {sheet_name} class...")
+    click.echo(f"  Ontology: {class_uri}")
+    click.echo(f"  Target: {target_class}")
+
+    try:
+        class_df = read_excel(excel_path, sheet_name=sheet_name, reader=reader)
+    except ValueError:
+        click.echo(f"Error: Sheet '{sheet_name}' not found in {excel_path}", err=True)
+        exit(1)
+    except Exception as e:
+        click.echo(f"Error: Failed to read sheet '{sheet_name}': {e}", err=True)
+        exit(1)
+
+    try:
+        model_class = Class.from_row(class_row, Property.from_sheet(class_df, sheet_name))
+    except ValueError as e:
+        click.echo(f"Error: Invalid class '{sheet_name}': {e}", err=True)
+        exit(1)
+
+    click.echo(f"  Loaded {len(model_class.properties)} properties")
+    click.echo()
+    return model_class
+
+
+def _load_shaclplay_classes(
+    classes_df: pd.DataFrame, excel_path: Path, namespace: Optional[str], reader: Optional[str]
+) -> List[Class]:
+    """Load the classes of the 'classes' sheet, exiting on the first invalid class."""
+    model_classes = []
+    for idx, class_row in classes_df.iterrows():
+        try:
+            model_classes.append(_load_shaclplay_class(idx, class_row, excel_path, namespace, reader))
+        except SystemExit:
+            raise
+        except Exception as e:
+            click.echo(
+                f"  ✗ Unexpected error processing class at row {idx}: {e}",
+                err=True,
+            )
+            traceback.print_exc()
+            exit(1)
+    return model_classes
+
+
+def _load_shaclplay_base_profile(
+    base_profile: str,
+    template_p: Path,
+    namespace: Optional[str],
+    used_prefixes_only: bool,
+    vocabulary_store: VocabularyStore,
+    build_date: Optional[datetime],
+    reader: Optional[str],
+) -> BaseProfile:
+    """Load the base profile of a SHACLPlay run, exiting if it cannot be fingerprinted."""
+    try:
+        click.echo(f"Loading base profile {base_profile}...")
+        return BaseProfile(
+            base_profile,
+            "shaclplay",
+            _shaclplay_fingerprints(
+                template_p,
+                Path(base_profile),
+                namespace,
+                used_prefixes_only,
+                vocabulary_store,
+                build_date,
+                reader,
+            ),
+        )
+    except Exception as e:
+        click.echo(f"Error: Failed to load base profile: {e}", err=True)
+        exit(1)
+
+
+# Suffix marking the combined SHACLPlay file of a namespace, 'SHACL-{namespace}.combined.xlsx'
+COMBINED_SHACLPLAY_SUFFIX = ".combined"
+
+
+def _generate_combined_shaclplay(
+    model_classes: List[Class],
+    namespace: Optional[str],
+    output_dir: Path,
+    write_classes: Callable[[List[Class], Path], str],
+) -> None:
+    """Write one SHACLPlay file per namespace with the shapes of all its classes, exiting on the first error."""
+    namespace_classes = {}
+    for model_class in model_classes:
+        namespace_classes.setdefault(namespace or model_class.prefix, []).append(model_class)
+    for namespace_prefix, classes in namespace_classes.items():
+        output_file = output_dir / f"SHACL-{namespace_prefix}{COMBINED_SHACLPLAY_SUFFIX}.xlsx"
+        click.echo(f"Generating {len(classes)} {namespace_prefix} classes...")
+        try:
+            click.echo(write_classes(classes, output_file))
+        except Exception as e:
+            click.echo(f"  ✗ Unexpected error generating namespace '{namespace_prefix}': {e}", err=True)
+            traceback.print_exc()
+            exit(1)
+        click.echo(f"  ✓ Generated {output_file}")
+        click.echo()
+
+
+def _generate_levels(levels: List[Tuple[Class, ...]], generate: Callable[[Class], str], jobs: Optional[int]) -> None:
+    """
+    Generate the classes level by level, the classes of a level in parallel.
+
+    Classes of a level only reference classes of earlier levels. The lines reported by generate are echoed
+    from the calling thread, in the order of the classes, so the output of parallel classes is not interleaved.
+
+    Args:
+        levels: Generation levels of the classes, see ClassGraph.levels
+        generate: Generates the artifact of a class, returning the lines to report
+        jobs: Number of classes generated in parallel, by default the CPU count
+    """
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as executor:
+        for number, level in enumerate(levels, start=1):
+            click.echo(f"Generating level {number} of {len(levels)} ({len(level)} classes)...")
+            futures = [executor.submit(generate, model_class) for model_class in level]
+            for model_class, future in zip(level, futures, strict=True):
+                try:
+                    click.echo(future.result())
+                except Exception as e:
+                    click.echo(
+                        f"  ✗ Unexpected error generating class '{model_class.sheet_name}': {e}",
+                        err=True,
+                    )
+                    traceback.print_exception(e)
+                    exit(1)
+            click.echo()
+
+
 @main.command()
 @click.option(
     "-i",
     "--input-excel",
     type=click.Path(exists=True),
     required=True,
-    help="Path to source metadata Excel file.",
+    help="Path to source metadata Excel file, or source directory with a CSV or TSV file per sheet.",
 )
 @click.option(
     "-o",
@@ -52,10 +394,69 @@ def main() -> None:
     default=None,
     help="Namespace prefix to override all class and property namespaces.",
 )
+@click.option(
+    "--base-profile",
+    type=click.Path(exists=True),
+    default=None,
+    help="Source Excel file or directory of the base profile; "
+    "classes unchanged from it reuse its cached SHACLPlay files.",
+)
+@click.option(
+    "--seed-profile-cache",
+    is_flag=True,
+    default=False,
+    help="Store the SHACLPlay files of all classes in the profile cache, so profiles derived from this one "
+    "reuse them from their first build.",
+)
+@click.option(
+    "--used-prefixes-only/--all-prefixes",
+    default=False,
+    help="Declare only the prefixes each class references instead of every prefix of the workbook.",
+)
+@click.option(
+    "--vocabularies",
+    type=click.Path(exists=True),
+    multiple=True,
+    help="Controlled vocabulary dump (SKOS RDF, CSV or TSV), or directory of dumps, for sh:in lists; "
+    "can be given multiple times (default: inputs/vocabularies).",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of classes generated in parallel (default: the CPU count).",
+)
+@click.option(
+    "--combined/--per-class",
+    default=False,
+    help="Write one SHACLPlay file per namespace with the shapes of all its classes, converted with a single "
+    "xls2rdf call; cannot be combined with --base-profile.",
+)
+@click.option(
+    "--compress/--no-compress",
+    default=True,
+    help="Deflate the SHACLPlay files; --no-compress stores them uncompressed, which is faster to write and convert "
+    "but gives larger files.",
+)
+@build_date_option(
+    "Build date stamped into the SHACLPlay files as dcterms:modified; makes the files reproducible, "
+    "with fixed Excel metadata."
+)
+@reader_option
 def shaclplay(
     input_excel: str,
     output_path: str,
     namespace: str,
+    base_profile: str,
+    seed_profile_cache: bool,
+    used_prefixes_only: bool,
+    vocabularies: tuple,
+    jobs: Optional[int],
+    combined: bool,
+    compress: bool,
+    build_date: Optional[datetime],
+    reader: Optional[str],
 ) -> None:
     """
     Generate SHACLPlay Excel files from metadata.
@@ -68,6 +469,9 @@ def shaclplay(
     - A 'prefixes' sheet with prefix and namespace mappings
     - A 'classes' sheet with class configuration
     - One sheet per class with property definitions
+
+    Classes are generated in levels of the references between them (sh:node,
+    inheritance and imports), the classes of a level in parallel.
     """
     try:
         excel_path = Path(input_excel)
@@ -81,160 +485,104 @@ def shaclplay(
 
         # Validate prerequisites before creating output directory
         click.echo("Validating prerequisites...")
-
-        if not template_p.exists():
-            click.echo(
-                f"Error: SHACLPlay template not found at {template_p}",
-                err=True,
-            )
-            exit(1)
-        click.echo(f"  ✓ Template found: {template_p}")
-
-        if not excel_path.exists():
-            click.echo(f"Error: Input Excel file not found at {excel_path}", err=True)
-            exit(1)
-        click.echo(f"  ✓ Input Excel found: {excel_path}")
-
-        try:
-            prefixes_df = pd.read_excel(excel_path, sheet_name="prefixes")
-            click.echo(f"  ✓ Prefixes sheet found with {len(prefixes_df)} entries")
-        except ValueError:
-            click.echo(f"Error: 'prefixes' sheet not found in {excel_path}", err=True)
-            exit(1)
-        except Exception as e:
-            click.echo(f"Error: Failed to read prefixes sheet: {e}", err=True)
-            exit(1)
-
-        try:
-            classes_df = pd.read_excel(excel_path, sheet_name="classes")
-            click.echo(f"  ✓ Classes sheet found with {len(classes_df)} entries")
-        except ValueError:
-            click.echo(f"Error: 'classes' sheet not found in {excel_path}", err=True)
-            exit(1)
-        except Exception as e:
-            click.echo(f"Error: Failed to read classes sheet: {e}", err=True)
+        if combined and (base_profile or seed_profile_cache):
+            click.echo("Error: --combined cannot be combined with --base-profile or --seed-profile-cache", err=True)
             exit(1)
-
-        if len(classes_df) == 0:
-            click.echo("Error: 'classes' sheet is empty", err=True)
-            exit(1)
-
+        classes_df = _check_shaclplay_prerequisites(template_p, excel_path, build_date, reader)
         click.echo()
 
         # Now that all prerequisites are validated, create output directory
         click.echo("Initializing converter...")
         output_dir.mkdir(parents=True, exist_ok=True)
-
-        try:
-            click.echo(f"Loading template from {template_p}...")
-            converter = SHACLPlayConverter(template_p, excel_path)
-        except Exception as e:
-            click.echo(f"Error: Failed to initialize converter: {e}", err=True)
-            exit(1)
+        vocabulary_store, converter = _init_shaclplay_converter(
+            template_p, excel_path, vocabularies, build_date, reader
+        )
+
+        base = None
+        if base_profile:
+            base = _load_shaclplay_base_profile(
+                base_profile, template_p, namespace, used_prefixes_only, vocabulary_store, build_date, reader
+            )
+        reused = []
+        writer = OutputWriter()
 
         click.echo(f"Found {len(classes_df)} classes to process")
         click.echo()
 
-        for idx, class_row in classes_df.iterrows():
-            try:
-                sheet_name = class_row["sheet_name"]
-                class_uri = class_row["class_URI"]
-                target_class = class_row["SHACL_target_ontology_name"]
-                description = class_row.get("description", None)
-
-                if pd.isna(sheet_name):
-                    click.echo(
-                        f"Error: Row {idx} missing 'sheet_name' column",
-                        err=True,
-                    )
-                    exit(1)
-                if pd.isna(class_uri):
-                    click.echo(
-                        f"Error: Row {idx} missing 'class_URI' column",
-                        err=True,
-                    )
-                    exit(1)
-                if pd.isna(target_class):
-                    click.echo(
-                        f"Error: Row {idx} missing 'SHACL_target_ontology_name' column",
-                        err=True,
-                    )
-                    exit(1)
-
-                if pd.isna(description):
-                    description = None
-
-                # Override namespace if provided (only for class_uri)
-                if namespace:
-                    class_name_only = class_uri.split(":")[-1]
-                    class_uri = f"{namespace}:{class_name_only}"
+        model_classes = _load_shaclplay_classes(classes_df, excel_path, namespace, reader)
 
-                click.echo(f"Processing {sheet_name} class...")
-                click.echo(f"  Ontology: {class_uri}")
-                click.echo(f"  Target: {target_class}")
+        click.echo("Resolving class references...")
+        graph, levels = _resolve_class_graph(model_classes)
+        click.echo()
 
-                try:
-                    class_df = pd.read_excel(excel_path, sheet_name=sheet_name)
-                except ValueError:
-                    click.echo(
-                        f"Error: Sheet '{sheet_name}' not found in {excel_path}",
-                        err=True,
-                    )
-                    exit(1)
-                except Exception as e:
-                    click.echo(
-                        f"Error: Failed to read sheet '{sheet_name}': {e}",
-                        err=True,
+        def override_namespace(model_class: Class) -> Class:
+            return replace(model_class, uri=f"{namespace}:{model_class.name}") if namespace else model_class
+
+        fingerprints = {}
+        if base is not None or seed_profile_cache:
+            template_digest = file_digest(template_p)
+            fingerprints = graph.chain_fingerprints(
+                {
+                    model_class.uri: _shaclplay_class_fingerprint(
+                        override_namespace(model_class),
+                        converter.prefix_lookup,
+                        namespace,
+                        template_digest,
+                        used_prefixes_only,
+                        vocabulary_store.fingerprint(),
+                        build_date,
                     )
-                    exit(1)
-
-                click.echo(f"  Loaded {len(class_df)} properties")
-
-                # Extract class name from class_uri
-                # (e.g., "hri:Dataset" -> "Dataset")
-                class_name = class_uri.split(":")[-1]
-
-                # Convert to SHACLPlay format
-                (
-                    nodeshapes_df,
-                    propertyshapes_df,
-                ) = converter.convert_class_sheet(
-                    class_sheet_df=class_df,
-                    class_name=class_name,
-                    class_uri=class_uri,
-                    target_class=target_class,
-                    description=description,
-                    namespace_override=namespace,
-                )
-
-                # Get prefixes
-                prefixes_df = converter.get_prefixes_dataframe()
-
-                # Write to output file
-                output_file = output_dir / f"SHACL-{sheet_name.lower()}.xlsx"
-                write_shaclplay_excel(
-                    prefixes_df=prefixes_df,
-                    nodeshapes_df=nodeshapes_df,
-                    propertyshapes_df=propertyshapes_df,
-                    output_path=output_file,
-                )
+                    for model_class in model_classes
+                }
+            )
+        # Artifacts are stored for the classes shared with the base profile, or all classes when seeding
+        cache = BaseProfile(excel_path, "shaclplay", fingerprints.values()) if seed_profile_cache else base
+
+        def write(shapes: Tuple[pd.DataFrame, pd.DataFrame], output_file: Path) -> str:
+            """Write the NodeShapes and PropertyShapes of a SHACLPlay file, returning the line to report."""
+            return write_shaclplay_excel(
+                prefixes_df=converter.get_prefixes_dataframe(*(shapes if used_prefixes_only else ())),
+                nodeshapes_df=shapes[0],
+                propertyshapes_df=shapes[1],
+                output_path=output_file,
+                output_writer=writer,
+                build_date=build_date,
+                compress=compress,
+            )
 
-                click.echo(f"  ✓ Generated {output_file}")
-                click.echo()
+        def generate(model_class: Class) -> str:
+            """Generate the SHACLPlay file of a class, returning the lines to report."""
+            output_file = output_dir / f"SHACL-{model_class.sheet_name.lower()}.xlsx"
+            if base is not None and base.reuse(fingerprints[model_class.uri], output_file, writer):
+                reused.append(model_class.sheet_name)
+                return f"  ✓ Reused {output_file} from base profile"
 
-            except SystemExit:
-                raise
-            except Exception as e:
-                click.echo(
-                    f"  ✗ Unexpected error processing class at row {idx}: {e}",
-                    err=True,
-                )
-                traceback.print_exc()
-                exit(1)
+            # Convert to SHACLPlay format
+            message = write(
+                converter.convert_class(override_namespace(model_class), namespace_override=namespace), output_file
+            )
+            if cache is not None:
+                cache.store(fingerprints[model_class.uri], output_file)
+            return f"{message}\n  ✓ Generated {output_file}"
+
+        if combined:
+            _generate_combined_shaclplay(
+                [override_namespace(model_class) for model_class in model_classes],
+                namespace,
+                output_dir,
+                lambda classes, output_file: write(
+                    converter.convert_classes(classes, namespace_override=namespace), output_file
+                ),
+            )
+        else:
+            _generate_levels(levels, generate, jobs)
 
         click.echo("=" * 80)
         click.echo("Conversion complete!")
         click.echo(f"Output files written to {output_dir}")
+        click.echo(f"Files: {writer.summary()}")
+        if reused:
+            click.echo(f"Classes reused from base profile: {len(reused)} of {len(classes_df)}")
         click.echo("=" * 80)
 
     except Exception as e:
@@ -244,6 +592,190 @@ def shaclplay(
         exit(1)
 
 
+def _shaclplay_class_fingerprint(
+    model_class: Class,
+    prefix_lookup: dict,
+    namespace: str,
+    template_digest: str,
+    used_prefixes_only: bool,
+    vocabularies_fingerprint: str,
+    build_date: Optional[datetime],
+) -> str:
+    """Fingerprint of everything a SHACLPlay file is generated from."""
+    return content_fingerprint(
+        "shaclplay",
+        [namespace, used_prefixes_only, build_date.isoformat() if build_date else None],
+        asdict(model_class),
+        prefix_lookup,
+        template_digest,
+        vocabularies_fingerprint,
+    )
+
+
+def _shaclplay_fingerprints(
+    template_p: Path,
+    excel_path: Path,
+    namespace: str,
+    used_prefixes_only: bool,
+    vocabulary_store: VocabularyStore,
+    build_date: Optional[datetime] = None,
+    reader: Optional[str] = None,
+) -> List[str]:
+    """Fingerprints of the SHACLPlay files of all classes in a workbook."""
+    converter = SHACLPlayConverter(template_p, excel_path, vocabulary_store, reader=reader)
+    template_digest = file_digest(template_p)
+    model_classes = []
+    for _idx, class_row in read_excel(excel_path, sheet_name="classes", reader=reader).iterrows():
+        sheet_name = class_row["sheet_name"]
+        if pd.isna(sheet_name) or pd.isna(class_row["class_URI"]):
+            continue
+        class_df = read_excel(excel_path, sheet_name=sheet_name, reader=reader)
+        model_classes.append(Class.from_row(class_row, Property.from_sheet(class_df, sheet_name)))
+    fingerprints = {}
+    for model_class in model_classes:
+        fingerprints[model_class.uri] = _shaclplay_class_fingerprint(
+            replace(model_class, uri=f"{namespace}:{model_class.name}") if namespace else model_class,
+            converter.prefix_lookup,
+            namespace,
+            template_digest,
+            used_prefixes_only,
+            vocabulary_store.fingerprint(),
+            build_date,
+        )
+    return list(ClassGraph(model_classes).chain_fingerprints(fingerprints).values())
+
+
+def _resolve_class_graph(model_classes: List[Class]) -> Tuple[ClassGraph, List[Tuple[Class, ...]]]:
+    """Build the dependency graph of the classes and their generation levels, exiting on invalid references."""
+    try:
+        graph = ClassGraph(model_classes)
+        levels = graph.levels()
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        exit(1)
+    for reference in graph.dangling:
+        click.echo(f"  ⚠ Warning: {reference} is not a class of the profile", err=True)
+    for cycle in graph.cycles:
+        click.echo(
+            f"  ⚠ Warning: Nested shapes of {', '.join(cycle)} reference each other in a cycle; "
+            "these classes are generated in the same level",
+            err=True,
+        )
+    click.echo(f"  ✓ Scheduled {len(graph.classes)} classes in {len(levels)} levels")
+    return graph, levels
+
+
+def _sempyro_fingerprints(linkml_creator: LinkMLCreator, imports: ImportRegistry, infer_imports: bool) -> dict:
+    """
+    Fingerprints of the SeMPyRO modules of all classes built by a LinkMLCreator, by class key.
+
+    The fingerprint of a class is chained with those of the classes it references, see
+    ClassGraph.chain_fingerprints, so a changed class invalidates exactly its dependents as well.
+    """
+    shared_inputs = [template_fingerprint()]
+    # The shared schemas are read from where LinkMLCreator copies them from
+    for name, source in SHARED_SCHEMAS.values():
+        if not source.exists():
+            raise FileNotFoundError(f"{name} schema not found at {source}")
+        shared_inputs.append(file_digest(source))
+    fingerprints = {}
+    class_keys = {}
+    for linkml_dict in linkml_creator.linkml_data.values():
+        if "class_id" not in linkml_dict:
+            continue
+        class_key = linkml_dict["rel_path"].stem
+        class_uri = linkml_dict["data"]["classes"][linkml_dict["class_id"]]["class_uri"]
+        class_keys[class_uri] = class_key
+        imports_key = imports.block_key(class_key) if class_key in imports else None
+        fingerprints[class_uri] = content_fingerprint(
+            "sempyro",
+            linkml_dict["data"],
+            imports_key,
+            infer_imports and imports_key is None,
+            shared_inputs,
+        )
+    graph = ClassGraph(model_class for model_class in linkml_creator.profile.classes if model_class.uri in fingerprints)
+    return {class_keys[uri]: fingerprint for uri, fingerprint in graph.chain_fingerprints(fingerprints).items()}
+
+
+def _shaclplay_namespace(excel_file: Path, shaclplay_dir: Path, reader: Optional[str]) -> str:
+    """
+    Get the namespace of a SHACLPlay file from the prefix of its first NodeShape, exiting if it cannot be read.
+
+    Args:
+        excel_file: SHACLPlay Excel file
+        shaclplay_dir: Directory of the SHACLPlay files, whose name is the namespace of NodeShapes without prefix
+        reader: Excel reader backend, see metadata_automation.workbook.resolve_reader
+
+    Returns:
+        Namespace prefix, e.g. 'hri'
+    """
+    try:
+        # Generated files change on every run, so they are not snapshotted
+        df = read_excel(
+            excel_file,
+            sheet_name="NodeShapes (classes)",
+            reader=reader,
+            cache=False,
+            header=None,
+        )
+    except ValueError:
+        click.echo(
+            f"Error: 'NodeShapes (classes)' sheet not found in {excel_file.name}",
+            err=True,
+        )
+        exit(1)
+    except Exception as e:
+        click.echo(
+            f"Error: Failed to read {excel_file.name}: {e}",
+            err=True,
+        )
+        exit(1)
+
+    try:
+        shape_uri = nodeshape_uri(df)
+        return shape_uri.split(":")[0] if ":" in str(shape_uri) else shaclplay_dir.name
+    except Exception as e:
+        click.echo(
+            f"Error: Could not extract namespace from {excel_file.name}: {e}",
+            err=True,
+        )
+        exit(1)
+
+
+def _write_shacl_turtle(
+    staged_file: Path, output_file: Path, split_ns: Optional[str], writer: OutputWriter, build_date: Optional[datetime]
+) -> None:
+    """
+    Write the Turtle file converted into a staging file, if it changed.
+
+    Args:
+        staged_file: Staging file the SHACLPlay file was converted into
+        output_file: Turtle file to write
+        split_ns: Namespace of a combined SHACLPlay file whose shapes are split into a Turtle file per class, named
+            '{namespace}-{sheet}.ttl' (see split_shapes), or None to write the output file
+        writer: OutputWriter counting the written and unchanged files
+        build_date: Build date of reproducible mode, in which the Turtle is serialized canonically
+    """
+    if not staged_file.exists():
+        click.echo(f"  ⚠ Warning: No Turtle was converted, {output_file} was not generated", err=True)
+        return
+    if split_ns is None:
+        if build_date is not None:
+            staged_file.write_text(canonical_turtle(staged_file.read_bytes()), encoding="utf-8")
+        writer.commit(staged_file, output_file)
+        click.echo(f"  ✓ Successfully generated {output_file}")
+        return
+
+    shapes_graph = Graph().parse(staged_file, format="turtle")
+    staged_file.unlink()
+    for shape_name, class_graph in split_shapes(shapes_graph).items():
+        class_file = output_file.parent / f"{split_ns}-{shape_name.lower()}.ttl"
+        turtle = class_graph.serialize(format="turtle")
+        writer.write_text(class_file, canonical_turtle(turtle) if build_date is not None else turtle)
+        click.echo(f"  ✓ Successfully generated {class_file}")
+
+
 @main.command()
 @click.option(
     "-i",
@@ -259,14 +791,51 @@ def shaclplay(
     default="./outputs/shacl_shapes",
     help="Output directory for SHACL Turtle files.",
 )
+@click.option(
+    "--split/--no-split",
+    default=False,
+    help="Split the shapes converted from a combined SHACLPlay file (shaclplay --combined) into a Turtle file "
+    "per class.",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(SHACL_ENGINES),
+    default="xls2rdf",
+    show_default=True,
+    help="Converter of the SHACLPlay files: the xls2rdf JAR, which requires Java, or the native Python reader.",
+)
+@click.option(
+    "--jvm-options",
+    type=str,
+    default=None,
+    envvar=JVM_OPTIONS_ENV,
+    help="Options of the JVM running xls2rdf, quoted as in a shell "
+    f"(default: '{' '.join(DEFAULT_JVM_OPTIONS)}', or the {JVM_OPTIONS_ENV} environment variable).",
+)
+@click.option(
+    "--cds/--no-cds",
+    default=True,
+    help="Create and reuse a class data sharing archive of xls2rdf in the cache, for faster JVM startup (Java 13+).",
+)
+@build_date_option("Build date of reproducible mode, in which the Turtle files are serialized canonically.")
+@reader_option
 def shacl_from_shaclplay(
     input_path: str,
     output_path: str,
+    split: bool,
+    engine: str,
+    jvm_options: Optional[str],
+    cds: bool,
+    build_date: Optional[datetime],
+    reader: Optional[str],
 ) -> None:
     """Generate SHACL Turtle files from SHACLPlay Excel files.
 
     Converts SHACLPlay Excel files to SHACL Turtle format using the xls2rdf
-    tool. Requires Java to be installed and available in PATH.
+    tool, which requires Java to be installed and available in PATH, or with
+    '--engine python' in-process without Java. A combined SHACLPlay file of a
+    namespace, 'SHACL-{namespace}.combined.xlsx', is converted to a single
+    '{namespace}.ttl'.
     """
     try:
         shaclplay_dir = Path(input_path)
@@ -279,7 +848,7 @@ def shacl_from_shaclplay(
         click.echo()
 
         # Check if xls2rdf JAR exists
-        if not jar_path.exists():
+        if engine == "xls2rdf" and not jar_path.exists():
             click.echo(f"Error: xls2rdf JAR not found at {jar_path}", err=True)
             exit(1)
 
@@ -294,48 +863,26 @@ def shacl_from_shaclplay(
             exit(1)
 
         click.echo(f"Found {len(excel_files)} SHACLPlay Excel files to convert")
+        if engine == "xls2rdf":
+            jvm = parse_jvm_options(jvm_options)
+            version = java_version() if cds else None
+            if cds_options(jar_path, version):
+                click.echo(f"  ✓ Java {version}, class data sharing archive {cds_archive(jar_path, version)}")
+        else:
+            click.echo("  ✓ Converting with the native Python reader")
         click.echo()
+        writer = OutputWriter()
 
         # Process each file
         for excel_file in excel_files:
             try:
-                # Extract namespace from the Excel file
-                try:
-                    df = pd.read_excel(
-                        excel_file,
-                        sheet_name="NodeShapes (classes)",
-                        header=None,
-                    )
-                except ValueError:
-                    click.echo(
-                        f"Error: 'NodeShapes (classes)' sheet not found in {excel_file.name}",
-                        err=True,
-                    )
-                    exit(1)
-                except Exception as e:
-                    click.echo(
-                        f"Error: Failed to read {excel_file.name}: {e}",
-                        err=True,
-                    )
-                    exit(1)
-
-                try:
-                    nodeshape_uri = df.iloc[13, 0]
-
-                    if ":" in str(nodeshape_uri):
-                        ns = nodeshape_uri.split(":")[0]
-                    else:
-                        ns = shaclplay_dir.name
-                except Exception as e:
-                    click.echo(
-                        f"Error: Could not extract namespace from {excel_file.name}: {e}",
-                        err=True,
-                    )
-                    exit(1)
+                ns = _shaclplay_namespace(excel_file, shaclplay_dir, reader)
 
                 output_file_dir = output_dir / ns
                 class_name = excel_file.stem.replace("SHACL-", "")
-                output_file = output_file_dir / f"{ns}-{class_name}.ttl"
+                # Combined files of a namespace, written by shaclplay --combined, are marked by their suffix
+                combined = class_name.endswith(COMBINED_SHACLPLAY_SUFFIX)
+                output_file = output_file_dir / (f"{ns}.ttl" if combined else f"{ns}-{class_name}.ttl")
 
                 click.echo(f"Processing {excel_file.name}...")
                 click.echo(f"  Namespace: {ns}")
@@ -344,28 +891,22 @@ def shacl_from_shaclplay(
                 # Create output directory
                 output_file_dir.mkdir(parents=True, exist_ok=True)
 
-                # Run xls2rdf conversion
-                cmd = [
-                    "java",
-                    "-jar",
-                    str(jar_path),
-                    "convert",
-                    "-i",
-                    str(excel_file),
-                    "-o",
-                    str(output_file),
-                    "-sh",
-                    "-np",
-                ]
-
-                result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-
-                click.echo(f"  ✓ Successfully generated {output_file}")
+                # Convert into a staging file, which only replaces an outdated output file
+                staged_file = output_file_dir / f".{output_file.stem}.staged.ttl"
+                if engine == "python":
+                    result = None
+                    staged_file.write_text(
+                        read_shaclplay(excel_file, reader).serialize(format="turtle"), encoding="utf-8"
+                    )
+                else:
+                    cmd = xls2rdf_command(jar_path, excel_file, staged_file, jvm, version)
+                    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+                _write_shacl_turtle(staged_file, output_file, ns if combined and split else None, writer, build_date)
 
                 # Print any stdout/stderr for debugging
-                if result.stdout:
+                if result is not None and result.stdout:
                     click.echo(f"  Output: {result.stdout.strip()}")
-                if result.stderr:
+                if result is not None and result.stderr:
                     click.echo(f"  Warnings: {result.stderr.strip()}")
 
                 click.echo()
@@ -373,6 +914,7 @@ def shacl_from_shaclplay(
             except SystemExit:
                 raise
             except subprocess.CalledProcessError as e:
+                staged_file.unlink(missing_ok=True)
                 click.echo(f"Error: Failed to convert {excel_file.name}", err=True)
                 click.echo(f"  Return code: {e.returncode}", err=True)
                 if e.stdout:
@@ -392,6 +934,7 @@ def shacl_from_shaclplay(
         click.echo("=" * 80)
         click.echo("Conversion complete!")
         click.echo(f"SHACL Turtle files written to {output_file_dir}")
+        click.echo(f"Files: {writer.summary()}")
         click.echo("=" * 80)
 
     except Exception as e:
@@ -401,19 +944,343 @@ def shacl_from_shaclplay(
         exit(1)
 
 
-@main.command()
-@click.option(
-    "-i",
-    "--input-excel",
-    type=click.Path(exists=True),
-    required=True,
-    help="Path to source metadata Excel file.",
-)
-@click.option(
-    "-n",
-    "--namespace",
-    type=str,
-    default=None,
+# Sheets of the source workbook that are not class sheets
+SEMPYRO_EXCLUDED_SHEETS = ["Info", "User Guide"]
+
+
+@dataclass
+class _SempyroSummary:
+    """Outcome of the classes of a sempyro run."""
+
+    generated: int = 0
+    reused: List[str] = field(default_factory=list)
+    inferred_imports: List[str] = field(default_factory=list)
+    no_imports: List[str] = field(default_factory=list)
+    no_class: List[str] = field(default_factory=list)
+    unresolved_imports: List[str] = field(default_factory=list)
+
+    def check_module(self, class_key: str, staged_file: Path, unresolved: set) -> bool:
+        """Check a generated module, removing it if it would not import or defines no class."""
+        if unresolved:
+            click.echo(
+                f"    ✗ Could not infer imports for {class_key}: {', '.join(sorted(unresolved))}",
+                err=True,
+            )
+            self.unresolved_imports.append(class_key)
+        elif not find_class_ranges(staged_file):
+            click.echo(f"    ⚠ Warning: No class rendered for {class_key}, skipped")
+            self.no_class.append(class_key)
+        else:
+            return True
+        staged_file.unlink()
+        return False
+
+    def add_module(
+        self,
+        class_key: str,
+        staged_file: Path,
+        unresolved: set,
+        inferred: bool,
+        cache: Optional[BaseProfile],
+        fingerprints: dict,
+    ) -> None:
+        """
+        Record a generated module, storing it in the profile cache if it passes check_module.
+
+        Args:
+            class_key: Key of the class, e.g. 'hri-Dataset'
+            staged_file: Module in the staging directory
+            unresolved: Names whose imports could not be inferred
+            inferred: Whether the imports of the module were inferred
+            cache: Profile cache the module is stored in, if any
+            fingerprints: Fingerprints of the classes, by class key
+        """
+        if not self.check_module(class_key, staged_file, unresolved):
+            return
+        if inferred:
+            self.inferred_imports.append(class_key)
+        if cache is not None:
+            cache.store(fingerprints[class_key], staged_file)
+        click.echo(f"    ✓ Generated {staged_file.name}")
+        self.generated += 1
+
+    def echo(self, writer: OutputWriter, linkml_output_path: Path, sempyro_output_path: Path) -> None:
+        """Echo the summary of the run."""
+        click.echo("=" * 80)
+        click.echo("Generation complete!")
+        click.echo(f"  Successfully generated: {self.generated} classes")
+        if self.reused:
+            click.echo(f"  Reused from base profile: {len(self.reused)} classes")
+        click.echo(f"  Files: {writer.summary()}")
+        click.echo(f"  LinkML schemas: {linkml_output_path}")
+        click.echo(f"  SeMPyRO classes: {sempyro_output_path}")
+        for title, class_keys in (
+            ("Classes generated with inferred imports:", self.inferred_imports),
+            ("Classes skipped due to missing imports configuration:", self.no_imports),
+            ("Classes skipped because no class was rendered:", self.no_class),
+            ("Classes not generated due to unresolved imports:", self.unresolved_imports),
+        ):
+            if class_keys:
+                click.echo(f"  {title}")
+                for cls in class_keys:
+                    click.echo(f"    - {cls}")
+        click.echo("=" * 80)
+
+
+def _detect_namespace(excel_path: Path, reader: Optional[str]) -> str:
+    """Detect the namespace of a workbook from the prefix of its first class URI, exiting if there is none."""
+    click.echo("Auto-detecting namespace from Excel file...")
+    try:
+        classes_df = read_excel(excel_path, sheet_name="classes", reader=reader)
+        if "class_URI" not in classes_df.columns or len(classes_df) == 0:
+            click.echo(
+                "  Error: 'class_URI' column not found in classes sheet",
+                err=True,
+            )
+            exit(1)
+        first_ontology = classes_df["class_URI"].iloc[0]
+        if ":" not in str(first_ontology):
+            click.echo(
+                "  Warning: Could not parse namespace from class_URI",
+                err=True,
+            )
+            click.echo("  Please provide namespace with --namespace option")
+            exit(1)
+    except Exception as e:
+        click.echo(f"  Error reading classes sheet: {e}", err=True)
+        exit(1)
+    namespace = first_ontology.split(":")[0]
+    click.echo(f"  Detected namespace: {namespace}")
+    return namespace
+
+
+def _load_linkml_creator(
+    excel_path: Path,
+    linkml_output_path: Path,
+    used_prefixes_only: bool,
+    vocabulary_store: Optional[VocabularyStore],
+    reader: Optional[str],
+) -> LinkMLCreator:
+    """
+    Load the classes of a workbook into a LinkMLCreator and check the references between them.
+
+    Args:
+        excel_path: Source Excel file or directory
+        linkml_output_path: Output directory of the LinkML schemas
+        used_prefixes_only: Whether the schemas declare only the prefixes they reference
+        vocabulary_store: Controlled vocabularies to generate enums of, if any
+        reader: Excel reader backend, see metadata_automation.workbook.resolve_reader
+
+    Returns:
+        LinkMLCreator with the profile of the workbook loaded
+    """
+    try:
+        linkml_creator = LinkMLCreator(linkml_output_path, used_prefixes_only, vocabulary_store)
+        linkml_creator.load_excel(str(excel_path), SEMPYRO_EXCLUDED_SHEETS, reader)
+    except Exception as e:
+        click.echo(f"Error: Failed to load classes from {excel_path}: {e}", err=True)
+        traceback.print_exc()
+        exit(1)
+    _resolve_class_graph(list(linkml_creator.profile.classes))
+    return linkml_creator
+
+
+def _generate_linkml_schemas(
+    linkml_creator: LinkMLCreator, namespace: str, stream: bool, combined: bool
+) -> Optional[Tuple[Path, dict]]:
+    """
+    Build and write the LinkML schemas of the classes, exiting on failure.
+
+    Returns:
+        With combined, the combined schema file and the class ids of the modules by class key; otherwise None
+    """
+    try:
+        if stream:
+            click.echo(f"  Streaming {len(linkml_creator.profile.classes)} class schemas...")
+            linkml_creator.stream_sempyro()
+        else:
+            linkml_creator.build_sempyro()
+            linkml_creator.write_to_file()
+        combined_schema = None
+        if combined:
+            combined_schema = (
+                linkml_creator.write_combined_schema(namespace),
+                linkml_creator.class_modules(namespace),
+            )
+        click.echo("  ✓ LinkML schemas generated")
+        return combined_schema
+    except Exception as e:
+        click.echo(f"Error: Failed to generate LinkML schemas: {e}", err=True)
+        traceback.print_exc()
+        exit(1)
+
+
+def _load_imports(imports_p: Path) -> ImportRegistry:
+    """Load the imports configuration, exiting if it is missing or invalid."""
+    if not imports_p.exists():
+        click.echo(f"Error: Imports file not found at {imports_p}", err=True)
+        exit(1)
+
+    try:
+        imports = ImportRegistry(load_yaml(imports_p))
+        click.echo(f"  ✓ Loaded imports for {len(imports)} classes ({imports.unique_blocks} unique import blocks)")
+        return imports
+    except Exception as e:
+        click.echo(f"Error: Failed to load imports configuration: {e}", err=True)
+        traceback.print_exc()
+        exit(1)
+
+
+def _load_sempyro_profile_cache(
+    linkml_creator: LinkMLCreator,
+    imports: ImportRegistry,
+    infer_imports: bool,
+    excel_path: Path,
+    base_profile: Optional[str],
+    seed_profile_cache: bool,
+    reader: Optional[str],
+) -> Tuple[Optional[BaseProfile], Optional[BaseProfile], dict]:
+    """
+    Load the base profile of a sempyro run and the profile cache its modules are stored in.
+
+    Args:
+        linkml_creator: LinkMLCreator with the schemas of the classes built
+        imports: Imports configuration
+        infer_imports: Whether imports of classes without configuration are inferred
+        excel_path: Source Excel file or directory of the profile
+        base_profile: Source Excel file or directory of the base profile, if any
+        seed_profile_cache: Whether to store all classes in the profile cache
+        reader: Excel reader backend, see metadata_automation.workbook.resolve_reader
+
+    Returns:
+        Tuple of the base profile, the profile cache and the fingerprints of the classes by class key; the cache is
+        the base profile, storing the classes shared with it, or, when seeding, a profile storing all classes
+    """
+    base = None
+    fingerprints = {}
+    if base_profile:
+        click.echo(f"Loading base profile {base_profile}...")
+        try:
+            base_creator = LinkMLCreator(linkml_creator.output_path, vocabularies=linkml_creator.vocabularies)
+            base_creator.load_excel(str(base_profile), SEMPYRO_EXCLUDED_SHEETS, reader)
+            base_creator.build_sempyro()
+            base = BaseProfile(
+                base_profile,
+                "sempyro",
+                _sempyro_fingerprints(base_creator, imports, infer_imports).values(),
+            )
+            fingerprints = _sempyro_fingerprints(linkml_creator, imports, infer_imports)
+            shared = sum(base.shares(fingerprint) for fingerprint in fingerprints.values())
+            click.echo(f"  ✓ {shared} of {len(fingerprints)} classes are unchanged from the base profile")
+        except Exception as e:
+            click.echo(f"Error: Failed to load base profile: {e}", err=True)
+            traceback.print_exc()
+            exit(1)
+        click.echo()
+    if not seed_profile_cache:
+        return base, base, fingerprints
+    try:
+        fingerprints = fingerprints or _sempyro_fingerprints(linkml_creator, imports, infer_imports)
+    except Exception as e:
+        click.echo(f"Error: Failed to fingerprint classes for the profile cache: {e}", err=True)
+        exit(1)
+    return base, BaseProfile(excel_path, "sempyro", fingerprints.values()), fingerprints
+
+
+def _read_class_names(excel_path: Path, reader: Optional[str]) -> List[str]:
+    """Read the names of the classes of a workbook, exiting if the 'classes' sheet has no class URIs."""
+    try:
+        classes_df = read_excel(excel_path, sheet_name="classes", reader=reader)
+        if "class_URI" not in classes_df.columns:
+            click.echo(
+                "Error: 'class_URI' column not found in classes sheet",
+                err=True,
+            )
+            exit(1)
+
+        class_names = [ont_name.split(":")[-1] for ont_name in classes_df["class_URI"] if pd.notna(ont_name)]
+        click.echo(f"  ✓ Found {len(class_names)} classes in Excel file")
+        return class_names
+    except Exception as e:
+        click.echo(f"Error: Failed to read class names from Excel: {e}", err=True)
+        traceback.print_exc()
+        exit(1)
+
+
+def _generate_sempyro_module(
+    class_key: str,
+    schema_file: Path,
+    staged_file: Path,
+    imports: ImportRegistry,
+    import_resolver: Optional[ImportResolver],
+    template_cache: bool,
+) -> set:
+    """
+    Render the module of a class from its LinkML schema, with its configured or inferred imports.
+
+    Returns:
+        Names whose imports could not be inferred; empty with configured imports
+    """
+    link_dict = {
+        "schema_path": schema_file,
+        "imports": imports.get(class_key) if class_key in imports else None,
+        "output_path": str(staged_file),
+        "persist_template_cache": template_cache,
+    }
+    if class_key in imports:
+        generate_from_linkml(link_dict)
+        unresolved = set()
+    else:
+        click.echo(f"    No imports configuration found for {class_key}, inferring imports")
+        link_dict.update({"import_resolver": import_resolver, "import_symbols": imports.symbols()})
+        unresolved = generate_from_linkml(link_dict)
+    remove_unwanted_classes(staged_file, schema_file)
+    return unresolved
+
+
+def _generate_combined_modules(
+    combined_schema_file: Path,
+    combined_modules: dict,
+    imports: ImportRegistry,
+    import_resolver: Optional[ImportResolver],
+    template_cache: bool,
+) -> dict:
+    """
+    Render the modules of the classes of a combined schema in one pass, exiting on failure.
+
+    Returns:
+        Names whose imports could not be inferred, by class id
+    """
+    click.echo(f"  Rendering {len(combined_modules)} classes from {combined_schema_file.name}...")
+    try:
+        return generate_combined_from_linkml(
+            {
+                "schema_path": combined_schema_file,
+                "modules": combined_modules,
+                "import_resolver": import_resolver,
+                "import_symbols": imports.symbols(),
+                "persist_template_cache": template_cache,
+            }
+        )
+    except Exception as e:
+        click.echo(f"Error: Failed to generate combined schema classes: {e}", err=True)
+        traceback.print_exc()
+        exit(1)
+
+
+@main.command()
+@click.option(
+    "-i",
+    "--input-excel",
+    type=click.Path(exists=True),
+    required=True,
+    help="Path to source metadata Excel file, or source directory with a CSV or TSV file per sheet.",
+)
+@click.option(
+    "-n",
+    "--namespace",
+    type=str,
+    default=None,
     help="Namespace prefix (auto-detected from Excel if not provided).",
 )
 @click.option(
@@ -431,15 +1298,85 @@ def shacl_from_shaclplay(
 @click.option(
     "--imports-path",
     type=click.Path(exists=True),
-    default="./inputs/sempyro/imports.yaml",
-    help="Path to imports configuration YAML file.",
+    default=str(SEMPYRO_INPUTS / "imports.yaml"),
+    help="Path to imports configuration YAML file (default: inputs/sempyro/imports.yaml).",
 )
+@click.option(
+    "--infer-imports/--no-infer-imports",
+    default=True,
+    help="Infer imports for classes without an imports configuration instead of skipping them.",
+)
+@click.option(
+    "--combined/--per-class",
+    default=False,
+    help="Render all classes of the namespace from one combined LinkML schema in a single generator pass.",
+)
+@click.option(
+    "--stream/--no-stream",
+    default=False,
+    help="Write each LinkML schema as soon as it is built, keeping memory flat for very large profiles; "
+    "cannot be combined with --combined or --base-profile.",
+)
+@click.option(
+    "--template-cache/--no-template-cache",
+    default=True,
+    help="Persist compiled Jinja templates in the on-disk cache between runs.",
+)
+@click.option(
+    "--format/--no-format",
+    "format_output",
+    default=True,
+    help="Format the generated Python files with ruff.",
+)
+@click.option(
+    "--base-profile",
+    type=click.Path(exists=True),
+    default=None,
+    help="Source Excel file or directory of the base profile; "
+    "classes unchanged from it reuse its cached SeMPyRO classes.",
+)
+@click.option(
+    "--seed-profile-cache",
+    is_flag=True,
+    default=False,
+    help="Store the SeMPyRO classes of all classes in the profile cache, so profiles derived from this one "
+    "reuse them from their first build.",
+)
+@click.option(
+    "--used-prefixes-only/--all-prefixes",
+    default=False,
+    help="Declare only the prefixes each LinkML schema references instead of every prefix of the workbook.",
+)
+@click.option(
+    "--vocabulary-enums/--no-vocabulary-enums",
+    default=False,
+    help="Generate enums of the controlled vocabularies for their properties with an IRI range.",
+)
+@click.option(
+    "--vocabularies",
+    type=click.Path(exists=True),
+    multiple=True,
+    help="Controlled vocabulary dump (SKOS RDF, CSV or TSV), or directory of dumps, for --vocabulary-enums; "
+    "can be given multiple times (default: inputs/vocabularies).",
+)
+@reader_option
 def sempyro(
     input_excel: str,
     namespace: str,
     linkml_output_path: str,
     sempyro_output_path: str,
     imports_path: str,
+    infer_imports: bool,
+    combined: bool,
+    stream: bool,
+    template_cache: bool,
+    format_output: bool,
+    base_profile: str,
+    seed_profile_cache: bool,
+    used_prefixes_only: bool,
+    vocabulary_enums: bool,
+    vocabularies: tuple,
+    reader: Optional[str],
 ) -> None:
     """Generate SeMPyRO Pydantic classes from metadata.
 
@@ -456,87 +1393,49 @@ def sempyro(
         linkml_output_path = Path(linkml_output_path)
         sempyro_output_path = Path(sempyro_output_path)
         imports_p = Path(imports_path)
-        exclude_list = ["Info", "User Guide"]
 
         click.echo("=" * 80)
         click.echo("SeMPyRO Pydantic Class Generator")
         click.echo("=" * 80)
         click.echo()
 
+        if stream and (combined or base_profile):
+            # The combined schema and the base profile fingerprints need all schemas at once
+            click.echo("Error: --stream cannot be combined with --combined or --base-profile", err=True)
+            exit(1)
+        if stream and seed_profile_cache:
+            click.echo("Error: --stream cannot be combined with --seed-profile-cache", err=True)
+            exit(1)
+
         # Auto-detect namespace if not provided
         if namespace is None:
-            click.echo("Auto-detecting namespace from Excel file...")
-            try:
-                classes_df = pd.read_excel(excel_path, sheet_name="classes")
-                if "class_URI" in classes_df.columns and len(classes_df) > 0:
-                    first_ontology = classes_df["class_URI"].iloc[0]
-                    if ":" in str(first_ontology):
-                        namespace = first_ontology.split(":")[0]
-                        click.echo(f"  Detected namespace: {namespace}")
-                    else:
-                        click.echo(
-                            "  Warning: Could not parse namespace from class_URI",
-                            err=True,
-                        )
-                        click.echo("  Please provide namespace with --namespace option")
-                        exit(1)
-                else:
-                    click.echo(
-                        "  Error: 'class_URI' column not found in classes sheet",
-                        err=True,
-                    )
-                    exit(1)
-            except Exception as e:
-                click.echo(f"  Error reading classes sheet: {e}", err=True)
-                exit(1)
+            namespace = _detect_namespace(excel_path, reader)
         else:
             click.echo(f"Using provided namespace: {namespace}")
 
         click.echo()
 
+        vocabulary_store = _load_vocabulary_store(vocabularies) if vocabulary_enums else None
+        click.echo("Resolving class references...")
+        linkml_creator = _load_linkml_creator(
+            excel_path, linkml_output_path, used_prefixes_only, vocabulary_store, reader
+        )
+        click.echo()
+
         click.echo("[1/4] Generating LinkML schemas...")
-        try:
-            linkml_creator = LinkMLCreator(linkml_output_path)
-            linkml_creator.load_excel(str(excel_path), exclude_list)
-            linkml_creator.build_sempyro()
-            linkml_creator.write_to_file()
-            click.echo("  ✓ LinkML schemas generated")
-        except Exception as e:
-            click.echo(f"Error: Failed to generate LinkML schemas: {e}", err=True)
-            traceback.print_exc()
-            exit(1)
+        combined_schema = _generate_linkml_schemas(linkml_creator, namespace, stream, combined)
         click.echo()
 
         click.echo("[2/4] Loading imports configuration...")
-        if not imports_p.exists():
-            click.echo(f"Error: Imports file not found at {imports_p}", err=True)
-            exit(1)
-
-        try:
-            imports = load_yaml(imports_p)
-            click.echo(f"  ✓ Loaded imports for {len(imports)} classes")
-        except Exception as e:
-            click.echo(f"Error: Failed to load imports configuration: {e}", err=True)
-            traceback.print_exc()
-            exit(1)
+        imports = _load_imports(imports_p)
         click.echo()
 
-        # Extract class names from the Excel file
-        try:
-            classes_df = pd.read_excel(excel_path, sheet_name="classes")
-            if "class_URI" not in classes_df.columns:
-                click.echo(
-                    "Error: 'class_URI' column not found in classes sheet",
-                    err=True,
-                )
-                exit(1)
+        base, cache, fingerprints = _load_sempyro_profile_cache(
+            linkml_creator, imports, infer_imports, excel_path, base_profile, seed_profile_cache, reader
+        )
 
-            class_names = [ont_name.split(":")[-1] for ont_name in classes_df["class_URI"] if pd.notna(ont_name)]
-            click.echo(f"  ✓ Found {len(class_names)} classes in Excel file")
-        except Exception as e:
-            click.echo(f"Error: Failed to read class names from Excel: {e}", err=True)
-            traceback.print_exc()
-            exit(1)
+        # Extract class names from the Excel file
+        class_names = _read_class_names(excel_path, reader)
 
         click.echo()
         click.echo("[3/4] Generating SeMPyRO Pydantic classes...")
@@ -544,14 +1443,21 @@ def sempyro(
         linkml_definitions_path = linkml_output_path / namespace
         sempyro_class_output_path = sempyro_output_path / namespace
         sempyro_class_output_path.mkdir(parents=True, exist_ok=True)
+        # Modules are generated, cleaned up and formatted in a staging directory, after which
+        # only the modules whose content changed replace those in the output directory
+        staging_path = Path(tempfile.mkdtemp(dir=sempyro_class_output_path, prefix=".staging-"))
+        click.get_current_context().call_on_close(lambda: shutil.rmtree(staging_path, ignore_errors=True))
+        writer = OutputWriter()
 
-        success_count = 0
-        no_imports = []
+        summary = _SempyroSummary()
+        import_resolver = get_import_resolver() if infer_imports else None
+        combined_modules = {}
 
         for class_name in class_names:
             class_key = f"{namespace}-{class_name}"
             schema_file = linkml_definitions_path / f"{class_key}.yaml"
             output_file = sempyro_class_output_path / f"{class_key}.py"
+            staged_file = staging_path / output_file.name
 
             click.echo(f"  Processing {class_name}...")
 
@@ -562,79 +1468,764 @@ def sempyro(
                 )
                 exit(1)
 
-            if class_key not in imports:
+            if class_key not in imports and import_resolver is None:
                 click.echo(
                     f"Warning: No imports configuration found for {class_key}",
                 )
-                no_imports.append(class_key)
+                summary.no_imports.append(class_key)
                 continue
 
-            try:
-                link_dict = {
-                    "schema_path": schema_file,
-                    "imports": imports[class_key],
-                    "output_path": str(output_file),
-                }
-                generate_from_linkml(link_dict)
-                remove_unwanted_classes(output_file, schema_file)
+            if base is not None and base.reuse(fingerprints[class_key], staged_file):
+                click.echo(f"    ✓ Reused {output_file.name} from base profile")
+                summary.reused.append(class_key)
+                continue
 
-                click.echo(f"    ✓ Generated {output_file.name}")
-                success_count += 1
+            if combined_schema is not None:
+                combined_modules[combined_schema[1][class_key]] = {
+                    "imports": imports.get(class_key) if class_key in imports else None,
+                    "output_path": str(staged_file),
+                }
+                continue
 
+            try:
+                unresolved = _generate_sempyro_module(
+                    class_key, schema_file, staged_file, imports, import_resolver, template_cache
+                )
+                summary.add_module(class_key, staged_file, unresolved, class_key not in imports, cache, fingerprints)
             except Exception as e:
                 click.echo(f"Error: Failed to generate {class_name}: {e}", err=True)
                 traceback.print_exc()
                 exit(1)
 
+        if combined_modules:
+            unresolved = _generate_combined_modules(
+                combined_schema[0], combined_modules, imports, import_resolver, template_cache
+            )
+            for class_id, module_config in combined_modules.items():
+                module_file = Path(module_config["output_path"])
+                summary.add_module(
+                    module_file.stem,
+                    module_file,
+                    unresolved[class_id],
+                    module_config["imports"] is None,
+                    cache,
+                    fingerprints,
+                )
+
         click.echo()
 
         # Format generated files with ruff
-        if success_count > 0:
+        if (summary.generated > 0 or summary.reused) and format_output:
             click.echo("[4/4] Formatting generated Python files with ruff...")
-            try:
-                # Find ruff in the same environment as this Python interpreter
-                python_bin_dir = Path(sys.executable).parent
-                ruff_path = python_bin_dir / "ruff"
+            format_with_ruff([staging_path])
+            click.echo()
+
+        for staged_file in sorted(staging_path.glob("*.py")):
+            writer.commit(staged_file, sempyro_class_output_path / staged_file.name)
+
+        summary.echo(writer, linkml_output_path, sempyro_output_path)
+
+        if summary.unresolved_imports:
+            exit(1)
+
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        if click.get_current_context().obj:
+            traceback.print_exc()
+        exit(1)
 
-                # Fall back to system ruff if not found in environment
-                if not ruff_path.exists():
-                    ruff_path = "ruff"
 
-                format_cmd = [
-                    str(ruff_path),
-                    "format",
-                    str(sempyro_class_output_path),
-                ]
+def _echo_benchmark_result(result: ModuleBenchmark) -> None:
+    """Print the metrics and errors of a benchmarked module."""
+    click.echo(f"  {result.module}")
+    if result.import_seconds is not None:
+        click.echo(f"    import: {result.import_seconds * 1000:.2f} ms")
+    if result.build_seconds is not None:
+        click.echo(f"    model build: {result.build_seconds * 1000:.2f} ms")
+    if result.validations_per_second is not None:
+        click.echo(f"    validation: {result.validations_per_second:,.0f} instances/s")
+    for error in result.errors:
+        click.echo(f"    ✗ {error}", err=True)
+
+
+def _echo_benchmark_summary(results: List[ModuleBenchmark], regressions: List[str], tolerance: float) -> bool:
+    """Print the summary of a benchmark run, and return whether it failed."""
+    not_imported = [result.module for result in results if result.import_seconds is None]
+    not_validated = [result.module for result in results if result.import_seconds is not None and result.errors]
+
+    click.echo("=" * 80)
+    click.echo("Benchmark complete!")
+    click.echo(f"  Modules benchmarked: {len(results) - len(not_imported)}")
+    for title, items in (
+        ("Modules that could not be imported:", not_imported),
+        ("Modules whose models could not be validated:", not_validated),
+        (f"Regressions (tolerance {tolerance:.0%}):", regressions),
+    ):
+        if items:
+            click.echo(f"  {title}")
+            for item in items:
+                click.echo(f"    - {item}")
+    click.echo("=" * 80)
+    return bool(not_imported or not_validated or regressions)
+
+
+def _compare_to_baseline(results: List[ModuleBenchmark], baseline_path: Path, tolerance: float) -> List[str]:
+    """Compare benchmark results to a stored baseline, exiting if the baseline does not exist."""
+    if not baseline_path.exists():
+        click.echo(f"Error: Baseline not found at {baseline_path}", err=True)
+        exit(1)
+    regressions = find_regressions(results, load_baseline(baseline_path), tolerance)
+    if not regressions:
+        click.echo(f"  ✓ No regressions compared to {baseline_path}")
+    return regressions
 
-                result = subprocess.run(format_cmd, capture_output=True, text=True, check=True)
 
-                click.echo(f"  ✓ Formatted files in {sempyro_class_output_path}")
+@main.command()
+@click.option(
+    "-i",
+    "--input-path",
+    type=click.Path(exists=True, file_okay=False),
+    default="./outputs/sempyro_classes",
+    help="Directory with generated SeMPyRO Pydantic classes.",
+)
+@click.option(
+    "--instances",
+    type=click.IntRange(min=1),
+    default=1000,
+    help="Number of synthetic instances validated per model.",
+)
+@click.option(
+    "--repeat",
+    type=click.IntRange(min=1),
+    default=3,
+    help="Number of repetitions per measurement; the best timing is kept.",
+)
+@click.option(
+    "--baseline",
+    type=click.Path(),
+    default=None,
+    help="JSON baseline to compare against.",
+)
+@click.option(
+    "--update-baseline",
+    is_flag=True,
+    default=False,
+    help="Write the results to the baseline file instead of comparing against it.",
+)
+@click.option(
+    "--tolerance",
+    type=click.FloatRange(min=0),
+    default=0.25,
+    help="Allowed relative slowdown compared to the baseline (0.25 = 25%).",
+)
+def benchmark(
+    input_path: str,
+    instances: int,
+    repeat: int,
+    baseline: str,
+    update_baseline: bool,
+    tolerance: float,
+) -> None:
+    """Benchmark generated SeMPyRO Pydantic classes.
 
-                if result.stdout:
-                    click.echo(f"  {result.stdout.strip()}")
+    Imports every generated module and measures its import time, model build
+    time and validation throughput on synthetic instance payloads. Fails when
+    a module cannot be imported, when no valid synthetic payload can be created
+    or validated for one of its models, or when it regressed compared to the baseline.
+    """
+    try:
+        sempyro_path = Path(input_path)
+        baseline_path = Path(baseline) if baseline else None
 
-            except subprocess.CalledProcessError as e:
-                click.echo("  ⚠ Warning: ruff format failed", err=True)
-                if e.stderr:
-                    click.echo(f"  {e.stderr.strip()}", err=True)
-            except FileNotFoundError:
-                click.echo(
-                    "  ⚠ Warning: ruff not found. Install with: pip install ruff",
-                    err=True,
+        click.echo("=" * 80)
+        click.echo("SeMPyRO Pydantic Class Benchmark")
+        click.echo("=" * 80)
+        click.echo()
+
+        if update_baseline and baseline_path is None:
+            click.echo("Error: --update-baseline requires --baseline", err=True)
+            exit(1)
+
+        results = benchmark_directory(sempyro_path, instances, repeat)
+        if not results:
+            click.echo(f"No generated Python files found in {sempyro_path}", err=True)
+            exit(1)
+
+        for result in results:
+            _echo_benchmark_result(result)
+        click.echo()
+
+        regressions = []
+        if update_baseline:
+            write_baseline(results, baseline_path)
+            click.echo(f"  ✓ Baseline written to {baseline_path}")
+        elif baseline_path is not None:
+            regressions = _compare_to_baseline(results, baseline_path, tolerance)
+
+        if _echo_benchmark_summary(results, regressions, tolerance):
+            exit(1)
+
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        if click.get_current_context().obj:
+            traceback.print_exc()
+        exit(1)
+
+
+@main.command()
+@click.option(
+    "-i",
+    "--input-excel",
+    type=click.Path(exists=True, dir_okay=False),
+    multiple=True,
+    help="Excel file to parse; can be given multiple times (default: the workbooks in inputs).",
+)
+@click.option(
+    "--reader",
+    "readers",
+    type=click.Choice(READER_BACKENDS),
+    multiple=True,
+    help="Reader backend to benchmark; can be given multiple times (default: all backends).",
+)
+@click.option(
+    "--repeat",
+    type=click.IntRange(min=1),
+    default=3,
+    help="Number of repetitions per measurement; the best timing is kept.",
+)
+def benchmark_readers(input_excel: tuple, readers: tuple, repeat: int) -> None:
+    """Benchmark the Excel reader backends.
+
+    Parses every sheet of each workbook with each reader backend, and compares
+    the timings with loading the workbook's cached snapshot.
+    """
+    try:
+        workbooks = [Path(path) for path in input_excel] or sorted(
+            (Path(__file__).parent.parent.resolve() / "inputs").glob("*.xlsx")
+        )
+
+        click.echo("=" * 80)
+        click.echo("Excel Reader Benchmark")
+        click.echo("=" * 80)
+        click.echo()
+
+        if not workbooks:
+            click.echo("Error: No workbooks to benchmark", err=True)
+            exit(1)
+
+        results = benchmark_reader_backends(workbooks, readers or READER_BACKENDS, repeat)
+        for workbook in dict.fromkeys(result.workbook for result in results):
+            click.echo(f"  {workbook}")
+            for result in results:
+                if result.workbook != workbook:
+                    continue
+                if result.seconds is not None:
+                    click.echo(f"    {result.reader}: {result.seconds * 1000:.1f} ms")
+                else:
+                    click.echo(f"    ⚠ Warning: {result.reader} skipped: {result.error}", err=True)
+        click.echo()
+
+        click.echo("=" * 80)
+        click.echo("Benchmark complete!")
+        click.echo(f"  Workbooks benchmarked: {len(workbooks)}")
+        click.echo("=" * 80)
+
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        if click.get_current_context().obj:
+            traceback.print_exc()
+        exit(1)
+
+
+@main.command()
+@click.option(
+    "-i",
+    "--input-excel",
+    type=click.Path(exists=True, dir_okay=False),
+    required=True,
+    help="Path to source metadata Excel file.",
+)
+@click.option(
+    "-o",
+    "--output-path",
+    type=click.Path(file_okay=False),
+    required=True,
+    help="Source directory to write a file per sheet to.",
+)
+@click.option(
+    "--format",
+    "source_format",
+    type=click.Choice(SOURCE_FORMATS),
+    default="csv",
+    help="Format of the sheet files.",
+)
+@reader_option
+def export_source(input_excel: str, output_path: str, source_format: str, reader: Optional[str]) -> None:
+    """Export a metadata workbook to a source directory.
+
+    Writes every sheet to a CSV or TSV file, so the metadata can be versioned
+    and reviewed as plain text. The directory can be given wherever a source
+    Excel file is accepted, or turned back into a workbook with import-source.
+    """
+    try:
+        click.echo("=" * 80)
+        click.echo("Source Export")
+        click.echo("=" * 80)
+        click.echo()
+
+        writer = OutputWriter()
+        sheet_files = export_source_files(input_excel, output_path, source_format, reader, writer)
+        for sheet_file in sheet_files:
+            click.echo(f"  ✓ {sheet_file}")
+        click.echo()
+
+        click.echo("=" * 80)
+        click.echo("Export complete!")
+        click.echo(f"  Sheets exported: {len(sheet_files)}")
+        click.echo(f"  Files: {writer.summary()}")
+        click.echo(f"  Output directory: {output_path}")
+        click.echo("=" * 80)
+
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        if click.get_current_context().obj:
+            traceback.print_exc()
+        exit(1)
+
+
+@main.command()
+@click.option(
+    "-i",
+    "--input-path",
+    type=click.Path(exists=True, file_okay=False),
+    required=True,
+    help="Source directory with a CSV or TSV file per sheet.",
+)
+@click.option(
+    "-o",
+    "--output-excel",
+    type=click.Path(dir_okay=False),
+    required=True,
+    help="Path of the Excel file to create.",
+)
+def import_source(input_path: str, output_excel: str) -> None:
+    """Create a metadata workbook from a source directory.
+
+    Writes a sheet per CSV or TSV file, for tools that need an Excel file.
+    The workbook has no formatting.
+    """
+    try:
+        click.echo("=" * 80)
+        click.echo("Source Import")
+        click.echo("=" * 80)
+        click.echo()
+
+        writer = OutputWriter()
+        sheet_names = import_source_files(input_path, output_excel, writer)
+        for sheet_name in sheet_names:
+            click.echo(f"  ✓ {sheet_name}")
+        click.echo()
+
+        click.echo("=" * 80)
+        click.echo("Import complete!")
+        click.echo(f"  Sheets imported: {len(sheet_names)}")
+        click.echo(f"  Files: {writer.summary()}")
+        click.echo(f"  Output file: {output_excel}")
+        click.echo("=" * 80)
+
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        if click.get_current_context().obj:
+            traceback.print_exc()
+        exit(1)
+
+
+@main.command()
+@click.option(
+    "-d",
+    "--data",
+    type=click.Path(exists=True),
+    multiple=True,
+    required=True,
+    help="RDF file (or directory of Turtle files) with the data to validate; can be given multiple times.",
+)
+@click.option(
+    "-s",
+    "--shapes-path",
+    type=click.Path(exists=True),
+    default="./outputs/shacl_shapes",
+    help="SHACL Turtle file, or directory with the generated shapes.",
+)
+@click.option(
+    "-o",
+    "--output-path",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="File to write the merged SHACL validation report to (Turtle).",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of worker processes (default: CPU count).",
+)
+@click.option(
+    "--partition-size",
+    type=click.IntRange(min=1),
+    default=100,
+    help="Maximum number of focus nodes validated per partition.",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(["shacl", "sparql"]),
+    default="shacl",
+    help="Validate with pyshacl, or with SPARQL queries compiled from the shapes.",
+)
+@click.option(
+    "--store",
+    type=click.Choice(STORE_BACKENDS),
+    default="oxigraph",
+    help="Store the SPARQL queries run on (--engine sparql only).",
+)
+def validate(
+    data: tuple,
+    shapes_path: str,
+    output_path: str,
+    jobs: int,
+    partition_size: int,
+    engine: str,
+    store: str,
+) -> None:
+    """Validate RDF data against the generated SHACL shapes.
+
+    \b
+    With the shacl engine, the focus nodes of the shapes (the instances of
+    their target classes) are split into partitions that are validated in
+    parallel worker processes; requires the optional pyshacl dependency.
+    With the sparql engine, every constraint is compiled to a SPARQL query
+    that returns all its violations at once from an indexed store.
+
+    Fails when the data does not conform to the shapes.
+    """
+    try:
+        click.echo("=" * 80)
+        click.echo("SHACL Validation")
+        click.echo("=" * 80)
+        click.echo()
+
+        click.echo(f"Validating {', '.join(data)} against {shapes_path}...")
+        try:
+            if engine == "sparql":
+                queries = compile_shapes(load_graph([shapes_path]))
+                click.echo(f"  ✓ Compiled {len(queries)} SPARQL queries")
+                violations = run_queries(queries, load_store(list(data), store))
+                conforms, results, report = not violations, len(violations), violations_report(violations)
+                click.echo(f"  ✓ Ran {len(queries)} queries on the {store} store")
+            else:
+                result = validate_partitioned(list(data), [shapes_path], jobs, partition_size)
+                conforms, results, report = result.conforms, result.results, result.report
+                click.echo(f"  ✓ Validated {result.focus_nodes} focus nodes in {result.partitions} partitions")
+        except ImportError as e:
+            click.echo(f"Error: {e}", err=True)
+            exit(1)
+
+        if output_path:
+            output_file = Path(output_path)
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+            report.serialize(output_file, format="turtle")
+            click.echo(f"  ✓ Validation report written to {output_file}")
+        click.echo()
+
+        click.echo("=" * 80)
+        click.echo("Validation complete!")
+        click.echo(f"  Conforms: {'yes' if conforms else 'no'}")
+        click.echo(f"  Validation results: {results}")
+        click.echo("=" * 80)
+
+        if not conforms:
+            exit(1)
+
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        if click.get_current_context().obj:
+            traceback.print_exc()
+        exit(1)
+
+
+@main.command()
+@click.option(
+    "-i",
+    "--input-path",
+    type=click.Path(exists=True),
+    default="./outputs/shacl_shapes",
+    help="SHACL Turtle file, or directory with the generated shapes.",
+)
+@click.option(
+    "-o",
+    "--output-path",
+    type=click.Path(file_okay=False),
+    default="./outputs/sparql_queries",
+    help="Output directory for the SPARQL queries.",
+)
+def sparql_from_shacl(
+    input_path: str,
+    output_path: str,
+) -> None:
+    """Compile SHACL shapes to SPARQL validation queries.
+
+    Writes one SELECT query per constraint, returning all focus nodes that
+    violate it, to validate data already loaded into a triple store.
+    """
+    try:
+        click.echo("=" * 80)
+        click.echo("SPARQL Validation Query Generator from SHACL")
+        click.echo("=" * 80)
+        click.echo()
+
+        queries = compile_shapes(load_graph([input_path]))
+        if not queries:
+            click.echo(f"No shapes with a sh:targetClass found in {input_path}", err=True)
+            exit(1)
+
+        paths = write_queries(queries, Path(output_path))
+        click.echo(f"  ✓ Written {len(paths)} queries to {output_path}")
+        click.echo()
+
+        click.echo("=" * 80)
+        click.echo("Compilation complete!")
+        click.echo("=" * 80)
+
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        if click.get_current_context().obj:
+            traceback.print_exc()
+        exit(1)
+
+
+def _build_profile(
+    ctx: click.Context,
+    profile: BuildProfile,
+    template_cache: bool,
+    intermediate_shaclplay: bool,
+    build_date: Optional[datetime],
+    reader: Optional[str],
+    seed_profile_cache: bool = False,
+) -> None:
+    """Run the steps of a build profile, raising SystemExit if a step fails."""
+    # SHACLPlay files that are only converted to Turtle are written uncompressed to a temporary directory
+    intermediate = intermediate_shaclplay and "shacl-from-shaclplay" in profile.steps
+    with (
+        intermediate_directory(f"shaclplay-{profile.name}-")
+        if intermediate
+        else nullcontext(str(profile.shaclplay_output_path))
+    ) as shaclplay_path:
+        if "shaclplay" in profile.steps:
+            ctx.invoke(
+                shaclplay,
+                input_excel=str(profile.input_excel),
+                output_path=shaclplay_path,
+                namespace=profile.namespace,
+                base_profile=str(profile.base_profile) if profile.base_profile else None,
+                seed_profile_cache=seed_profile_cache,
+                compress=not intermediate,
+                build_date=build_date,
+                reader=reader,
+            )
+        if "shacl-from-shaclplay" in profile.steps:
+            ctx.invoke(
+                shacl_from_shaclplay,
+                input_path=shaclplay_path,
+                output_path=str(profile.shacl_output_path),
+                build_date=build_date,
+                reader=reader,
+            )
+    if "sempyro" in profile.steps:
+        sempyro_options = {
+            "input_excel": str(profile.input_excel),
+            "namespace": profile.namespace,
+            "sempyro_output_path": str(profile.sempyro_output_path),
+            "template_cache": template_cache,
+            "format_output": False,
+            "base_profile": str(profile.base_profile) if profile.base_profile else None,
+            "seed_profile_cache": seed_profile_cache,
+            "reader": reader,
+        }
+        if profile.linkml_output_path is not None:
+            sempyro_options["linkml_output_path"] = str(profile.linkml_output_path)
+        if profile.imports_path is not None:
+            sempyro_options["imports_path"] = str(profile.imports_path)
+        ctx.invoke(sempyro, **sempyro_options)
+
+
+def _load_build_profiles(manifest: Optional[str], input_excel: tuple, output_path: str) -> List[BuildProfile]:
+    """Load the build profiles of a manifest or of the given workbooks, exiting if they cannot be built."""
+    if manifest:
+        try:
+            profiles = load_manifest(manifest)
+        except Exception as e:
+            click.echo(f"Error: Failed to load manifest {manifest}: {e}", err=True)
+            exit(1)
+    elif input_excel:
+        profiles = profiles_from_workbooks(list(input_excel), output_path)
+    else:
+        click.echo("Error: Provide --manifest or at least one --input-excel", err=True)
+        exit(1)
+
+    for profile in profiles:
+        if not profile.input_excel.exists():
+            click.echo(f"Error: Input Excel file not found at {profile.input_excel}", err=True)
+            exit(1)
+        if not profile.steps:
+            click.echo(f"Error: No output directories configured for {profile.name}", err=True)
+            exit(1)
+    return profiles
+
+
+def _build_waves(profiles: List[BuildProfile]) -> List[List[BuildProfile]]:
+    """Group profiles into waves built one after another, base profiles before the profiles derived from them."""
+    by_input = {profile.input_excel.resolve(): profile for profile in profiles}
+
+    def depth(profile: BuildProfile, derived: Tuple[BuildProfile, ...] = ()) -> int:
+        base = by_input.get(profile.base_profile.resolve()) if profile.base_profile is not None else None
+        if base is None or base in derived:
+            return 0
+        return depth(base, derived + (profile,)) + 1
+
+    waves = {}
+    for profile in profiles:
+        waves.setdefault(depth(profile), []).append(profile)
+    return [waves[number] for number in sorted(waves)]
+
+
+def _run_waves(profiles: List[BuildProfile], run: Callable[[BuildProfile], bool], workers: int) -> List[bool]:
+    """Build the profiles in parallel, wave by wave, returning whether each profile succeeded."""
+    outcomes = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for wave in _build_waves(profiles):
+            outcomes.update(zip(map(id, wave), executor.map(run, wave), strict=True))
+    return [outcomes[id(profile)] for profile in profiles]
+
+
+@main.command()
+@click.option(
+    "-m",
+    "--manifest",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="Manifest YAML file listing the workbooks, namespaces and output directories to build.",
+)
+@click.option(
+    "-i",
+    "--input-excel",
+    type=click.Path(exists=True),
+    multiple=True,
+    help="Source metadata Excel file or source directory; can be given multiple times. "
+    "Ignored when --manifest is given.",
+)
+@click.option(
+    "-o",
+    "--output-path",
+    type=click.Path(),
+    default="./outputs",
+    help="Root output directory when building from --input-excel.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of workbooks built in parallel (default: number of workbooks, at most the CPU count).",
+)
+@click.option(
+    "--template-cache/--no-template-cache",
+    default=True,
+    help="Persist compiled Jinja templates in the on-disk cache between runs.",
+)
+@click.option(
+    "--intermediate-shaclplay/--keep-shaclplay",
+    default=False,
+    help="Treat the SHACLPlay files of workbooks converted to SHACL Turtle as intermediates: write them uncompressed "
+    "to a temporary directory (on tmpfs when available) and remove them after conversion, keeping only the Turtle "
+    "files.",
+)
+@build_date_option("Build date of reproducible mode, in which identical workbooks give byte-identical outputs.")
+@reader_option
+@click.pass_context
+def build(
+    ctx: click.Context,
+    manifest: str,
+    input_excel: tuple,
+    output_path: str,
+    jobs: int,
+    template_cache: bool,
+    intermediate_shaclplay: bool,
+    build_date: Optional[datetime],
+    reader: Optional[str],
+) -> None:
+    """Build the artifacts of several metadata workbooks in one process.
+
+    Runs shaclplay, shacl-from-shaclplay and sempyro for every workbook. The
+    workbooks are built in parallel and share the loaded SHACLPlay template,
+    import index and compiled templates; the generated Python files are
+    formatted with a single ruff run at the end.
+    """
+    try:
+        click.echo("=" * 80)
+        click.echo("Metadata Artifact Batch Build")
+        click.echo("=" * 80)
+        click.echo()
+
+        profiles = _load_build_profiles(manifest, input_excel, output_path)
+        for profile in profiles:
+            click.echo(f"  {profile.name}: {profile.input_excel} -> {', '.join(profile.steps)}")
+        click.echo()
+
+        workers = jobs or min(len(profiles), os.cpu_count() or 1)
+        # Base profiles seed the profile cache, so the profiles derived from them reuse their unchanged classes
+        base_inputs = {profile.base_profile.resolve() for profile in profiles if profile.base_profile is not None}
+
+        def run(profile: BuildProfile) -> bool:
+            try:
+                _build_profile(
+                    ctx,
+                    profile,
+                    template_cache,
+                    intermediate_shaclplay,
+                    build_date,
+                    reader,
+                    seed_profile_cache=profile.input_excel.resolve() in base_inputs,
                 )
+                return True
+            except SystemExit as e:
+                return e.code in (None, 0)
+
+        succeeded = _run_waves(profiles, run, workers)
+
+        sempyro_dirs = [
+            profile.sempyro_output_path
+            for profile, ok in zip(profiles, succeeded, strict=True)
+            if ok and "sempyro" in profile.steps and profile.sempyro_output_path.exists()
+        ]
+        if sempyro_dirs:
+            click.echo("Formatting generated Python files with ruff...")
+            format_with_ruff(list(dict.fromkeys(sempyro_dirs)))
             click.echo()
 
+        failed = [profile.name for profile, ok in zip(profiles, succeeded, strict=True) if not ok]
+
         click.echo("=" * 80)
-        click.echo("Generation complete!")
-        click.echo(f"  Successfully generated: {success_count} classes")
-        click.echo(f"  LinkML schemas: {linkml_output_path}")
-        click.echo(f"  SeMPyRO classes: {sempyro_output_path}")
-        if no_imports:
-            click.echo("  Classes skipped due to missing imports configuration:")
-            for cls in no_imports:
-                click.echo(f"    - {cls}")
+        click.echo("Build complete!")
+        click.echo(f"  Successfully built: {len(profiles) - len(failed)} of {len(profiles)} workbooks")
+        if failed:
+            click.echo("  Failed workbooks:")
+            for name in failed:
+                click.echo(f"    - {name}")
         click.echo("=" * 80)
 
+        if failed:
+            exit(1)
+
     except Exception as e:
         click.echo(f"Error: {e}", err=True)
         if click.get_current_context().obj:
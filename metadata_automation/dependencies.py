@@ -0,0 +1,227 @@
+"""
+Dependency graph of the classes of a profile.
+
+Classes reference each other through the nested shapes of their properties
+('SHACL_sh:node', e.g. 'hri:KindShape' for the class hri:Kind), the class they
+inherit from ('SeMPyRO_inherits_from') and the classes they import
+('SeMPyRO_import_classes'). The graph resolves these references up front,
+reports references to classes missing from the profile and reference cycles,
+and orders the classes in levels: a class only references classes of earlier
+levels, so the classes of one level can be generated concurrently.
+
+Nested shapes may reference each other in a cycle, which is valid SHACL, e.g.
+Dataset -> Distribution -> DataService -> Dataset. The classes of such a cycle
+(a strongly connected component of the graph) are scheduled as one unit, in
+the same level. Cycles that include inheritance or imports are an error.
+
+References to classes of namespaces the profile defines no classes in, e.g.
+'dcat:Resource', are external and not part of the graph.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from graphlib import TopologicalSorter
+from typing import Dict, Iterable, Iterator, List, Mapping, Set, Tuple
+
+from metadata_automation.model import Class
+from metadata_automation.profiles import content_fingerprint
+
+
+@dataclass(frozen=True)
+class Reference:
+    """A reference of a class to another class."""
+
+    source: str
+    target: str
+    kind: str
+
+    def __str__(self) -> str:
+        return f"{self.source} -> {self.target} ({self.kind})"
+
+
+def _references(model_class: Class) -> Iterator[Reference]:
+    """Yield the references of a class, with the classes they target."""
+    for model_property in model_class.properties:
+        # The converter only writes sh:node for properties whose range is a class
+        if model_property.node is None or model_property.range is None or not model_property.range.is_class:
+            continue
+        shape = model_property.node.strip()
+        if ":" not in shape:
+            # Plain shape names are in the namespace of the class
+            shape = f"{model_class.prefix}:{shape}"
+        yield Reference(model_class.uri, shape.removesuffix("Shape"), "SHACL_sh:node")
+    if model_class.inherits_from is not None:
+        yield Reference(model_class.uri, model_class.inherits_from.strip(), "SeMPyRO_inherits_from")
+    for import_class in model_class.import_classes:
+        yield Reference(model_class.uri, import_class, "SeMPyRO_import_classes")
+
+
+class ClassGraph:
+    """References between the classes of a profile."""
+
+    def __init__(self, classes: Iterable[Class]):
+        """
+        Build the graph of classes.
+
+        Args:
+            classes: Classes of the profile, e.g. Profile.classes
+
+        Raises:
+            ValueError: If two classes have the same URI
+        """
+        self.classes: Dict[str, Class] = {}
+        for model_class in classes:
+            if model_class.uri in self.classes:
+                raise ValueError(
+                    f"Class '{model_class.uri}' is defined on sheets "
+                    f"'{self.classes[model_class.uri].sheet_name}' and '{model_class.sheet_name}'"
+                )
+            self.classes[model_class.uri] = model_class
+        self.dependencies: Dict[str, Set[str]] = {uri: set() for uri in self.classes}
+        # References by inheritance and imports, which may not be part of a cycle
+        self.strict_dependencies: Dict[str, Set[str]] = {uri: set() for uri in self.classes}
+        self.dangling: List[Reference] = []
+
+        namespaces = {model_class.prefix for model_class in self.classes.values()}
+        for model_class in self.classes.values():
+            for reference in _references(model_class):
+                if reference.target in self.classes:
+                    # A shape may nest itself (e.g. a dataset part of a dataset), a class not inherit from itself
+                    if reference.target != reference.source or reference.kind != "SHACL_sh:node":
+                        self.dependencies[reference.source].add(reference.target)
+                    if reference.kind != "SHACL_sh:node":
+                        self.strict_dependencies[reference.source].add(reference.target)
+                elif reference.target.split(":")[0] in namespaces:
+                    self.dangling.append(reference)
+        self.components = self._components()
+
+    def _reachable(self, uri: str) -> Set[str]:
+        """Classes referenced by a class, directly or indirectly, including itself."""
+        found = {uri}
+        pending = [uri]
+        while pending:
+            for target in self.dependencies[pending.pop()]:
+                if target not in found:
+                    found.add(target)
+                    pending.append(target)
+        return found
+
+    def _path(self, source: str, target: str) -> List[str]:
+        """Shortest chain of references from one class to another, including both."""
+        previous = {source: None}
+        pending = deque([source])
+        while target not in previous:
+            uri = pending.popleft()
+            for reference in sorted(self.dependencies[uri]):
+                previous.setdefault(reference, uri)
+                pending.append(reference)
+        path = [target]
+        while previous[path[-1]] is not None:
+            path.append(previous[path[-1]])
+        return path[::-1]
+
+    def _components(self) -> Dict[str, Tuple[str, ...]]:
+        """Strongly connected components of the graph, the classes in the order of the profile, by class URI."""
+        reachable = {uri: self._reachable(uri) for uri in self.classes}
+        return {
+            uri: tuple(other for other in self.classes if other in reachable[uri] and uri in reachable[other])
+            for uri in self.classes
+        }
+
+    @property
+    def cycles(self) -> List[Tuple[str, ...]]:
+        """
+        Classes that reference each other in a cycle through nested shapes.
+
+        Returns:
+            URIs of the classes of each cycle, in the order of the profile
+        """
+        return sorted({component for component in self.components.values() if len(component) > 1})
+
+    def levels(self) -> List[Tuple[Class, ...]]:
+        """
+        Order the classes in levels, each referencing only classes of earlier levels.
+
+        The classes of a cycle of nested shapes are in the same level, see cycles.
+
+        Returns:
+            List of levels, the classes of a level in the order of the profile
+
+        Raises:
+            ValueError: If classes reference each other in a cycle that includes inheritance or imports
+        """
+        # Every reference within a strongly connected component is part of a cycle
+        for source, targets in self.strict_dependencies.items():
+            for target in targets:
+                if target in self.components[source]:
+                    cycle = [source, *self._path(target, source)]
+                    raise ValueError(f"Classes reference each other in a cycle: {' -> '.join(cycle)}")
+
+        # Cycles are scheduled as a unit, by their first class
+        sorter = TopologicalSorter(
+            {
+                component[0]: {self.components[target][0] for uri in component for target in self.dependencies[uri]}
+                - {component[0]}
+                for component in self.components.values()
+            }
+        )
+        sorter.prepare()
+        order = {uri: position for position, uri in enumerate(self.classes)}
+        levels = []
+        while sorter.is_active():
+            ready = sorter.get_ready()
+            members = sorted((uri for first in ready for uri in self.components[first]), key=order.__getitem__)
+            levels.append(tuple(self.classes[uri] for uri in members))
+            sorter.done(*ready)
+        return levels
+
+    def dependents(self, uris: Iterable[str]) -> Set[str]:
+        """
+        Find the classes that reference any of the given classes, directly or indirectly.
+
+        Args:
+            uris: URIs of classes, e.g. of the classes that changed
+
+        Returns:
+            URIs of the dependent classes, excluding the given classes
+        """
+        uris = set(uris)
+        found = set()
+        pending = list(uris)
+        while pending:
+            target = pending.pop()
+            for source, dependencies in self.dependencies.items():
+                if target in dependencies and source not in found and source not in uris:
+                    found.add(source)
+                    pending.append(source)
+        return found
+
+    def chain_fingerprints(self, fingerprints: Mapping[str, str]) -> Dict[str, str]:
+        """
+        Combine the fingerprint of each class with those of the classes it references.
+
+        A changed class then changes the fingerprints of exactly its dependents,
+        so incremental builds regenerate them along with it.
+
+        Args:
+            fingerprints: Fingerprint of the artifact of each class, by class URI
+
+        Returns:
+            Chained fingerprints, by class URI
+
+        Raises:
+            ValueError: If classes reference each other in a cycle that includes inheritance or imports
+        """
+        chained = {}
+        for level in self.levels():
+            for model_class in level:
+                component = self.components[model_class.uri]
+                dependencies = sorted(
+                    {uri for member in component for uri in self.dependencies[member]} - set(component)
+                )
+                # A class of a cycle depends on every class of the cycle, so they share its fingerprints
+                shared = [fingerprints[uri] for uri in component if uri != model_class.uri]
+                chained[model_class.uri] = content_fingerprint(
+                    fingerprints[model_class.uri], [chained[uri] for uri in dependencies], *([shared] if shared else [])
+                )
+        return chained
@@ -1,24 +1,53 @@
+import keyword
 import re
-import shutil
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 
-import pandas as pd
 import yaml
 
+from metadata_automation.model import Class, Profile, Property, load_profile
+from metadata_automation.output import OutputWriter
+from metadata_automation.prefixes import used_prefixes
+from metadata_automation.vocabularies import VocabularyStore
+
+# Ranges accepting any IRI, which an enum of a controlled vocabulary replaces
+IRI_RANGES = ("AnyHttpUrl", "AnyUrl", "URIRef")
+
+# Hand-written SeMPyRO inputs, resolved from the repository rather than the working directory
+SEMPYRO_INPUTS = Path(__file__).parent.parent.parent.resolve() / "inputs/sempyro"
+
+# Schemas shared by all namespaces, by import; copied to the output directory when a class schema imports them
+SHARED_SCHEMAS = {
+    "../rdf_model": ("RDF model", SEMPYRO_INPUTS / "rdf_model.yaml"),
+    "../sempyro_types": ("Sempyro types", SEMPYRO_INPUTS / "sempyro_types.yaml"),
+}
+
 
 class LinkMLCreator:
-    def __init__(self, output_path: Path) -> None:
+    def __init__(
+        self,
+        output_path: Path,
+        used_prefixes_only: bool = False,
+        vocabularies: Optional[VocabularyStore] = None,
+    ) -> None:
         self.output_path = output_path
-        self.filtered_sheets = None
+        self.used_prefixes_only = used_prefixes_only
+        # With a vocabulary store, IRI ranges of controlled vocabulary slots become enums
+        self.vocabularies = vocabularies
+        # Schemas are only written when their content changed
+        self.writer = OutputWriter()
+        self.profile: Optional[Profile] = None
         self.prefixes = {}
-        self.table_classes = None
         self.linkml_data = {}
+        # Shared schemas imported by the class schemas built so far
+        self.shared_imports = set()
         self.validation_logic = self._load_validation_logic()
+        # Hand-written vocabulary types, which an enum of a controlled vocabulary also replaces
+        self.vocabulary_ranges = self._load_vocabulary_ranges()
 
     def _load_validation_logic(self) -> dict:
         """Load validation logic from YAML file if it exists."""
-        validation_logic_path = Path("./inputs/sempyro/validation_logic.yaml")
+        validation_logic_path = SEMPYRO_INPUTS / "validation_logic.yaml"
 
         if not validation_logic_path.exists():
             return {}
@@ -31,39 +60,40 @@ class LinkMLCreator:
             print(f"Warning: Could not load validation logic: {e}")
             return {}
 
-    def load_excel(self, file_path: str, exclude_sheets: Optional[List[str]] = None) -> None:
+    @staticmethod
+    def _load_vocabulary_ranges() -> set:
+        """Load the names of the types annotated with 'vocabulary: true' in the Sempyro types schema."""
+        types_path = SHARED_SCHEMAS["../sempyro_types"][1]
+        if not types_path.exists():
+            return set()
+
+        with open(types_path, "r", encoding="utf-8") as file:
+            types = (yaml.safe_load(file) or {}).get("types") or {}
+        return {
+            name for name, type_def in types.items() if ((type_def or {}).get("annotations") or {}).get("vocabulary")
+        }
+
+    def load_excel(
+        self, file_path: str, exclude_sheets: Optional[List[str]] = None, reader: Optional[str] = None
+    ) -> None:
         """
-        Load an Excel file and return a dictionary of sheet data.
+        Load the prefixes and classes of a source workbook.
+
+        The workbook is read from its snapshot, see metadata_automation.workbook,
+        into a Profile, see metadata_automation.model. The snapshot holds all
+        sheets of the workbook, as other commands read them too; only the sheets
+        referenced in the 'sheet_name' column of 'classes' become classes.
 
         Args:
-            file_path: Path to the Excel file
+            file_path: Path to the Excel file, or source directory
             exclude_sheets: List of sheet names to exclude from the result
+            reader: Excel reader backend, see metadata_automation.workbook.resolve_reader
 
-        Returns:
-            Dictionary with sheet names as keys and DataFrame objects as values
+        Raises:
+            ValueError: If a class or property of the workbook is invalid
         """
-        if exclude_sheets is None:
-            exclude_sheets = []
-
-        # Read all sheets from the Excel file
-        all_sheets = pd.read_excel(file_path, sheet_name=None, dtype=str)
-
-        # Filter out excluded sheets
-        self.filtered_sheets = {
-            sheet_name: sheet_data.astype(str)
-            for sheet_name, sheet_data in all_sheets.items()
-            if sheet_name not in exclude_sheets
-        }
-
-        # Sheet with prefixes: 'prefixes'
-        table_prefixes = self.filtered_sheets["prefixes"]
-        table_prefixes = table_prefixes.map(lambda x: x.strip())
-        self.prefixes = dict(zip(table_prefixes["prefix"], table_prefixes["namespace"], strict=False))
-        # Sheet with a table 'classes'
-        # sheet_name, class_uri, SeMPyRO_inherits_from
-        # Dataset, dcat:Dataset, dcat:Resource
-        # Ontology names should also reflect application profiles. E.g., Health-RI Dataset should be hri:Dataset
-        self.table_classes = self.filtered_sheets["classes"]
+        self.profile = load_profile(file_path, exclude_sheets or (), reader)
+        self.prefixes = self.profile.prefixes
 
     def _create_id(self, ontology: str, ontology_class: str) -> str:
         return f"{self.prefixes[ontology]}{ontology_class}"
@@ -104,21 +134,101 @@ class LinkMLCreator:
             return f"{prefix}_{normalized_label}"
         return normalized_label
 
+    @staticmethod
+    def _local_name(iri: str) -> str:
+        return re.split(r"[/#]", iri.rstrip("/#"))[-1]
+
+    @staticmethod
+    def _enum_value_names(concepts: Iterable[str]) -> Dict[str, str]:
+        """
+        Name the permissible values of an enum after the local names of their concepts.
+
+        Like slot names, the names are normalized to Python identifiers, e.g. '1st-level' becomes 'number_1st_level'
+        and 'class' becomes 'class_'; concepts with the same name in different paths are numbered, e.g. 'HEAL_2'.
+
+        Args:
+            concepts: Concept IRIs of the vocabulary
+
+        Returns:
+            Dictionary of concept IRI to the name of its permissible value
+        """
+        names = {}
+        used = set()
+        for concept in concepts:
+            name = re.sub(r"_+", "_", re.sub(r"\W", "_", LinkMLCreator._local_name(concept), flags=re.ASCII)).strip("_")
+            name = name or "value"
+            if name[0].isdigit():
+                name = f"number_{name}"
+            if keyword.iskeyword(name):
+                name = f"{name}_"
+            unique_name, count = name, 1
+            while unique_name in used:
+                count += 1
+                unique_name = f"{name}_{count}"
+            used.add(unique_name)
+            names[concept] = unique_name
+        return names
+
+    def _vocabulary_enum(self, vocabulary_reference: str) -> Optional[tuple]:
+        """
+        Create the LinkML enum of a controlled vocabulary.
+
+        Args:
+            vocabulary_reference: Value of the controlled vocabulary column
+
+        Returns:
+            Tuple of the enum name and definition, or None if the vocabulary is not in the store
+        """
+        if self.vocabularies is None:
+            return None
+        vocabulary = self.vocabularies.get(vocabulary_reference)
+        if vocabulary is None:
+            return None
+        words = re.split(r"[^A-Za-z0-9]+", self._local_name(vocabulary.scheme))
+        enum_name = "".join(word[:1].upper() + word[1:] for word in words) + "Enum"
+        value_names = self._enum_value_names(vocabulary.concepts)
+        enum_def = {
+            "description": f"Concepts of {vocabulary.scheme}",
+            "enum_uri": vocabulary.scheme,
+            "permissible_values": {
+                concept: {"title": value_names[concept], "meaning": concept} for concept in vocabulary.concepts
+            },
+        }
+        return enum_name, enum_def
+
     def build_base(self):
-        for _index, row in self.table_classes.iterrows():
-            self.build_base_class(row)
+        for model_class in self.profile.classes:
+            self.build_base_class(model_class)
 
     def build_sempyro(self):
-        for _index, row in self.table_classes.iterrows():
-            self.build_base_class(row)
-            self.build_sempyro_class(row)
+        for model_class in self.profile.classes:
+            self.build_base_class(model_class)
+            self.build_sempyro_class(model_class)
 
-    def build_base_class(self, row):
-        class_uri = row["class_URI"]
-        class_description = row.get("description")
+    def stream_sempyro(self) -> int:
+        """
+        Build and write the SeMPyRO schema of each class, one class at a time.
 
-        ontology = class_uri.split(":")[0]
-        ontology_class = class_uri.split(":")[1]
+        Each schema is released as soon as it is written, so memory stays flat
+        for profiles with thousands of classes; linkml_data is left empty. The
+        shared schemas the classes import are copied at the end.
+
+        Returns:
+            Number of schemas written or unchanged
+        """
+        count = 0
+        for model_class in self.profile.classes:
+            self.build_base_class(model_class)
+            self.build_sempyro_class(model_class)
+            self._write_class_schema(self.linkml_data.pop(self._create_id(model_class.prefix, model_class.name)))
+            count += 1
+        self._copy_shared_schemas()
+        return count
+
+    def build_base_class(self, model_class: Class):
+        class_uri = model_class.uri
+        ontology = model_class.prefix
+        ontology_class = model_class.name
 
         linkml_id = self._create_id(ontology, ontology_class)
         self.linkml_data[linkml_id] = {}
@@ -127,43 +237,95 @@ class LinkMLCreator:
         self.linkml_data[linkml_id]["data"] = {}
         self.linkml_data[linkml_id]["data"]["id"] = linkml_id
         self.linkml_data[linkml_id]["data"]["title"] = class_uri.replace(":", "-")
-        self.linkml_data[linkml_id]["data"]["description"] = (
-            class_description if class_description != "nan" else class_uri.replace(":", "-")
-        )
+        self.linkml_data[linkml_id]["data"]["description"] = model_class.description or class_uri.replace(":", "-")
         self.linkml_data[linkml_id]["data"]["prefixes"] = self.prefixes
         self.linkml_data[linkml_id]["data"]["imports"] = ["linkml:types"]
 
-    def build_sempyro_class(self, row):
-        sheet_name = row["sheet_name"]
-        class_uri = row["class_URI"]
-        inherits_from = row.get("SeMPyRO_inherits_from")
-        class_description = str(row.get("description"))
-        import_classes = (
-            row.get("SeMPyRO_import_classes").split(",")
-            if (row.get("SeMPyRO_import_classes") and row.get("SeMPyRO_import_classes") != "nan")
-            else []
-        )
-        add_rdf_model = row.get("SeMPyRO_add_rdf_model")
-
-        ontology = class_uri.split(":")[0]
-        ontology_class = class_uri.split(":")[1]
+    def _build_sempyro_slot(self, model_property: Property, enums: dict) -> dict:
+        """
+        Build the LinkML slot of a property.
+
+        Args:
+            model_property: Property of the class sheet
+            enums: Enums of the schema, to which the enum of the controlled vocabulary of the property is added
+
+        Returns:
+            Slot definition
+        """
+        cardinality = model_property.cardinality
+        slot_def = {
+            "description": model_property.definition,
+            "slot_uri": model_property.uri,
+            "annotations": {
+                "rdf_term": model_property.rdf_term,
+                "rdf_type": model_property.rdf_type,
+            },
+            "required": cardinality is not None and cardinality.required,
+            "multivalued": cardinality is not None and cardinality.multivalued,
+        }
+
+        # Restrict IRI ranges and hand-written vocabulary types to the concepts of the controlled vocabulary
+        range_values = list(model_property.sempyro_range)
+        vocabulary_enum = self._vocabulary_enum(model_property.vocabulary) if model_property.vocabulary else None
+        replaced = set(IRI_RANGES) | self.vocabulary_ranges
+        if vocabulary_enum and any(r in replaced for r in range_values):
+            enum_name, enum_def = vocabulary_enum
+            enums[enum_name] = enum_def
+            range_values = list(dict.fromkeys(enum_name if r in replaced else r for r in range_values))
+
+        # Use any_of to create Union type in LinkML for several ranges
+        if len(range_values) > 1:
+            slot_def["any_of"] = [{"range": r} for r in range_values]
+        elif range_values:
+            slot_def["range"] = range_values[0]
+        return slot_def
+
+    def _build_sempyro_stubs(self, model_class: Class, class_dict: dict) -> dict:
+        """
+        Build the stubs of the imported and parent classes, and set the parent of the class.
+
+        Args:
+            model_class: Class of the workbook
+            class_dict: LinkML class definition, whose 'is_a' is set
+
+        Returns:
+            Dictionary of stub class name to stub definition
+        """
+        class_stubs = {}
+        for item in model_class.import_classes:
+            stub_class_name = self._ontology_name_to_class_name(item)
+            class_stubs[stub_class_name] = {"class_uri": item}
+        inherits_from = model_class.inherits_from
+        if inherits_from:
+            class_dict["is_a"] = self._ontology_name_to_class_name(inherits_from)
+            class_stubs[self._ontology_name_to_class_name(inherits_from)] = {"class_uri": inherits_from}
+        # Add RDFModel inheritance if SeMPyRO_add_rdf_model is true
+        elif model_class.add_rdf_model:
+            class_dict["is_a"] = "RDFModel"
+        return class_stubs
+
+    def build_sempyro_class(self, model_class: Class):
+        class_uri = model_class.uri
+        ontology = model_class.prefix
+        ontology_class = model_class.name
+
+        if model_class.annotations_ontology is None or model_class.annotations_iri is None:
+            raise ValueError(f"Class '{class_uri}' needs 'SeMPyRO_annotations_ontology' and 'SeMPyRO_annotations_IRI'")
 
         linkml_id = self._create_id(ontology, ontology_class)
 
         # Add Sempyro types
         self.linkml_data[linkml_id]["data"]["imports"].append("../sempyro_types")
+        self.shared_imports.add("../sempyro_types")
 
         # Add RDF model import if needed
-        if add_rdf_model and str(add_rdf_model).lower() in [
-            "true",
-            "1",
-            "yes",
-        ]:
+        if model_class.add_rdf_model:
             self.linkml_data[linkml_id]["data"]["imports"].append("../rdf_model")
+            self.shared_imports.add("../rdf_model")
 
         annotations = {
-            "ontology": row["SeMPyRO_annotations_ontology"],
-            "IRI": f'"{row["SeMPyRO_annotations_IRI"]}"',
+            "ontology": model_class.annotations_ontology,
+            "IRI": f'"{model_class.annotations_iri}"',
             "namespace": ontology.upper(),
             "prefix": ontology,
         }
@@ -174,39 +336,14 @@ class LinkMLCreator:
             validation_annotations = self.validation_logic[class_id].get("annotations", {})
             annotations.update(validation_annotations)
 
-        class_sheet = self.filtered_sheets[sheet_name]
         class_slots = []
 
         slots = {}
-        for _index, slot_row in class_sheet.iterrows():
-            if slot_row["Property label"] == "nan":
-                continue
-            slot_name = self._create_slot_name(slot_row["Property label"], slot_row["Property URI"])
+        enums = {}
+        for model_property in model_class.properties:
+            slot_name = self._create_slot_name(model_property.label, model_property.uri)
             class_slots.append(slot_name)
-
-            # Handle comma-separated range values
-            range = slot_row["SeMPyRO_range"]
-            slot_def = {
-                "description": slot_row["Definition"],
-                "slot_uri": slot_row["Property URI"],
-                "annotations": {
-                    "rdf_term": slot_row["SeMPyRO_rdf_term"],
-                    "rdf_type": slot_row["SeMPyRO_rdf_type"],
-                },
-                "required": (str(slot_row["Cardinality"]) == "1" or str(slot_row["Cardinality"]) == "1..n"),
-                "multivalued": (str(slot_row["Cardinality"]) == "0..n" or str(slot_row["Cardinality"]) == "1..n"),
-            }
-
-            # Check if range contains comma-separated values
-            if "," in str(range):
-                # Split and strip whitespace from each range value
-                range_values = [r.strip() for r in range.split(",")]
-                # Use any_of to create Union type in LinkML
-                slot_def["any_of"] = [{"range": r} for r in range_values]
-            else:
-                slot_def["range"] = range.strip()
-
-            slots[slot_name] = slot_def
+            slots[slot_name] = self._build_sempyro_slot(model_property, enums)
 
         class_dict = {
             "class_uri": class_uri,
@@ -214,73 +351,163 @@ class LinkMLCreator:
             "slots": class_slots,
         }
 
-        if class_description and class_description != "nan":
-            class_dict["description"] = class_description
-
-        class_stubs = {}
-        for item in import_classes:
-            stub_class_name = self._ontology_name_to_class_name(item)
-            class_stubs[stub_class_name] = {"class_uri": item}
-        if inherits_from and str(inherits_from) != "nan":
-            class_dict["is_a"] = self._ontology_name_to_class_name(inherits_from)
-            class_stubs[self._ontology_name_to_class_name(inherits_from)] = {"class_uri": inherits_from}
-        # Add RDFModel inheritance if SeMPyRO_add_rdf_model is true
-        elif add_rdf_model and str(add_rdf_model).lower() in [
-            "true",
-            "1",
-            "yes",
-        ]:
-            class_dict["is_a"] = "RDFModel"
+        if model_class.description:
+            class_dict["description"] = model_class.description
 
         # Combine main class with stubs
         all_classes = {self._create_class_id(ontology, ontology_class): class_dict}
-        all_classes.update(class_stubs)
+        all_classes.update(self._build_sempyro_stubs(model_class, class_dict))
 
+        self.linkml_data[linkml_id]["class_id"] = self._create_class_id(ontology, ontology_class)
         self.linkml_data[linkml_id]["data"]["classes"] = all_classes
         self.linkml_data[linkml_id]["data"]["slots"] = slots
+        if enums:
+            self.linkml_data[linkml_id]["data"]["enums"] = enums
 
-    def write_to_file(self):
-        # Check if any schema uses RDFModel import
-        needs_rdf_model = any(
-            "../rdf_model" in linkml_dict["data"].get("imports", []) for linkml_dict in self.linkml_data.values()
-        )
+    def schema_prefixes(self, schema: dict, ontology: str) -> Dict[str, str]:
+        """
+        Prefixes to declare in a schema.
 
-        # Check if any schema uses sempyro_types import
-        needs_sempyro_types = any(
-            "../sempyro_types" in linkml_dict["data"].get("imports", []) for linkml_dict in self.linkml_data.values()
-        )
+        All prefixes of the workbook, or, with used_prefixes_only, only the prefixes
+        referenced by the schema (class and slot URIs, ranges, imports) and the
+        prefix of the schema's own namespace.
 
-        for linkml_dict in self.linkml_data.values():
-            linkml_path = linkml_dict["path"]
-            linkml_data = linkml_dict["data"]
+        Args:
+            schema: LinkML schema dictionary
+            ontology: Namespace prefix of the schema (e.g., 'hri')
 
-            # Create directories if they don't exist
-            linkml_path.parent.mkdir(parents=True, exist_ok=True)
+        Returns:
+            Dictionary of prefix to namespace
+        """
+        if not self.used_prefixes_only:
+            return self.prefixes
+        referenced = used_prefixes([value for key, value in schema.items() if key != "prefixes"], self.prefixes)
+        return {prefix: ns for prefix, ns in self.prefixes.items() if prefix in referenced or prefix == ontology}
+
+    def _namespace_entries(self, ontology: str) -> List[dict]:
+        return [
+            linkml_dict
+            for linkml_dict in self.linkml_data.values()
+            if linkml_dict["rel_path"].parent.name == ontology and "class_id" in linkml_dict
+        ]
+
+    def class_modules(self, ontology: str) -> Dict[str, str]:
+        """
+        Map the per-class schema names of a namespace to their main class.
 
-            # Write linkml_data as YAML to linkml_path
-            with open(linkml_path, "w") as f:
-                yaml.dump(linkml_data, f, default_flow_style=False, sort_keys=False)
+        Args:
+            ontology: Namespace prefix (e.g., 'hri')
 
-            print(f"Written {linkml_path}")
+        Returns:
+            Dictionary of schema name (e.g., 'hri-Dataset') to class name (e.g., 'HRIDataset')
+        """
+        return {
+            linkml_dict["rel_path"].stem: linkml_dict["class_id"] for linkml_dict in self._namespace_entries(ontology)
+        }
 
-        # Copy rdf_model.yaml if needed
-        if needs_rdf_model:
-            rdf_model_source = Path("./inputs/sempyro/rdf_model.yaml")
-            rdf_model_dest = self.output_path / "rdf_model.yaml"
+    def build_combined_schema(self, ontology: str) -> dict:
+        """
+        Merge the per-class schemas of a namespace into a single schema.
 
-            if rdf_model_source.exists():
-                shutil.copy2(rdf_model_source, rdf_model_dest)
-                print(f"Copied {rdf_model_source} to {rdf_model_dest}")
-            else:
-                print(f"Warning: RDF model source file not found at {rdf_model_source}")
+        Slots become class attributes, so that properties with the same slot
+        name but a different definition in two classes do not collide. Stub
+        classes are replaced by the full class when it is part of the namespace.
+
+        Args:
+            ontology: Namespace prefix (e.g., 'hri')
+
+        Returns:
+            Dictionary with the combined LinkML schema
+        """
+        main_classes = {}
+        stub_classes = {}
+        enums = {}
+        imports = []
+
+        for linkml_dict in self._namespace_entries(ontology):
+            data = linkml_dict["data"]
+            imports.extend(i for i in data["imports"] if i not in imports)
+            enums.update(data.get("enums", {}))
+
+            for class_name, class_dict in data["classes"].items():
+                if class_name != linkml_dict["class_id"]:
+                    stub_classes.setdefault(class_name, class_dict)
+                    continue
+                class_dict = dict(class_dict)
+                class_slots = class_dict.pop("slots", [])
+                class_dict["attributes"] = {slot: data["slots"][slot] for slot in class_slots}
+                main_classes[class_name] = class_dict
+
+        classes = dict(main_classes)
+        classes.update({name: stub for name, stub in stub_classes.items() if name not in main_classes})
+
+        schema = {
+            "id": self.prefixes.get(ontology, ontology),
+            "title": ontology,
+            "description": f"Combined schema of all {ontology} classes",
+            "prefixes": self.prefixes,
+            "imports": imports,
+            "classes": classes,
+        }
+        if enums:
+            schema["enums"] = enums
+        schema["prefixes"] = self.schema_prefixes(schema, ontology)
+        return schema
+
+    def write_combined_schema(self, ontology: str) -> Path:
+        """
+        Write the combined schema of a namespace next to its per-class schemas.
 
-        # Copy sempyro_types.yaml if needed
-        if needs_sempyro_types:
-            sempyro_types_source = Path("./inputs/sempyro/sempyro_types.yaml")
-            sempyro_types_dest = self.output_path / "sempyro_types.yaml"
+        Args:
+            ontology: Namespace prefix (e.g., 'hri')
 
-            if sempyro_types_source.exists():
-                shutil.copy2(sempyro_types_source, sempyro_types_dest)
-                print(f"Copied {sempyro_types_source} to {sempyro_types_dest}")
+        Returns:
+            Path of the written schema, '{output_path}/{ontology}/{ontology}.yaml'
+        """
+        combined_path = self.output_path / ontology / f"{ontology}.yaml"
+        schema = yaml.dump(self.build_combined_schema(ontology), default_flow_style=False, sort_keys=False)
+        self._write_schema(combined_path, schema)
+        return combined_path
+
+    def _write_schema(self, path: Path, content: str) -> None:
+        if self.writer.write_text(path, content):
+            print(f"Written {path}")
+        else:
+            print(f"Unchanged {path}")
+
+    def _copy_shared_schema(self, source: Path, dest: Path) -> None:
+        """
+        Copy a schema shared by all namespaces into the output directory.
+
+        Other builds may be reading the destination concurrently, so it is only
+        replaced when its content differs, and then atomically.
+        """
+        self.writer.write_bytes(dest, source.read_bytes())
+
+    def _write_class_schema(self, linkml_dict: dict) -> None:
+        linkml_data = linkml_dict["data"]
+        if self.used_prefixes_only:
+            linkml_data = {
+                **linkml_data,
+                "prefixes": self.schema_prefixes(linkml_data, linkml_dict["rel_path"].parent.name),
+            }
+
+        # Write linkml_data as YAML to linkml_path
+        self._write_schema(linkml_dict["path"], yaml.dump(linkml_data, default_flow_style=False, sort_keys=False))
+
+    def _copy_shared_schemas(self) -> None:
+        """Copy the shared schemas imported by any class schema into the output directory."""
+        for schema_import, (name, source) in SHARED_SCHEMAS.items():
+            if schema_import not in self.shared_imports:
+                continue
+            dest = self.output_path / source.name
+            if source.exists():
+                self._copy_shared_schema(source, dest)
+                print(f"Copied {source} to {dest}")
             else:
-                print(f"Warning: Sempyro types source file not found at {sempyro_types_source}")
+                print(f"Warning: {name} source file not found at {source}")
+
+    def write_to_file(self):
+        for linkml_dict in self.linkml_data.values():
+            self._write_class_schema(linkml_dict)
+        self._copy_shared_schemas()
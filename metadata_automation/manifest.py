@@ -0,0 +1,139 @@
+"""
+Build manifests listing several metadata workbooks to build in one run.
+
+A manifest is a YAML file with a list of profiles, each naming a source
+workbook and the output directories of the steps to run for it::
+
+    defaults:
+      linkml_output_path: ./outputs/linkml
+      sempyro_output_path: ./outputs/sempyro_classes
+    profiles:
+      - input_excel: ./inputs/HealthRI_v2.0.2.xlsx
+        namespace: hri
+        shaclplay_output_path: ./outputs/shaclplay/hri
+        shacl_output_path: ./outputs/shacl_shapes
+      - input_excel: ./inputs/derived_profile.xlsx
+        base_profile: ./inputs/HealthRI_v2.0.2.xlsx
+
+A step only runs for a profile when its output directory is given.
+"""
+
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from metadata_automation.sempyro.utils import load_yaml
+
+
+@dataclass
+class BuildProfile:
+    """A workbook and the outputs to build from it."""
+
+    input_excel: Path
+    namespace: Optional[str] = None
+    shaclplay_output_path: Optional[Path] = None
+    shacl_output_path: Optional[Path] = None
+    linkml_output_path: Optional[Path] = None
+    sempyro_output_path: Optional[Path] = None
+    imports_path: Optional[Path] = None
+    base_profile: Optional[Path] = None
+
+    @property
+    def name(self) -> str:
+        """Name used to report on this profile."""
+        return self.namespace or self.input_excel.stem
+
+    @property
+    def steps(self) -> List[str]:
+        """Commands to run for this profile, in order."""
+        steps = []
+        if self.shaclplay_output_path is not None:
+            steps.append("shaclplay")
+            if self.shacl_output_path is not None:
+                steps.append("shacl-from-shaclplay")
+        if self.sempyro_output_path is not None:
+            steps.append("sempyro")
+        return steps
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], base_dir: Path) -> "BuildProfile":
+        """
+        Create a profile from a manifest entry.
+
+        Args:
+            data: Manifest entry, merged with the manifest defaults
+            base_dir: Directory relative paths in the manifest are resolved against
+
+        Returns:
+            BuildProfile
+
+        Raises:
+            ValueError: If the entry has unknown keys, or no 'input_excel'
+        """
+        known = {f.name for f in fields(cls)}
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError(f"Unknown manifest keys: {', '.join(sorted(unknown))}")
+        if not data.get("input_excel"):
+            raise ValueError("Manifest profile is missing 'input_excel'")
+
+        values = {}
+        for key, value in data.items():
+            if value is None or key == "namespace":
+                values[key] = value
+            else:
+                values[key] = base_dir / Path(value)
+        return cls(**values)
+
+
+def load_manifest(manifest_path: str | Path) -> List[BuildProfile]:
+    """
+    Load the profiles from a build manifest.
+
+    Relative paths are resolved against the manifest's directory.
+
+    Args:
+        manifest_path: Path to the manifest YAML file
+
+    Returns:
+        List of BuildProfile objects
+
+    Raises:
+        ValueError: If the manifest has no profiles or an invalid profile
+    """
+    manifest_path = Path(manifest_path)
+    manifest = load_yaml(manifest_path) or {}
+
+    defaults = manifest.get("defaults") or {}
+    entries = manifest.get("profiles") or []
+    if not entries:
+        raise ValueError(f"No profiles found in {manifest_path}")
+
+    return [BuildProfile.from_dict({**defaults, **entry}, manifest_path.parent) for entry in entries]
+
+
+def profiles_from_workbooks(input_excels: List[str | Path], output_path: str | Path) -> List[BuildProfile]:
+    """
+    Create profiles that build every step for each workbook under one output directory.
+
+    The SHACLPlay files of each workbook are written to their own directory, named
+    after the workbook, as their file names do not include the namespace.
+
+    Args:
+        input_excels: Paths to the source workbooks
+        output_path: Root output directory
+
+    Returns:
+        List of BuildProfile objects
+    """
+    output_path = Path(output_path)
+    return [
+        BuildProfile(
+            input_excel=Path(input_excel),
+            shaclplay_output_path=output_path / "shaclplay" / Path(input_excel).stem,
+            shacl_output_path=output_path / "shacl_shapes",
+            linkml_output_path=output_path / "linkml",
+            sempyro_output_path=output_path / "sempyro_classes",
+        )
+        for input_excel in input_excels
+    ]
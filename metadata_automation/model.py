@@ -0,0 +1,349 @@
+"""
+Typed model of a metadata profile, shared by the generators.
+
+The 'prefixes' and 'classes' sheets and the class sheets of a source are
+parsed and validated once into Profile, Class and Property records, which the
+SHACLPlay converter and the LinkML creator generate their artifacts from,
+instead of each interpreting the sheet cells. In the records, empty cells are
+None, cardinalities and ranges are parsed, and flags are booleans.
+"""
+
+import math
+import re
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from metadata_automation.workbook import WorkbookSnapshot, load_workbook
+
+VOCABULARY_COLUMN = "Controlled vocabluary (if applicable)"
+
+TRUE_VALUES = ("true", "1", "yes")
+FALSE_VALUES = ("false", "0", "no")
+
+
+def _text(value: Any) -> Optional[str]:
+    """Text of a cell, or None if it is empty."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        # Whole numbers of numeric columns are read as floats when the column has empty cells
+        value = int(value)
+    text = str(value)
+    return None if text.strip() in ("", "nan") else text
+
+
+def _flag(value: Any) -> Optional[bool]:
+    """
+    Boolean value of a cell, or None if it is empty.
+
+    Raises:
+        ValueError: If the cell is not a boolean
+    """
+    text = _text(value)
+    if text is None:
+        return None
+    if text.strip().lower() in TRUE_VALUES:
+        return True
+    if text.strip().lower() in FALSE_VALUES:
+        return False
+    raise ValueError(f"Invalid boolean '{text}', expected TRUE or FALSE")
+
+
+@dataclass(frozen=True, slots=True)
+class Cardinality:
+    """Number of values of a property; max_count is None for unbounded."""
+
+    min_count: int
+    max_count: Optional[int] = None
+
+    @property
+    def required(self) -> bool:
+        """Whether the property must have a value."""
+        return self.min_count > 0
+
+    @property
+    def multivalued(self) -> bool:
+        """Whether the property can have more than one value."""
+        return self.max_count is None or self.max_count > 1
+
+    @classmethod
+    def parse(cls, value: Any) -> Optional["Cardinality"]:
+        """
+        Parse a cardinality cell.
+
+        Args:
+            value: Cardinality, e.g. '1', '0..1', '0..n' or '1..n'
+
+        Returns:
+            Cardinality, or None if the cell is empty
+
+        Raises:
+            ValueError: If the cell is not a cardinality
+        """
+        text = _text(value)
+        if text is None:
+            return None
+        match = re.fullmatch(r"\s*(\d+)\s*(?:\.\.\s*(\d+|n)\s*)?", text)
+        if match is None:
+            raise ValueError(f"Invalid cardinality '{text}', expected e.g. '1', '0..1' or '1..n'")
+        min_count = int(match.group(1))
+        if match.group(2) is None:
+            return cls(min_count, min_count)
+        return cls(min_count, None if match.group(2) == "n" else int(match.group(2)))
+
+
+@dataclass(frozen=True, slots=True)
+class Range:
+    """Range of a property, e.g. 'xsd:dateTime', 'rdfs:Literal' or 'dcat:Dataset (IRI)'."""
+
+    value: str
+
+    @property
+    def is_iri(self) -> bool:
+        """Whether the values are IRIs, marked with an '(IRI)' suffix."""
+        return self.value.endswith("(IRI)")
+
+    @property
+    def is_literal(self) -> bool:
+        """Whether the values are literals of any datatype."""
+        return self.value == "rdfs:Literal"
+
+    @property
+    def is_datatype(self) -> bool:
+        """Whether the range is an XML Schema datatype."""
+        return self.value.startswith("xsd:")
+
+    @property
+    def is_class(self) -> bool:
+        """Whether the values are instances of a class, described by a nested shape."""
+        return ":" in self.value and not (self.is_iri or self.is_literal or self.is_datatype)
+
+    @classmethod
+    def parse(cls, value: Any) -> Optional["Range"]:
+        """Parse a range cell; None if the cell is empty."""
+        text = _text(value)
+        return None if text is None else cls(text.strip())
+
+
+@dataclass(frozen=True, slots=True)
+class Property:
+    """A property of a class, a row of its class sheet."""
+
+    label: str
+    uri: str
+    definition: Optional[str] = None
+    usage_note: Optional[str] = None
+    cardinality: Optional[Cardinality] = None
+    range: Optional[Range] = None
+    node: Optional[str] = None
+    pattern: Optional[str] = None
+    unique_lang: Optional[bool] = None
+    default_value: Optional[str] = None
+    viewer: Optional[str] = None
+    editor: Optional[str] = None
+    vocabulary: Optional[str] = None
+    sempyro_range: Tuple[str, ...] = ()
+    rdf_term: Optional[str] = None
+    rdf_type: Optional[str] = None
+
+    @classmethod
+    def from_row(cls, row: Mapping[str, Any]) -> "Property":
+        """
+        Create a property from a row of a class sheet.
+
+        Args:
+            row: Row with the class sheet columns, e.g. 'Property label' and 'Property URI'
+
+        Returns:
+            Property
+
+        Raises:
+            ValueError: If the row has no label or URI, or an invalid cardinality or flag
+        """
+        label = _text(row.get("Property label"))
+        uri = _text(row.get("Property URI"))
+        if label is None:
+            raise ValueError("Property has no 'Property label'")
+        if uri is None:
+            raise ValueError(f"Property '{label}' has no 'Property URI'")
+        sempyro_range = _text(row.get("SeMPyRO_range")) or ""
+        return cls(
+            label=label,
+            uri=uri,
+            definition=_text(row.get("Definition")),
+            usage_note=_text(row.get("Usage note")),
+            cardinality=Cardinality.parse(row.get("Cardinality")),
+            range=Range.parse(row.get("Range")),
+            node=_text(row.get("SHACL_sh:node")),
+            pattern=_text(row.get("SHACL_pattern")),
+            unique_lang=_flag(row.get("SHACL_sh:uniqueLang")),
+            default_value=_text(row.get("SHACL_default_value")),
+            viewer=_text(row.get("SHACL_dash:viewer")),
+            editor=_text(row.get("SHACL_dash:editor")),
+            vocabulary=_text(row.get(VOCABULARY_COLUMN)),
+            sempyro_range=tuple(part.strip() for part in sempyro_range.split(",") if part.strip()),
+            rdf_term=_text(row.get("SeMPyRO_rdf_term")),
+            rdf_type=_text(row.get("SeMPyRO_rdf_type")),
+        )
+
+    @classmethod
+    def from_sheet(cls, sheet: pd.DataFrame, sheet_name: str = "") -> Tuple["Property", ...]:
+        """
+        Create the properties of a class sheet; rows without a label are skipped.
+
+        Args:
+            sheet: Class sheet, with a header row
+            sheet_name: Name of the sheet, for error messages
+
+        Returns:
+            Tuple of Property objects
+
+        Raises:
+            ValueError: If a property is invalid, with its sheet and row number
+        """
+        properties = []
+        for position, row in enumerate(sheet.to_dict(orient="records")):
+            if _text(row.get("Property label")) is None:
+                continue
+            try:
+                properties.append(cls.from_row(row))
+            except ValueError as e:
+                # Row numbers as shown in Excel, below the header row
+                raise ValueError(f"Sheet '{sheet_name}', row {position + 2}: {e}") from None
+        return tuple(properties)
+
+
+@dataclass(frozen=True, slots=True)
+class Class:
+    """A class of the profile, a row of the 'classes' sheet with the properties of its class sheet."""
+
+    sheet_name: str
+    uri: str
+    target_class: Optional[str] = None
+    description: Optional[str] = None
+    inherits_from: Optional[str] = None
+    import_classes: Tuple[str, ...] = ()
+    add_rdf_model: bool = False
+    annotations_ontology: Optional[str] = None
+    annotations_iri: Optional[str] = None
+    properties: Tuple[Property, ...] = ()
+
+    @property
+    def prefix(self) -> str:
+        """Namespace prefix of the class, e.g. 'hri' of 'hri:Dataset'."""
+        return self.uri.split(":")[0]
+
+    @property
+    def name(self) -> str:
+        """Local name of the class, e.g. 'Dataset' of 'hri:Dataset'."""
+        return self.uri.split(":")[1]
+
+    @classmethod
+    def from_row(cls, row: Mapping[str, Any], properties: Sequence[Property] = ()) -> "Class":
+        """
+        Create a class from a row of the 'classes' sheet.
+
+        Args:
+            row: Row with the 'classes' columns, e.g. 'sheet_name' and 'class_URI'
+            properties: Properties of the class sheet
+
+        Returns:
+            Class
+
+        Raises:
+            ValueError: If the row has no sheet name, no prefixed class URI, or an invalid flag
+        """
+        sheet_name = _text(row.get("sheet_name"))
+        uri = _text(row.get("class_URI"))
+        if sheet_name is None:
+            raise ValueError("Class has no 'sheet_name'")
+        if uri is None or not re.fullmatch(r"[^:\s]+:[^:\s]+", uri.strip()):
+            raise ValueError(f"Class '{sheet_name}' has no prefixed 'class_URI', e.g. 'hri:Dataset'")
+        import_classes = _text(row.get("SeMPyRO_import_classes")) or ""
+        return cls(
+            sheet_name=sheet_name,
+            uri=uri.strip(),
+            target_class=_text(row.get("SHACL_target_ontology_name")),
+            description=_text(row.get("description")),
+            inherits_from=_text(row.get("SeMPyRO_inherits_from")),
+            import_classes=tuple(item.strip() for item in import_classes.split(",") if item.strip()),
+            add_rdf_model=bool(_flag(row.get("SeMPyRO_add_rdf_model"))),
+            annotations_ontology=_text(row.get("SeMPyRO_annotations_ontology")),
+            annotations_iri=_text(row.get("SeMPyRO_annotations_IRI")),
+            properties=tuple(properties),
+        )
+
+
+def read_prefixes(prefixes: pd.DataFrame) -> Dict[str, str]:
+    """
+    Read the 'prefixes' sheet.
+
+    Args:
+        prefixes: Sheet with 'prefix' and 'namespace' columns
+
+    Returns:
+        Dictionary of prefix to namespace, in the order of the sheet
+    """
+    return {
+        _text(prefix).strip(): (_text(namespace) or "").strip()
+        for prefix, namespace in zip(prefixes["prefix"], prefixes["namespace"], strict=False)
+        if _text(prefix) is not None
+    }
+
+
+@dataclass(frozen=True, slots=True)
+class Profile:
+    """The prefixes and classes of a source workbook."""
+
+    prefixes: Dict[str, str]
+    classes: Tuple[Class, ...]
+
+    @classmethod
+    def from_workbook(cls, workbook: WorkbookSnapshot, exclude_sheets: Iterable[str] = ()) -> "Profile":
+        """
+        Create the profile of a workbook.
+
+        Args:
+            workbook: Snapshot of the source workbook
+            exclude_sheets: Sheets that are never class sheets, e.g. 'Info'; classes on them are left out
+
+        Returns:
+            Profile
+
+        Raises:
+            ValueError: If a class or property is invalid, or the sheet of a class is missing
+        """
+        exclude_sheets = set(exclude_sheets)
+        classes = []
+        for position, row in enumerate(workbook.parse("classes").to_dict(orient="records")):
+            if all(_text(value) is None for value in row.values()):
+                continue
+            try:
+                model_class = Class.from_row(row)
+            except ValueError as e:
+                raise ValueError(f"Sheet 'classes', row {position + 2}: {e}") from None
+            if model_class.sheet_name in exclude_sheets:
+                continue
+            if model_class.sheet_name not in workbook.sheet_names:
+                raise ValueError(f"Sheet '{model_class.sheet_name}' of class '{model_class.uri}' not found")
+            properties = Property.from_sheet(workbook.parse(model_class.sheet_name), model_class.sheet_name)
+            classes.append(replace(model_class, properties=properties))
+        return cls(prefixes=read_prefixes(workbook.parse("prefixes")), classes=tuple(classes))
+
+
+def load_profile(path: str | Path, exclude_sheets: Iterable[str] = (), reader: Optional[str] = None) -> Profile:
+    """
+    Load the profile of a source workbook or source directory.
+
+    Args:
+        path: Path to the Excel file, or source directory
+        exclude_sheets: Sheets that are never class sheets, see Profile.from_workbook
+        reader: Excel reader backend, see metadata_automation.workbook.resolve_reader
+
+    Returns:
+        Profile
+    """
+    return Profile.from_workbook(load_workbook(path, reader), exclude_sheets)
@@ -0,0 +1,124 @@
+"""
+Write-if-changed, atomic writing of generated artifacts.
+
+Artifacts are rendered in memory (or by an external tool into a staging
+file) and only replace the file in the output directory when their content
+differs from it. Unchanged files keep their modification time, so downstream
+incremental builds do not redo work for them. Changed files are written to a
+temporary file next to the destination and renamed over it, so a reader never
+sees a partially written file, even when a run is interrupted.
+
+Intermediate files, which are only inputs of a later step and not outputs
+themselves, are written to a temporary directory instead, on tmpfs when
+available, and removed after use.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+from typing import List
+
+# Memory-backed file system of Linux, for intermediate files that are removed after use
+TMPFS_DIR = Path("/dev/shm")
+
+# Permissions of newly created files, as open() would create them
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+class OutputWriter:
+    """Writes files only when their content changed, and counts written and unchanged files."""
+
+    def __init__(self):
+        """Initialize the writer with empty counts."""
+        self.written: List[Path] = []
+        self.unchanged: List[Path] = []
+
+    def write_bytes(self, path: str | Path, data: bytes) -> bool:
+        """
+        Write data to a file, unless the file already has this content.
+
+        Args:
+            path: Destination file
+            data: Content of the file
+
+        Returns:
+            True if the file was written, False if it was unchanged
+        """
+        path = Path(path)
+        if path.is_file() and path.stat().st_size == len(data) and path.read_bytes() == data:
+            self.unchanged.append(path)
+            return False
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", delete=False) as tmp:
+            tmp_path = Path(tmp.name)
+            try:
+                tmp.write(data)
+            except BaseException:
+                tmp.close()
+                tmp_path.unlink(missing_ok=True)
+                raise
+        try:
+            # Temporary files are private, give the file the permissions it has or would get
+            os.chmod(tmp_path, path.stat().st_mode & 0o7777 if path.exists() else 0o666 & ~_UMASK)
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        self.written.append(path)
+        return True
+
+    def write_text(self, path: str | Path, text: str, encoding: str = "utf-8") -> bool:
+        """
+        Write text to a file, unless the file already has this content.
+
+        Args:
+            path: Destination file
+            text: Content of the file
+            encoding: Text encoding
+
+        Returns:
+            True if the file was written, False if it was unchanged
+        """
+        return self.write_bytes(path, text.encode(encoding))
+
+    def commit(self, staged: str | Path, path: str | Path) -> bool:
+        """
+        Move a file produced in a staging location to its destination, if its content changed.
+
+        The staged file is removed.
+
+        Args:
+            staged: File written by a generator or external tool
+            path: Destination file
+
+        Returns:
+            True if the destination was written, False if it was unchanged
+        """
+        staged = Path(staged)
+        changed = self.write_bytes(path, staged.read_bytes())
+        staged.unlink()
+        return changed
+
+    def summary(self) -> str:
+        """Counts of the written and unchanged files."""
+        return f"{len(self.written)} written, {len(self.unchanged)} unchanged"
+
+
+def intermediate_directory(prefix: str) -> tempfile.TemporaryDirectory:
+    """
+    Create a temporary directory for intermediate files, on tmpfs when available.
+
+    Intermediate files, e.g. SHACLPlay workbooks that are only converted to
+    Turtle, then never reach the disk. Elsewhere, the directory is created in
+    the default temporary directory.
+
+    Args:
+        prefix: Prefix of the directory name
+
+    Returns:
+        TemporaryDirectory, removed with its files when its context exits
+    """
+    tmpfs = TMPFS_DIR.is_dir() and os.access(TMPFS_DIR, os.W_OK | os.X_OK)
+    return tempfile.TemporaryDirectory(prefix=prefix, dir=TMPFS_DIR if tmpfs else None)
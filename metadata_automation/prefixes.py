@@ -0,0 +1,51 @@
+"""
+Prefix usage analysis for generated schemas and shapes.
+
+Workbooks declare every namespace of the application profile in their
+'prefixes' sheet, while a single class only references a few of them. These
+helpers find the CURIE prefixes a generated artifact actually references, so
+only those need to be declared in it.
+"""
+
+import re
+from typing import Any, Dict, Iterable, Set
+
+# A CURIE prefix: a name followed by ':' that is not the scheme of a full URI (e.g. 'http://')
+CURIE_PREFIX_PATTERN = re.compile(r"(?<![\w/#:.-])([A-Za-z_][\w.-]*):(?!//)")
+
+
+def curie_prefixes(value: Any) -> Set[str]:
+    """
+    Find the CURIE prefixes referenced in a value.
+
+    Strings are scanned for CURIEs (e.g. 'dcat:Dataset', '( eu:PUBLIC eu:RESTRICTED )'
+    or 'dcterms:modified^^xsd:dateTime'). Mappings and sequences are scanned recursively.
+
+    Args:
+        value: String, mapping, sequence or any other value
+
+    Returns:
+        Set of prefixes, possibly including names that are not declared prefixes
+    """
+    if isinstance(value, str):
+        return set(CURIE_PREFIX_PATTERN.findall(value))
+    if isinstance(value, dict):
+        return set().union(*(curie_prefixes(v) for v in value.values()))
+    if isinstance(value, (list, tuple, set)):
+        return set().union(*(curie_prefixes(v) for v in value))
+    return set()
+
+
+def used_prefixes(values: Iterable[Any], prefixes: Dict[str, str]) -> Dict[str, str]:
+    """
+    Limit a prefix mapping to the prefixes referenced by the given values.
+
+    Args:
+        values: Values to scan, e.g. the cells of a sheet or the parts of a schema
+        prefixes: All declared prefixes, mapping prefix to namespace
+
+    Returns:
+        The referenced subset of prefixes, in declaration order
+    """
+    referenced = curie_prefixes(list(values))
+    return {prefix: namespace for prefix, namespace in prefixes.items() if prefix in referenced}
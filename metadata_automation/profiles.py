@@ -0,0 +1,123 @@
+"""
+Reuse of build artifacts between a base profile and profiles derived from it.
+
+A derived profile (e.g. a domain specific application profile) often declares
+many classes exactly as its base profile (e.g. the Health-RI core) does. Every
+class is fingerprinted on everything its artifact is generated from. Artifacts
+of classes whose fingerprint also occurs in the base profile are stored in a
+cache and copied from there, so only the classes a derived profile adds or
+overrides are generated.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from metadata_automation.cache import get_cache_dir
+from metadata_automation.output import OutputWriter
+
+# Packages whose version changes the generated artifacts
+GENERATOR_PACKAGES = ("linkml", "pydantic", "sempyro", "pandas", "openpyxl")
+
+
+def _package_versions() -> dict:
+    versions = {}
+    for package in GENERATOR_PACKAGES:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def file_digest(path: str | Path) -> Optional[str]:
+    """SHA-256 of a file's content, or None if it does not exist."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def content_fingerprint(*parts: Any) -> str:
+    """
+    Fingerprint the inputs an artifact is generated from.
+
+    Args:
+        *parts: JSON serializable values (other values are converted with str)
+
+    Returns:
+        Hex digest identifying the combination of inputs and generator versions
+    """
+    payload = json.dumps([_package_versions(), *parts], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class BaseProfile:
+    """Artifacts of the classes a profile shares with its base profile."""
+
+    def __init__(self, base_excel: str | Path, artifact: str, fingerprints: Iterable[str]):
+        """
+        Initialize the base profile.
+
+        Args:
+            base_excel: Path to the base profile's source Excel file
+            artifact: Kind of artifact, e.g. 'sempyro' or 'shaclplay'
+            fingerprints: Fingerprints of the classes of the base profile
+        """
+        self.base_excel = Path(base_excel)
+        self.fingerprints = set(fingerprints)
+        self.cache_dir = get_cache_dir("profiles", artifact)
+
+    def shares(self, fingerprint: str) -> bool:
+        """Whether the base profile has a class with this fingerprint."""
+        return fingerprint in self.fingerprints
+
+    def _artifact_path(self, fingerprint: str, file_name: str) -> Path:
+        return self.cache_dir / fingerprint[:2] / fingerprint / file_name
+
+    def reuse(self, fingerprint: str, output_path: Path, writer: Optional[OutputWriter] = None) -> bool:
+        """
+        Copy the cached artifact of a shared class to the output path.
+
+        Args:
+            fingerprint: Fingerprint of the class
+            output_path: Where the artifact should be written
+            writer: OutputWriter to write the artifact with, only if it changed
+
+        Returns:
+            True if the artifact was copied, False if it must be generated
+        """
+        if not self.shares(fingerprint):
+            return False
+        cached = self._artifact_path(fingerprint, output_path.name)
+        if not cached.exists():
+            return False
+        (writer or OutputWriter()).write_bytes(output_path, cached.read_bytes())
+        return True
+
+    def store(self, fingerprint: str, output_path: Path) -> None:
+        """
+        Store a generated artifact if its class is shared with the base profile.
+
+        Args:
+            fingerprint: Fingerprint of the class
+            output_path: Path of the generated artifact
+        """
+        if not self.shares(fingerprint):
+            return
+        cached = self._artifact_path(fingerprint, output_path.name)
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first, so a concurrent build never reuses a partial artifact
+        with tempfile.NamedTemporaryFile(dir=cached.parent, prefix=f".{cached.name}.", delete=False) as tmp:
+            tmp_path = Path(tmp.name)
+        try:
+            shutil.copyfile(output_path, tmp_path)
+            os.replace(tmp_path, cached)
+        except OSError as e:
+            tmp_path.unlink(missing_ok=True)
+            print(f"Warning: Could not cache {output_path.name}: {e}")
@@ -0,0 +1,105 @@
+"""
+Reproducible builds: identical inputs give byte-identical outputs.
+
+Generated artifacts normally carry the time they were built: SHACLPlay
+workbooks stamp it into ``dcterms:modified`` and openpyxl into the workbook
+properties and ZIP entries. In reproducible mode the build date is taken from
+the ``SOURCE_DATE_EPOCH`` environment variable (see
+https://reproducible-builds.org/specs/source-date-epoch/) or the
+``--build-date`` option instead, workbooks get fixed ZIP metadata, and SHACL
+Turtle files are serialized canonically, so unchanged shapes can be
+deduplicated by their content.
+"""
+
+import io
+import re
+import zipfile
+from datetime import datetime, timezone
+
+from rdflib import Graph
+from rdflib.compare import to_canonical_graph
+
+SOURCE_DATE_EPOCH = "SOURCE_DATE_EPOCH"
+
+# Earliest timestamp a ZIP entry can hold
+ZIP_EPOCH = datetime(1980, 1, 1)
+
+# Workbook creation and modification dates, written by openpyxl in docProps/core.xml
+CORE_PROPERTY_DATES = re.compile(rb"(<dcterms:(created|modified)\b[^>]*>)[^<]*(</dcterms:\2>)")
+
+
+def parse_build_date(value: str) -> datetime:
+    """
+    Parse a build date.
+
+    Args:
+        value: Unix timestamp (as in SOURCE_DATE_EPOCH), or ISO 8601 date or datetime
+
+    Returns:
+        Naive datetime in UTC
+
+    Raises:
+        ValueError: If the value is not a timestamp or ISO 8601 date
+    """
+    value = value.strip()
+    if re.fullmatch(r"\d+", value):
+        return datetime.fromtimestamp(int(value), tz=timezone.utc).replace(tzinfo=None)
+    build_date = datetime.fromisoformat(value)
+    if build_date.tzinfo is not None:
+        build_date = build_date.astimezone(timezone.utc).replace(tzinfo=None)
+    return build_date
+
+
+def normalize_xlsx(data: bytes, build_date: datetime, compression: int = zipfile.ZIP_DEFLATED) -> bytes:
+    """
+    Give a workbook fixed ZIP metadata and document dates.
+
+    Every entry gets the build date as timestamp and the same compression and
+    permissions, and the creation and modification dates of the workbook
+    properties are set to the build date. Entries keep their order.
+
+    Args:
+        data: XLSX file content
+        build_date: Date stamped into the workbook
+        compression: Compression of the entries, e.g. zipfile.ZIP_STORED for uncompressed entries
+
+    Returns:
+        Normalized XLSX file content
+    """
+    date_time = max(build_date, ZIP_EPOCH).timetuple()[:6]
+    stamp = build_date.strftime("%Y-%m-%dT%H:%M:%SZ").encode("ascii")
+
+    output = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(data)) as source, zipfile.ZipFile(output, "w") as target:
+        for entry in source.infolist():
+            content = source.read(entry)
+            if entry.filename == "docProps/core.xml":
+                content = CORE_PROPERTY_DATES.sub(lambda m: m.group(1) + stamp + m.group(3), content)
+            info = zipfile.ZipInfo(entry.filename, date_time=date_time)
+            info.compress_type = compression
+            info.create_system = 3
+            info.external_attr = 0o644 << 16
+            target.writestr(info, content)
+    return output.getvalue()
+
+
+def canonical_turtle(data: str | bytes) -> str:
+    """
+    Serialize Turtle canonically.
+
+    Blank nodes are relabeled by their content and the serialization is sorted,
+    so graphs with the same triples are written identically, whatever the
+    order or labels of the input.
+
+    Args:
+        data: Turtle document
+
+    Returns:
+        Canonical Turtle document, declaring the prefixes of the input
+    """
+    graph = Graph(bind_namespaces="none").parse(data=data, format="turtle")
+    canonical = Graph(bind_namespaces="none")
+    for prefix, namespace in graph.namespaces():
+        canonical.bind(prefix, namespace)
+    canonical += to_canonical_graph(graph)
+    return canonical.serialize(format="turtle")
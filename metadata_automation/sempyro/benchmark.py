@@ -0,0 +1,329 @@
+"""
+Performance benchmark for generated SeMPyRO Pydantic modules.
+
+Imports each generated module and measures its import time, the time to
+(re)build its Pydantic models and the validation throughput on synthetic
+instance payloads. Results can be stored as a baseline and later runs
+compared against it, so regressions in the generated code are caught.
+"""
+
+import ast
+import enum
+import importlib
+import importlib.util
+import json
+import sys
+import time
+import typing
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from types import ModuleType, UnionType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, ValidationError
+
+# Metrics that regress when they increase, and metrics that regress when they decrease
+LOWER_IS_BETTER = ("import_seconds", "build_seconds")
+HIGHER_IS_BETTER = ("validations_per_second",)
+
+MAX_PAYLOAD_DEPTH = 3
+
+
+@dataclass
+class ModuleBenchmark:
+    """Benchmark results of a single generated module."""
+
+    module: str
+    import_seconds: Optional[float] = None
+    build_seconds: Optional[float] = None
+    validations_per_second: Optional[float] = None
+    models: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+
+def _dependency_modules(source: str) -> List[str]:
+    """Top-level modules imported by a generated module."""
+    modules = []
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            modules.append(node.module)
+    return modules
+
+
+def import_module_from_path(module_path: Path) -> Tuple[ModuleType, float]:
+    """
+    Import a generated module and measure the time spent executing it.
+
+    The modules it depends on are imported first, so the measured time only
+    covers the generated code itself (class creation and model building).
+
+    Args:
+        module_path: Path to the generated Python file
+
+    Returns:
+        Tuple of (imported module, import time in seconds)
+    """
+    for dependency in _dependency_modules(module_path.read_text(encoding="utf-8")):
+        try:
+            importlib.import_module(dependency)
+        except ImportError:
+            # Reported when the module itself is executed
+            pass
+
+    module_name = f"_sempyro_benchmark_{module_path.stem.replace('-', '_')}"
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        start = time.perf_counter()
+        spec.loader.exec_module(module)
+        elapsed = time.perf_counter() - start
+    except BaseException:
+        sys.modules.pop(module_name, None)
+        raise
+    return module, elapsed
+
+
+def _best_import(module_path: Path, repeat: int) -> Tuple[ModuleType, float]:
+    """Import a generated module repeatedly, each time afresh, returning the last module and the best time."""
+    import_times = []
+    for _ in range(repeat):
+        module, elapsed = import_module_from_path(module_path)
+        import_times.append(elapsed)
+    return module, min(import_times)
+
+
+def module_models(module: ModuleType) -> List[type]:
+    """Pydantic models defined (not imported) by a module."""
+    return [
+        obj
+        for obj in vars(module).values()
+        if isinstance(obj, type) and issubclass(obj, BaseModel) and obj.__module__ == module.__name__
+    ]
+
+
+# Values of plain annotations, from the field name and the instance number
+SCALAR_VALUES: Dict[Any, Callable[[str, int], Any]] = {
+    Any: lambda name, index: f"{name}-{index}",
+    str: lambda name, index: f"{name}-{index}",
+    bool: lambda name, index: index % 2 == 0,
+    int: lambda name, index: index,
+    float: lambda name, index: index + 0.5,
+    datetime: lambda name, index: datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=index),
+    date: lambda name, index: date(2024, 1, 1) + timedelta(days=index % 365),
+}
+
+
+def _synthetic_generic(annotation: Any, name: str, index: int, depth: int) -> Any:
+    """Create a value for a generic annotation, e.g. Optional[str] or List[Model]."""
+    origin = typing.get_origin(annotation)
+    args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+
+    if origin in (typing.Union, UnionType):
+        # Prefer plain values over nested models, they are the most common input
+        for arg in sorted(args, key=lambda arg: isinstance(arg, type) and issubclass(arg, BaseModel)):
+            try:
+                return _synthetic_value(arg, name, index, depth)
+            except ValueError:
+                continue
+    elif origin in (list, set, tuple, List):
+        return [_synthetic_value(args[0], name, index, depth)] if args else []
+    elif origin is typing.Literal:
+        return typing.get_args(annotation)[0]
+    elif origin is dict:
+        return {}
+    raise ValueError(f"No synthetic value for {annotation}")
+
+
+def _synthetic_instance(annotation: type, name: str, index: int, depth: int) -> Any:
+    """Create a value for a class annotation, e.g. an Enum, a nested model or a Pydantic URL type."""
+    if issubclass(annotation, enum.Enum):
+        return next(iter(annotation)).value
+    if issubclass(annotation, BaseModel):
+        if depth >= MAX_PAYLOAD_DEPTH:
+            raise ValueError(f"Maximum nesting depth reached at {annotation.__name__}")
+        return synthetic_payload(annotation, index, depth + 1, required_only=True)
+    if annotation.__name__ in ("AwareDatetime", "NaiveDatetime"):
+        value = datetime(2024, 1, 1) + timedelta(minutes=index)
+        return value.replace(tzinfo=timezone.utc) if annotation.__name__ == "AwareDatetime" else value
+    if "Url" in annotation.__name__:
+        return f"https://example.org/{name}/{index}"
+    raise ValueError(f"No synthetic value for {annotation}")
+
+
+def _synthetic_value(annotation: Any, name: str, index: int, depth: int) -> Any:
+    """Create a value matching a type annotation, or raise ValueError if not possible."""
+    if typing.get_origin(annotation) is not None:
+        return _synthetic_generic(annotation, name, index, depth)
+    if annotation in SCALAR_VALUES:
+        return SCALAR_VALUES[annotation](name, index)
+    if isinstance(annotation, type):
+        return _synthetic_instance(annotation, name, index, depth)
+    raise ValueError(f"No synthetic value for {annotation}")
+
+
+def synthetic_payload(model: type, index: int = 0, depth: int = 0, required_only: bool = False) -> Dict[str, Any]:
+    """
+    Create an instance payload for a Pydantic model from its field annotations.
+
+    Args:
+        model: Pydantic model class
+        index: Instance number, used to make values unique
+        depth: Current nesting depth of the payload
+        required_only: Only fill the required fields
+
+    Returns:
+        Dictionary that can be passed to the model's model_validate
+
+    Raises:
+        ValueError: If no value can be created for a required field
+    """
+    payload = {}
+    for name, field_info in model.model_fields.items():
+        if required_only and not field_info.is_required():
+            continue
+        try:
+            payload[field_info.alias or name] = _synthetic_value(field_info.annotation, name, index, depth)
+        except ValueError:
+            if field_info.is_required():
+                raise
+    return payload
+
+
+def _valid_payloads(model: type, instances: int) -> List[Dict[str, Any]]:
+    """Synthetic payloads that pass validation, preferring payloads with all fields filled."""
+    for required_only in (False, True):
+        try:
+            payloads = [synthetic_payload(model, i, required_only=required_only) for i in range(instances)]
+            model.model_validate(payloads[0])
+            return payloads
+        except (ValueError, ValidationError):
+            continue
+    raise ValueError(f"Could not create a valid synthetic payload for {model.__name__}")
+
+
+def benchmark_module(module_path: Path, instances: int = 1000, repeat: int = 3) -> ModuleBenchmark:
+    """
+    Benchmark a single generated module.
+
+    Args:
+        module_path: Path to the generated Python file
+        instances: Number of synthetic instances validated per model
+        repeat: Number of repetitions, the best timing is kept
+
+    Returns:
+        ModuleBenchmark with the measured metrics and any errors
+    """
+    result = ModuleBenchmark(module=module_path.stem)
+
+    try:
+        module, result.import_seconds = _best_import(module_path, repeat)
+    except Exception as e:
+        result.errors.append(f"import failed: {type(e).__name__}: {e}")
+        return result
+
+    models = module_models(module)
+    result.models = [model.__name__ for model in models]
+
+    build_times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for model in models:
+            model.model_rebuild(force=True)
+        build_times.append(time.perf_counter() - start)
+    result.build_seconds = min(build_times)
+
+    validated, elapsed = 0, 0.0
+    for model in models:
+        try:
+            payloads = _valid_payloads(model, instances)
+        except ValueError as e:
+            result.errors.append(str(e))
+            continue
+
+        best = None
+        try:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                for payload in payloads:
+                    model.model_validate(payload)
+                run = time.perf_counter() - start
+                best = run if best is None else min(best, run)
+        except ValidationError as e:
+            result.errors.append(f"validation of {model.__name__} failed: {e}")
+            continue
+        validated += len(payloads)
+        elapsed += best
+
+    if validated and elapsed > 0:
+        result.validations_per_second = validated / elapsed
+    return result
+
+
+def benchmark_directory(sempyro_path: Path, instances: int = 1000, repeat: int = 3) -> List[ModuleBenchmark]:
+    """
+    Benchmark all generated modules in a directory (recursively).
+
+    Args:
+        sempyro_path: Directory with generated SeMPyRO modules
+        instances: Number of synthetic instances validated per model
+        repeat: Number of repetitions, the best timing is kept
+
+    Returns:
+        List of ModuleBenchmark results, sorted by module name
+    """
+    return [
+        benchmark_module(module_path, instances, repeat)
+        for module_path in sorted(Path(sempyro_path).rglob("*.py"))
+        if module_path.name != "__init__.py"
+    ]
+
+
+def write_baseline(results: List[ModuleBenchmark], baseline_path: Path) -> None:
+    """Store benchmark results as a JSON baseline."""
+    baseline_path = Path(baseline_path)
+    baseline_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(baseline_path, "w", encoding="utf-8") as f:
+        json.dump({r.module: asdict(r) for r in results}, f, indent=2, sort_keys=True)
+
+
+def load_baseline(baseline_path: Path) -> Dict[str, Dict[str, Any]]:
+    """Load a JSON baseline written by write_baseline."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def find_regressions(
+    results: List[ModuleBenchmark], baseline: Dict[str, Dict[str, Any]], tolerance: float = 0.25
+) -> List[str]:
+    """
+    Compare benchmark results against a baseline.
+
+    Args:
+        results: Current benchmark results
+        baseline: Baseline loaded with load_baseline
+        tolerance: Allowed relative slowdown, e.g. 0.25 for 25%
+
+    Returns:
+        List of human readable regression descriptions, empty if there are none
+    """
+    regressions = []
+    for result in results:
+        previous = baseline.get(result.module)
+        if previous is None:
+            continue
+
+        for metric in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+            old, new = previous.get(metric), getattr(result, metric)
+            if old is None or old <= 0:
+                continue
+            if new is None:
+                regressions.append(f"{result.module}: {metric} could not be measured")
+            elif metric in LOWER_IS_BETTER and new > old * (1 + tolerance):
+                regressions.append(f"{result.module}: {metric} {new:.4g} > {old:.4g} (+{new / old - 1:.0%})")
+            elif metric in HIGHER_IS_BETTER and new < old / (1 + tolerance):
+                regressions.append(f"{result.module}: {metric} {new:.4g} < {old:.4g} (-{1 - new / old:.0%})")
+    return regressions
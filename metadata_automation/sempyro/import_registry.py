@@ -0,0 +1,135 @@
+"""
+Compiled registry of SeMPyRO import configurations.
+
+Parses every entry of ``imports.yaml`` once into linkml ``Imports`` objects,
+so generation does not have to re-parse the import text for each class.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+from linkml.generators.pydanticgen.template import Import, Imports, ObjectImport
+
+from metadata_automation.sempyro.utils import (
+    load_yaml,
+    parse_import_entries,
+    parse_import_statements,
+)
+
+
+class ImportRegistry:
+    """Parses and deduplicates the per-class import blocks of ``imports.yaml``.
+
+    Entries can be given either as raw Python import text or in the structured
+    form (a list of ``module``/``alias``/``objects`` mappings). Blocks that
+    resolve to the same set of imports are stored only once.
+    """
+
+    def __init__(self, import_config: Dict[str, Any]):
+        """
+        Initialize the registry.
+
+        Args:
+            import_config: Mapping of class keys (e.g. 'hri-Dataset') to import entries
+        """
+        self._text_cache: Dict[str, Imports] = {}
+        self._blocks: Dict[Tuple, Imports] = {}
+        self._class_blocks: Dict[str, Tuple] = {}
+
+        for class_key, entry in (import_config or {}).items():
+            imports = self._parse_entry(entry)
+            block_key = self._block_key(imports)
+            self._blocks.setdefault(block_key, imports)
+            self._class_blocks[class_key] = block_key
+
+    @classmethod
+    def from_yaml(cls, yaml_path: str | Path) -> "ImportRegistry":
+        """Create a registry from an imports configuration YAML file."""
+        return cls(load_yaml(yaml_path))
+
+    def _parse_entry(self, entry: Any) -> Imports:
+        if entry is None:
+            return Imports()
+        if isinstance(entry, str):
+            if entry not in self._text_cache:
+                self._text_cache[entry] = parse_import_statements(entry)
+            return self._text_cache[entry]
+        if isinstance(entry, list):
+            return parse_import_entries(entry)
+        raise ValueError(f"Unsupported imports entry of type {type(entry).__name__}")
+
+    @staticmethod
+    def _block_key(imports: Imports) -> Tuple:
+        """Order-independent key identifying the set of imports in a block."""
+        return tuple(
+            sorted(
+                (
+                    i.module,
+                    i.alias or "",
+                    tuple(sorted((o.name, o.alias or "") for o in i.objects)) if i.objects is not None else (),
+                )
+                for i in imports
+            )
+        )
+
+    def __contains__(self, class_key: str) -> bool:
+        return class_key in self._class_blocks
+
+    def __len__(self) -> int:
+        return len(self._class_blocks)
+
+    @property
+    def unique_blocks(self) -> int:
+        """Number of distinct import blocks after deduplication."""
+        return len(self._blocks)
+
+    def block_key(self, class_key: str) -> Tuple:
+        """
+        Get the key identifying the import block of a class.
+
+        Classes with equal block keys are generated with the same imports.
+
+        Args:
+            class_key: Class key in the form '{namespace}-{ClassName}'
+
+        Returns:
+            Order-independent tuple describing the imports
+
+        Raises:
+            KeyError: If no imports are configured for the class
+        """
+        return self._class_blocks[class_key]
+
+    def symbols(self) -> Dict[str, Import]:
+        """
+        Get the names bound by the configured imports, e.g. an alias such as 'FOAFAgent'.
+
+        Lets inferred imports use names that the configuration imports for other classes.
+
+        Returns:
+            Dictionary of bound name to the import of that single object
+        """
+        symbols = {}
+        for imports in self._blocks.values():
+            for python_import in imports:
+                for obj in python_import.objects or []:
+                    symbols.setdefault(
+                        obj.alias or obj.name,
+                        Import(module=python_import.module, objects=[ObjectImport(name=obj.name, alias=obj.alias)]),
+                    )
+        return symbols
+
+    def get(self, class_key: str) -> Imports:
+        """
+        Get the parsed imports for a class.
+
+        Args:
+            class_key: Class key in the form '{namespace}-{ClassName}'
+
+        Returns:
+            A copy of the shared Imports object, safe for the generator to mutate
+
+        Raises:
+            KeyError: If no imports are configured for the class
+        """
+        return self._blocks[self._class_blocks[class_key]].model_copy(deep=True)
@@ -0,0 +1,289 @@
+"""
+Automatic import inference for generated SeMPyRO modules.
+
+Builds an index of symbol -> module for the packages the generated code
+depends on by statically scanning their sources (nothing is imported). The
+index is cached on disk and only rebuilt when the installed packages change.
+"""
+
+import ast
+import builtins
+import hashlib
+import importlib.util
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Optional, Set, Tuple
+
+from linkml.generators.pydanticgen.template import Import, Imports, ObjectImport
+
+from metadata_automation.cache import get_cache_dir
+
+# Packages to index, in order of preference when a symbol is exported by several of them
+DEFAULT_PACKAGES = ("typing", "datetime", "pydantic", "rdflib.namespace", "sempyro")
+
+# Names the generated code uses as modules rather than as imported objects
+MODULE_IMPORTS = ("logging",)
+
+BUILTIN_NAMES = frozenset(dir(builtins))
+
+
+def _package_sources(package: str) -> List[Tuple[str, Path]]:
+    """
+    Locate the source files of a package without importing it.
+
+    Args:
+        package: Dotted package name (e.g., 'rdflib.namespace')
+
+    Returns:
+        List of (module name, source path) tuples, empty if the package is not installed
+    """
+    top_level, *rest = package.split(".")
+    spec = importlib.util.find_spec(top_level)
+    if spec is None or spec.origin is None or not spec.origin.endswith(".py"):
+        return []
+
+    if spec.submodule_search_locations is None:
+        # Single-file module such as typing.py
+        return [(package, Path(spec.origin))] if not rest else []
+
+    root = Path(spec.origin).parent.joinpath(*rest)
+    if not root.is_dir():
+        module_file = root.with_suffix(".py")
+        return [(package, module_file)] if module_file.exists() else []
+
+    sources = []
+    for path in sorted(root.rglob("*.py")):
+        relative = path.relative_to(root).with_suffix("").parts
+        if relative[-1] == "__init__":
+            relative = relative[:-1]
+        sources.append((".".join((package,) + relative), path))
+    return sources
+
+
+def _top_level_statements(body: List[ast.stmt]) -> Iterator[ast.stmt]:
+    """Yield module-level statements, descending into if/try blocks."""
+    for node in body:
+        if isinstance(node, ast.If):
+            yield from _top_level_statements(node.body)
+            yield from _top_level_statements(node.orelse)
+        elif isinstance(node, ast.Try):
+            for block in (node.body, node.orelse, node.finalbody):
+                yield from _top_level_statements(block)
+            for handler in node.handlers:
+                yield from _top_level_statements(handler.body)
+        else:
+            yield node
+
+
+def _exported_names(source: str, is_package: bool) -> Set[str]:
+    """
+    Collect the public names a module makes available for import.
+
+    Definitions and ``__all__`` entries count for every module; names imported
+    from elsewhere only count in a package ``__init__``, where they form its API.
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return set()
+
+    names = set()
+    for node in _top_level_statements(tree.body):
+        if isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    names.add(target.id)
+            if any(isinstance(t, ast.Name) and t.id == "__all__" for t in node.targets) and isinstance(
+                node.value, (ast.List, ast.Tuple)
+            ):
+                names.update(e.value for e in node.value.elts if isinstance(e, ast.Constant))
+        elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+            names.add(node.target.id)
+        elif isinstance(node, ast.ImportFrom) and is_package:
+            names.update(alias.asname or alias.name for alias in node.names if alias.name != "*")
+
+    return {name for name in names if isinstance(name, str) and not name.startswith("_")}
+
+
+def _fingerprint(sources: List[Tuple[str, Path]]) -> str:
+    """Hash of the source file locations, sizes and modification times."""
+    digest = hashlib.sha256()
+    for module, path in sources:
+        stat = path.stat()
+        digest.update(f"{module}|{path}|{stat.st_size}|{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def build_symbol_index(sources: Dict[str, List[Tuple[str, Path]]]) -> Dict[str, str]:
+    """
+    Build a symbol -> module index by statically scanning package sources.
+
+    When several modules export a symbol, the earliest package wins, then
+    public over private modules, then the shortest module path (so package
+    level re-exports such as ``sempyro.dcat`` are preferred).
+
+    Args:
+        sources: Mapping of package name to its (module name, source path) tuples
+
+    Returns:
+        Dictionary mapping each symbol to the module it should be imported from
+    """
+    candidates: Dict[str, List[Tuple[int, bool, int, str]]] = {}
+    for package_rank, module_sources in enumerate(sources.values()):
+        for module, path in module_sources:
+            is_package = path.name == "__init__.py"
+            names = _exported_names(path.read_text(encoding="utf-8", errors="replace"), is_package)
+            is_private = any(part.startswith("_") for part in module.split("."))
+            rank = (package_rank, is_private, module.count("."), module)
+            for name in names:
+                candidates.setdefault(name, []).append(rank)
+
+    return {name: min(ranks)[3] for name, ranks in candidates.items()}
+
+
+def free_names(code: str) -> Set[str]:
+    """
+    Find the names a piece of Python code uses without defining them.
+
+    Args:
+        code: Python source code
+
+    Returns:
+        Set of names that must come from imports
+    """
+    tree = ast.parse(code)
+
+    loaded, bound = set(), set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            (loaded if isinstance(node.ctx, ast.Load) else bound).add(node.id)
+        elif isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            bound.add(node.name)
+        elif isinstance(node, ast.arg):
+            bound.add(node.arg)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            bound.update((alias.asname or alias.name).split(".")[0] for alias in node.names)
+
+    return loaded - bound - BUILTIN_NAMES
+
+
+class ImportResolver:
+    """Computes the imports a generated SeMPyRO module needs from the names it uses."""
+
+    def __init__(self, packages: Tuple[str, ...] = DEFAULT_PACKAGES, cache_dir: Optional[Path] = None):
+        """
+        Initialize the resolver. The symbol index is built lazily on first use.
+
+        Args:
+            packages: Packages to index, in order of preference
+            cache_dir: Directory for the cached index (defaults to the user cache dir)
+        """
+        self.packages = packages
+        self.cache_dir = cache_dir
+        self._index: Optional[Dict[str, str]] = None
+        self._lowercase: Optional[Dict[str, str]] = None
+
+    @property
+    def index(self) -> Dict[str, str]:
+        """Symbol -> module index, loaded from the disk cache when up to date."""
+        if self._index is None:
+            self._index = self._load_index()
+        return self._index
+
+    def _load_index(self) -> Dict[str, str]:
+        sources = {package: _package_sources(package) for package in self.packages}
+        fingerprint = _fingerprint([source for package_sources in sources.values() for source in package_sources])
+
+        cache_dir = self.cache_dir or get_cache_dir("sempyro")
+        cache_file = Path(cache_dir) / f"symbol-index-{fingerprint[:16]}.json"
+        if cache_file.exists():
+            try:
+                cached = json.loads(cache_file.read_text(encoding="utf-8"))
+                if cached.get("fingerprint") == fingerprint:
+                    return cached["index"]
+            except (OSError, ValueError, KeyError):
+                pass
+
+        index = build_symbol_index(sources)
+        try:
+            Path(cache_dir).mkdir(parents=True, exist_ok=True)
+            cache_file.write_text(json.dumps({"fingerprint": fingerprint, "index": index}), encoding="utf-8")
+        except OSError as e:
+            print(f"Warning: Could not write symbol index cache: {e}")
+        return index
+
+    def alias_import(self, name: str) -> Optional[Import]:
+        """
+        Import a class under the name the generator gives base classes.
+
+        Base classes are named after their namespace and class, e.g. 'FOAFAgent'
+        for foaf:Agent, with the class name capitalized, e.g. 'DCATDataservice'
+        for dcat:DataService. They are imported under that name as an alias of
+        the indexed class: a symbol differing only in case, or the class of the
+        module of the namespace (sempyro.foaf.Agent for 'FOAFAgent').
+
+        Args:
+            name: Name used by the generated code
+
+        Returns:
+            Aliased import, or None if no indexed class matches
+        """
+        if self._lowercase is None:
+            self._lowercase = {symbol.lower(): symbol for symbol in sorted(self.index, reverse=True)}
+        symbol = self._lowercase.get(name.lower())
+        if symbol is not None:
+            return Import(module=self.index[symbol], objects=[ObjectImport(name=symbol, alias=name)])
+
+        match = re.fullmatch(r"([A-Z]+)([A-Z][a-z]\w*)", name)
+        if match is None:
+            return None
+        modules = {f"{package}.{match.group(1).lower()}" for package in self.packages}
+        symbol = self._lowercase.get(match.group(2).lower())
+        if symbol is None or not any(
+            self.index[symbol] == module or self.index[symbol].startswith(f"{module}.") for module in modules
+        ):
+            return None
+        return Import(module=self.index[symbol], objects=[ObjectImport(name=symbol, alias=name)])
+
+    def resolve(self, code: str, symbols: Optional[Mapping[str, Import]] = None) -> Tuple[Imports, Set[str]]:
+        """
+        Compute the imports needed by a piece of generated code.
+
+        Names are looked up in the symbol index, then in the given symbols, then
+        as aliased base classes (see alias_import).
+
+        Args:
+            code: Python source of the generated module
+            symbols: Imports of names the index does not have, e.g. ImportRegistry.symbols()
+
+        Returns:
+            Tuple of (Imports for all resolvable names, set of unresolved names)
+        """
+        imports = Imports()
+        unresolved = set()
+        names = free_names(code)
+        symbols = symbols or {}
+
+        for name in sorted(names):
+            if name in MODULE_IMPORTS:
+                imports += Import(module=name)
+            elif name in self.index:
+                imports += Import(module=self.index[name], objects=[ObjectImport(name=name)])
+            elif name in symbols:
+                imports += symbols[name]
+            elif (alias := self.alias_import(name)) is not None:
+                imports += alias
+            else:
+                unresolved.add(name)
+
+        return imports, unresolved
+
+
+@lru_cache(maxsize=None)
+def get_import_resolver(packages: Tuple[str, ...] = DEFAULT_PACKAGES) -> ImportResolver:
+    """Get the resolver shared by everything in this process, so the index is loaded once."""
+    return ImportResolver(packages)
@@ -1,17 +1,37 @@
+from dataclasses import dataclass
+
+from jinja2 import ChoiceLoader, Environment, FileSystemLoader
 from linkml.generators import PydanticGenerator
 from linkml.generators.pydanticgen import (
+    Import,
     Imports,
     PydanticBaseModel,
     PydanticModule,
 )
 from linkml.generators.pydanticgen.pydanticgen import SplitMode
+from linkml.generators.pydanticgen.template import ObjectImport
 from linkml_runtime import SchemaView
 from linkml_runtime.utils.formatutils import camelcase
 
+from metadata_automation.sempyro.template_env import get_template_environment
+
 
+@dataclass
 class CustomPydanticGenerator(PydanticGenerator):
     """Custom PydanticGenerator that skips default imports"""
 
+    persist_template_cache: bool = True
+    """Store compiled templates in the on-disk bytecode cache"""
+
+    def _template_environment(self) -> Environment:
+        """
+        Override to use the shared SeMPyRO template environment
+        """
+        env = get_template_environment(self.persist_template_cache)
+        if self.template_dir is not None:
+            env = env.overlay(loader=ChoiceLoader([FileSystemLoader(self.template_dir), env.loader]))
+        return env
+
     def render(self) -> PydanticModule:
         """
         Override render to skip DEFAULT_IMPORTS
@@ -41,6 +61,8 @@ class CustomPydanticGenerator(PydanticGenerator):
         # enums
         enums = self.before_generate_enums(list(sv.all_enums().values()), sv)
         enums = self.generate_enums({e.name: e for e in enums})
+        if enums:
+            imports += Import(module="enum", objects=[ObjectImport(name="Enum")])
 
         base_model = PydanticBaseModel(extra_fields=self.extra_fields, fields=self.injected_fields)
 
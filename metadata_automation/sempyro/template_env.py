@@ -0,0 +1,65 @@
+"""
+Shared Jinja environment for the SeMPyRO Pydantic templates.
+
+The templates are loaded from the package resources, so generation does not
+depend on the working directory. The environment is created once per process
+and shared by all generator instances, so each template is compiled only once.
+Compiled templates can additionally be persisted in a bytecode cache on disk.
+"""
+
+import hashlib
+from importlib import resources
+from typing import Dict
+
+from jinja2 import ChoiceLoader, Environment, FileSystemBytecodeCache, PackageLoader
+
+from metadata_automation.cache import get_cache_dir
+
+TEMPLATE_PACKAGE = "metadata_automation.sempyro"
+TEMPLATE_DIR = "templates"
+
+_environments: Dict[bool, Environment] = {}
+
+
+def get_template_environment(persist_cache: bool = True) -> Environment:
+    """
+    Get the shared template environment.
+
+    SeMPyRO templates take precedence, any template not overridden falls back
+    to the default linkml Pydantic templates.
+
+    Args:
+        persist_cache: Store compiled templates in the on-disk bytecode cache
+
+    Returns:
+        Jinja environment shared by all callers with the same persist_cache setting
+    """
+    if persist_cache not in _environments:
+        _environments[persist_cache] = Environment(
+            loader=ChoiceLoader(
+                [
+                    PackageLoader(TEMPLATE_PACKAGE, TEMPLATE_DIR),
+                    PackageLoader("linkml.generators.pydanticgen", "templates"),
+                ]
+            ),
+            bytecode_cache=FileSystemBytecodeCache(str(get_cache_dir("jinja"))) if persist_cache else None,
+            trim_blocks=True,
+            lstrip_blocks=True,
+        )
+    return _environments[persist_cache]
+
+
+def template_fingerprint() -> str:
+    """
+    Hash of the SeMPyRO templates, identifying the templates output was rendered with.
+
+    Returns:
+        Hex digest of the names and contents of the template files
+    """
+    digest = hashlib.sha256()
+    templates = resources.files(TEMPLATE_PACKAGE).joinpath(TEMPLATE_DIR)
+    for template in sorted(templates.iterdir(), key=lambda t: t.name):
+        if template.name.endswith(".jinja"):
+            digest.update(template.name.encode("utf-8"))
+            digest.update(template.read_bytes())
+    return digest.hexdigest()
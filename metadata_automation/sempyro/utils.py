@@ -1,6 +1,6 @@
 import re
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 import yaml
 from linkml.generators.pydanticgen.template import (
@@ -9,6 +9,7 @@ from linkml.generators.pydanticgen.template import (
     ObjectImport,
 )
 
+from metadata_automation.linkml.creator import SEMPYRO_INPUTS
 from metadata_automation.sempyro.sempyro_generator import (
     CustomPydanticGenerator,
 )
@@ -41,7 +42,7 @@ def load_yaml(yaml_path: str | Path) -> Dict[str, Any]:
 
 
 def add_validation_logic_to_schema(link_dict: Dict[str, Any]) -> None:
-    validation_logic_path = Path("./inputs/sempyro/validation_logic.yaml")
+    validation_logic_path = SEMPYRO_INPUTS / "validation_logic.yaml"
 
     if not validation_logic_path.exists():
         return None
@@ -214,21 +215,161 @@ def parse_import_statements(import_text: str) -> "Imports":
     return imports
 
 
+def parse_import_entries(entries: List[Any]) -> "Imports":
+    """
+    Convert structured import entries to Import objects without regex parsing.
+
+    Each entry is a mapping with a ``module`` key and optional ``alias`` and
+    ``objects`` keys. Objects are either names or mappings with ``name`` and
+    ``alias``. Plain strings are parsed as Python import statements.
+
+    Args:
+        entries: List of structured import entries
+
+    Returns:
+        Imports object containing all imports, with duplicates merged
+
+    Raises:
+        ValueError: If an entry has no 'module' key
+    """
+    imports = Imports()
+
+    for entry in entries:
+        if isinstance(entry, str):
+            imports += parse_import_statements(entry)
+            continue
+
+        if not isinstance(entry, dict) or "module" not in entry:
+            raise ValueError(f"Import entry must be a mapping with a 'module' key: {entry}")
+
+        objects = None
+        if entry.get("objects") is not None:
+            objects = []
+            for item in entry["objects"]:
+                if isinstance(item, dict):
+                    objects.append(ObjectImport(name=item["name"], alias=item.get("alias")))
+                else:
+                    objects.append(ObjectImport(name=str(item)))
+
+        imports += Import(module=entry["module"], alias=entry.get("alias"), objects=objects)
+
+    return imports
+
+
 def generate_from_linkml(link_dict):
+    """
+    Generate a SeMPyRO Pydantic module from a LinkML schema.
+
+    Args:
+        link_dict: Dictionary with 'schema_path', 'imports' and 'output_path' keys.
+                   'imports' is raw import text, a parsed Imports object or None.
+                   An optional 'import_resolver' (ImportResolver) adds any imports
+                   the generated code needs that are not in 'imports', also from the
+                   optional 'import_symbols' (see ImportRegistry.symbols).
+                   'persist_template_cache' (default True) stores compiled templates on disk.
+
+    Returns:
+        Set of names used by the generated code that could not be resolved to an import
+    """
     print(f"Generating from {link_dict['schema_path']}...")
 
+    # Accept raw import text as well as Imports pre-parsed by an ImportRegistry
+    imports = link_dict.get("imports")
+    if isinstance(imports, str):
+        imports = parse_import_statements(imports)
+
     generator = CustomPydanticGenerator(
         schema=link_dict["schema_path"],
-        imports=parse_import_statements(link_dict["imports"]),
+        imports=imports,
         black=True,
-        template_dir="metadata_automation/sempyro/templates",
         mergeimports=False,
+        persist_template_cache=link_dict.get("persist_template_cache", True),
     )
 
+    module = generator.render()
+    unresolved = set()
+    resolver = link_dict.get("import_resolver")
+    if resolver is not None:
+        # Render a draft without formatting to find the names that still need imports
+        draft = module.render(generator._template_environment(), False)
+        inferred, unresolved = resolver.resolve(draft, link_dict.get("import_symbols"))
+        module.python_imports = module.python_imports + inferred
+
     # Create parent directory if it doesn't exist
     output_path = Path(link_dict["output_path"])
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
     with open(output_path, "w") as fname:
-        fname.write(generator.serialize())
+        fname.write(generator.serialize(module))
+    print("Done.")
+    return unresolved
+
+
+def generate_combined_from_linkml(link_dict: Dict[str, Any]) -> Dict[str, set]:
+    """
+    Generate one SeMPyRO Pydantic module per class from a combined LinkML schema.
+
+    The schema is loaded and rendered by a single generator, after which the
+    rendered classes are split into separate modules.
+
+    Args:
+        link_dict: Dictionary with 'schema_path' (combined schema) and 'modules', a mapping of
+                   class name to a dictionary with 'output_path' and 'imports' (Imports, import
+                   text or None). An optional 'import_resolver' (ImportResolver) infers the
+                   imports of modules without an imports configuration, also from the
+                   optional 'import_symbols' (see ImportRegistry.symbols).
+                   'persist_template_cache' (default True) stores compiled templates on disk.
+
+    Returns:
+        Dictionary of class name to the set of names that could not be resolved to an import
+    """
+    print(f"Generating from {link_dict['schema_path']}...")
+
+    generator = CustomPydanticGenerator(
+        schema=link_dict["schema_path"],
+        black=True,
+        mergeimports=False,
+        persist_template_cache=link_dict.get("persist_template_cache", True),
+    )
+    combined = generator.render()
+    resolver = link_dict.get("import_resolver")
+
+    unresolved = {}
+    for class_name, module_config in link_dict["modules"].items():
+        if class_name not in combined.classes:
+            raise KeyError(f"Class {class_name} not found in {link_dict['schema_path']}")
+
+        imports = module_config.get("imports")
+        if isinstance(imports, str):
+            imports = parse_import_statements(imports)
+
+        # Only the enums the class uses, e.g. of its controlled vocabularies
+        ranges = " ".join(
+            str(attribute.range) for attribute in (combined.classes[class_name].attributes or {}).values()
+        )
+        enums = {name: enum for name, enum in combined.enums.items() if re.search(rf"\b{name}\b", ranges)}
+        python_imports = imports if imports is not None else Imports()
+        if enums:
+            python_imports = python_imports + Import(module="enum", objects=[ObjectImport(name="Enum")])
+
+        module = combined.model_copy(
+            update={
+                "classes": {class_name: combined.classes[class_name]},
+                "enums": enums,
+                "python_imports": python_imports,
+            }
+        )
+        unresolved[class_name] = set()
+        if imports is None and resolver is not None:
+            draft = module.render(generator._template_environment(), False)
+            inferred, unresolved[class_name] = resolver.resolve(draft, link_dict.get("import_symbols"))
+            module.python_imports = module.python_imports + inferred
+
+        output_path = Path(module_config["output_path"])
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, "w") as fname:
+            fname.write(generator.serialize(module))
+        print(f"Written {output_path}")
+
     print("Done.")
+    return unresolved
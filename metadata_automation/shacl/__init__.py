@@ -0,0 +1 @@
+"""Validation of data graphs with the generated SHACL shapes."""
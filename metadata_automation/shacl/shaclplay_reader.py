@@ -0,0 +1,317 @@
+"""
+Native reader of SHACLPlay workbooks, converting them to SHACL without Java.
+
+Reads SHACLPlay Excel files the way the xls2rdf converter does, so that
+generated as well as hand-edited files (e.g. ``inputs/shacls/SHACL-dataset.xlsx``)
+can be converted in-process:
+
+- The 'prefixes' sheet declares prefixes in rows of 'PREFIX', prefix and
+  namespace, on top of the default prefixes of xls2rdf.
+- Every other sheet may start with a header block: a row with the URI of the
+  shapes graph in its second cell, followed by rows of a predicate and its
+  value, up to the first empty row.
+- The row starting with 'URI' holds the column specifications, e.g.
+  'rdfs:label@en', 'sh:minCount^^xsd:integer', 'rdf:type(separator=",")' or
+  '^sh:property' for the inverse predicate; '#' columns are comments. The rows
+  below it are resources: the subject in the first column and a value of the
+  column predicate in every other cell. Rows whose first cell is not an IRI,
+  e.g. section headers, are skipped.
+
+Cells of columns without a language or datatype are IRIs when they are a full
+IRI or a prefixed name of a known prefix, RDF lists when written as
+'( a b c )', and plain literals otherwise. Typed cells that are not valid for
+their datatype are left out, as xls2rdf does.
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from rdflib import XSD, BNode, Graph, Literal, URIRef
+from rdflib.collection import Collection
+from rdflib.term import Node
+
+from metadata_automation.workbook import WorkbookSnapshot
+
+# Converters of SHACLPlay workbooks: the xls2rdf JAR and this reader
+SHACL_ENGINES = ("xls2rdf", "python")
+
+PREFIXES_SHEET = "prefixes"
+
+# Prefixes xls2rdf always declares, in the order it writes them
+DEFAULT_PREFIXES = {
+    "schema": "http://schema.org/",
+    "adms": "http://www.w3.org/ns/adms#",
+    "owl": "http://www.w3.org/2002/07/owl#",
+    "org": "http://www.w3.org/ns/org#",
+    "xls2rdf": "https://xls2rdf.sparna.fr/vocabulary#",
+    "xsd": "http://www.w3.org/2001/XMLSchema#",
+    "skosthes": "http://purl.org/iso25964/skos-thes#",
+    "rdfs": "http://www.w3.org/2000/01/rdf-schema#",
+    "qb": "http://purl.org/linked-data/cube#",
+    "dct": "http://purl.org/dc/terms/",
+    "sh": "http://www.w3.org/ns/shacl#",
+    "doap": "http://usefulinc.com/ns/doap#",
+    "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+    "dcat": "http://www.w3.org/ns/dcat#",
+    "dash": "http://datashapes.org/dash#",
+    "euvoc": "http://publications.europa.eu/ontology/euvoc#",
+    "prov": "http://www.w3.org/ns/prov#",
+    "foaf": "http://xmlns.com/foaf/0.1/",
+    "dc": "http://purl.org/dc/elements/1.1/",
+    "skos": "http://www.w3.org/2004/02/skos/core#",
+    "skosxl": "http://www.w3.org/2008/05/skos-xl#",
+}
+
+# Prefixes that are understood but not declared in the output, e.g. 'dcterms:description' in header blocks
+PREFIX_ALIASES = {"dcterms": "http://purl.org/dc/terms/"}
+
+# rdflib also accepts e.g. a space between date and time, xsd:dateTime and xls2rdf do not
+LEXICAL_FORMS = {
+    XSD.dateTime: r"-?\d{4,}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?(Z|[+-]\d{2}:\d{2})?",
+    XSD.date: r"-?\d{4,}-\d{2}-\d{2}(Z|[+-]\d{2}:\d{2})?",
+}
+
+
+def _cell_text(value: Any) -> Optional[str]:
+    """Text of a cell as xls2rdf reads it, or None if it is empty."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    text = str(value).strip()
+    return text or None
+
+
+@dataclass(frozen=True)
+class ColumnSpec:
+    """Specification of a column, e.g. 'sh:minCount^^xsd:integer' or '^sh:property(separator=",")'."""
+
+    predicate: str
+    inverse: bool = False
+    language: Optional[str] = None
+    datatype: Optional[str] = None
+    separator: Optional[str] = None
+
+    @classmethod
+    def parse(cls, value: Any) -> Optional["ColumnSpec"]:
+        """
+        Parse the specification of a column.
+
+        Args:
+            value: Cell of the header row
+
+        Returns:
+            ColumnSpec, or None for empty and comment ('#') columns
+        """
+        text = _cell_text(value)
+        if text is None or text.startswith("#"):
+            return None
+        match = re.fullmatch(r"(\^)?([^\s@^(]+)(?:@([A-Za-z0-9-]+))?(?:\^\^([^\s(]+))?(?:\((.*)\))?", text)
+        if match is None:
+            return None
+        inverse, predicate, language, datatype, parameters = match.groups()
+        separator = re.search(r'separator\s*=\s*"([^"]*)"', parameters or "")
+        return cls(predicate, bool(inverse), language, datatype, separator.group(1) if separator else None)
+
+
+class ShaclPlayReader:
+    """Converts the sheets of a SHACLPlay workbook to an RDF graph."""
+
+    def __init__(self, prefixes: Optional[Dict[str, str]] = None):
+        """
+        Initialize the reader.
+
+        Args:
+            prefixes: Prefixes declared by the workbook, overriding the default prefixes
+        """
+        self.prefixes = {**DEFAULT_PREFIXES, **(prefixes or {})}
+        self.graph = Graph(bind_namespaces="none")
+        for prefix, namespace in self.prefixes.items():
+            self.graph.bind(prefix, namespace, override=True, replace=True)
+
+    def iri(self, text: str) -> Optional[URIRef]:
+        """
+        Resolve a cell to an IRI.
+
+        Args:
+            text: Full IRI, optionally in angle brackets, or prefixed name
+
+        Returns:
+            IRI, or None if the text is not an IRI or uses an unknown prefix
+        """
+        if text.startswith("<") and text.endswith(">"):
+            return URIRef(text[1:-1])
+        if re.match(r"(https?|urn|mailto):", text):
+            return URIRef(text)
+        match = re.fullmatch(r"([A-Za-z][\w.-]*)?:(\S*)", text)
+        if match is None:
+            return None
+        prefix = match.group(1) or ""
+        namespace = self.prefixes.get(prefix, PREFIX_ALIASES.get(prefix))
+        return URIRef(namespace + match.group(2)) if namespace is not None else None
+
+    def term(self, text: str, spec: ColumnSpec) -> Optional[Node]:
+        """
+        Convert the text of a cell to an RDF term.
+
+        Args:
+            text: Text of the cell
+            spec: Specification of its column
+
+        Returns:
+            RDF term, or None if the text is not valid for the datatype of the column
+        """
+        if spec.language is not None:
+            return Literal(text, lang=spec.language)
+        if spec.datatype is not None:
+            datatype = self.iri(spec.datatype)
+            if datatype is None or datatype == XSD.string:
+                return Literal(text)
+            if datatype in LEXICAL_FORMS and not re.fullmatch(LEXICAL_FORMS[datatype], text):
+                return None
+            literal = Literal(text, datatype=datatype)
+            return None if literal.ill_typed else literal
+        if text.startswith("(") and text.endswith(")"):
+            items = [self.term(item, spec) for item in self._list_items(text[1:-1])]
+            head = BNode()
+            Collection(self.graph, head, [item for item in items if item is not None])
+            return head
+        if len(text) > 1 and text[0] == text[-1] == '"':
+            return Literal(text[1:-1])
+        return self.iri(text) or Literal(text)
+
+    @staticmethod
+    def _list_items(text: str) -> List[str]:
+        """Items of an RDF list written as '( a b c )', quoted items kept whole."""
+        return re.findall(r'"[^"]*"|\S+', text)
+
+    def _add(self, subject: URIRef, spec: ColumnSpec, value: Any) -> None:
+        """Add the triples of a cell."""
+        text = _cell_text(value)
+        predicate = self.iri(spec.predicate)
+        if text is None or predicate is None:
+            return
+        parts = text.split(spec.separator) if spec.separator else [text]
+        for part in (part.strip() for part in parts):
+            obj = self.term(part, spec) if part else None
+            if obj is None:
+                continue
+            if spec.inverse:
+                if isinstance(obj, URIRef):
+                    self.graph.add((obj, predicate, subject))
+            else:
+                self.graph.add((subject, predicate, obj))
+
+    def read_sheet(self, rows: List[list]) -> None:
+        """
+        Add the header block and the resources of a sheet to the graph.
+
+        Args:
+            rows: Rows of cell values of the sheet
+        """
+        rows = [list(row) for row in rows]
+        position = 0
+        # Header block: the URI of the shapes graph and rows of a predicate and its value
+        if rows and len(rows[0]) > 1 and _cell_text(rows[0][1]) and _cell_text(rows[0][0]) != "URI":
+            subject = self.iri(_cell_text(rows[0][1]))
+            position = 1
+            while position < len(rows) and any(_cell_text(cell) for cell in rows[position]):
+                spec = ColumnSpec.parse(rows[position][0])
+                if subject is not None and spec is not None and len(rows[position]) > 1:
+                    self._add(subject, spec, rows[position][1])
+                position += 1
+
+        for header in range(position, len(rows)):
+            if _cell_text(rows[header][0]) == "URI":
+                break
+        else:
+            return
+        specs = [ColumnSpec.parse(cell) for cell in rows[header]]
+        for row in rows[header + 1 :]:
+            text = _cell_text(row[0]) if row else None
+            subject = self.iri(text) if text else None
+            if subject is None:
+                continue
+            for spec, value in zip(specs[1:], row[1:], strict=False):
+                if spec is not None:
+                    self._add(subject, spec, value)
+
+
+def read_prefixes(rows: List[list]) -> Dict[str, str]:
+    """
+    Read the 'prefixes' sheet of a SHACLPlay workbook.
+
+    Args:
+        rows: Rows of cell values, 'PREFIX', prefix and namespace
+
+    Returns:
+        Dictionary of prefix to namespace, in the order of the sheet
+    """
+    prefixes = {}
+    for row in rows:
+        cells = [_cell_text(cell) for cell in row[:3]]
+        if len(cells) == 3 and (cells[0] or "").upper() == "PREFIX" and cells[2]:
+            prefixes[cells[1] or ""] = cells[2]
+    return prefixes
+
+
+def shaclplay_graph(workbook: WorkbookSnapshot) -> Graph:
+    """
+    Convert a SHACLPlay workbook to an RDF graph.
+
+    Args:
+        workbook: Snapshot of the SHACLPlay workbook
+
+    Returns:
+        Graph with the shapes of all sheets, and the prefixes of the workbook bound
+    """
+    reader = ShaclPlayReader(read_prefixes(workbook.sheets.get(PREFIXES_SHEET, [])))
+    for sheet_name, rows in workbook.sheets.items():
+        if sheet_name != PREFIXES_SHEET:
+            reader.read_sheet(rows)
+    return reader.graph
+
+
+def read_shaclplay(path: str | Path, reader: Optional[str] = None) -> Graph:
+    """
+    Read a SHACLPlay Excel file into an RDF graph.
+
+    Args:
+        path: Path to the SHACLPlay Excel file
+        reader: Excel reader backend, see metadata_automation.workbook.resolve_reader
+
+    Returns:
+        Graph with the shapes of the workbook
+    """
+    return shaclplay_graph(WorkbookSnapshot.from_excel(path, reader))
+
+
+def nodeshape_uri(sheet: pd.DataFrame) -> Any:
+    """
+    Get the URI of the first NodeShape of a 'NodeShapes (classes)' sheet, as written in the sheet.
+
+    Args:
+        sheet: Sheet read without header
+
+    Returns:
+        URI of the first row below the 'URI' header row with a prefixed name or IRI, e.g. 'hri:DatasetShape';
+        without a header row, the cell in row 14 where the SHACLPlay template has it
+
+    Raises:
+        IndexError: If the sheet has no header row and fewer than 14 rows
+    """
+    first_column = [_cell_text(value) for value in sheet.iloc[:, 0]] if not sheet.empty else []
+    if "URI" in first_column:
+        for text in first_column[first_column.index("URI") + 1 :]:
+            if text is not None and ":" in text:
+                return text
+    return sheet.iloc[13, 0]
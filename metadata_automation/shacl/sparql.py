@@ -0,0 +1,334 @@
+"""
+Compilation of the generated SHACL shapes to SPARQL validation queries.
+
+Every constraint of a property shape is compiled to a SELECT query returning
+all violating focus nodes at once, so a catalog loaded into a triple store is
+validated set-at-a-time instead of node by node. The constraints written by
+the SHACLPlay converter are supported: sh:minCount, sh:maxCount, sh:nodeKind,
+sh:datatype, sh:in, sh:pattern and sh:node. Nested shapes (sh:node) are
+compiled to the same queries on the values of the outer focus nodes, and
+reported as sh:NodeConstraintComponent results of the outer focus node, as a
+SHACL processor does.
+
+The queries run on an rdflib graph, or on a pyoxigraph store with the optional
+pyoxigraph dependency (``pip install metadata-automation[sparql]``).
+"""
+
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence
+
+from rdflib import RDF, RDFS, SH, BNode, Graph, Literal, URIRef
+from rdflib.collection import Collection
+from rdflib.term import Node
+
+from metadata_automation.output import OutputWriter
+from metadata_automation.shacl.validation import load_graph
+
+STORE_BACKENDS = ("rdflib", "oxigraph")
+
+NODE_KIND_TESTS = {
+    SH.IRI: "isIRI(?value)",
+    SH.Literal: "isLiteral(?value)",
+    SH.BlankNode: "isBlank(?value)",
+    SH.BlankNodeOrIRI: "(isBlank(?value) || isIRI(?value))",
+    SH.BlankNodeOrLiteral: "(isBlank(?value) || isLiteral(?value))",
+    SH.IRIOrLiteral: "(isIRI(?value) || isLiteral(?value))",
+}
+
+
+@dataclass(frozen=True)
+class ConstraintQuery:
+    """SPARQL query returning the violations of one constraint."""
+
+    shape: Node
+    path: URIRef
+    component: URIRef
+    query: str
+
+    @property
+    def name(self) -> str:
+        """File name friendly identifier of the query."""
+        # Blank node property shapes have no stable name, their path is used instead
+        source = self.path if isinstance(self.shape, BNode) else self.shape
+        shape = re.sub(r"[^A-Za-z0-9_-]+", "_", str(source).rsplit("/", 1)[-1].rsplit("#", 1)[-1])
+        component = str(self.component).rsplit("#", 1)[-1].removesuffix("ConstraintComponent")
+        return f"{shape}-{component}"
+
+
+@dataclass(frozen=True)
+class Violation:
+    """A violating focus node, reported like a SHACL validation result."""
+
+    focus_node: Node
+    path: URIRef
+    component: URIRef
+    shape: Node
+    value: Optional[Node] = None
+
+
+@dataclass(frozen=True)
+class _Scope:
+    """Focus nodes a constraint applies to: top-level targets, or values of (nested) properties."""
+
+    selection: str
+    focus: str
+    group: str
+    report: Optional[tuple] = None
+
+    def nested(self, path: URIRef, level: int, shape: URIRef, outer_path: URIRef) -> "_Scope":
+        value = "?nested" if self.report is None else f"?n{level}"
+        return _Scope(
+            selection=f"{self.selection}\n    {self.focus} {path.n3()} {value} .",
+            focus=value,
+            group=f"{self.group} {value}",
+            report=self.report or (shape, outer_path),
+        )
+
+
+def _value_query(scope: _Scope, path: URIRef, condition: str) -> str:
+    value = "?nested" if scope.report else "?value"
+    return (
+        f"SELECT DISTINCT ?root ({value} AS ?result) WHERE {{\n"
+        f"    {scope.selection}\n"
+        f"    {scope.focus} {path.n3()} ?value .\n"
+        f"    FILTER(!({condition}))\n"
+        f"}}"
+    )
+
+
+def _count_query(scope: _Scope, path: URIRef, comparison: str) -> str:
+    value = "?nested" if scope.report else "?none"
+    return (
+        f"SELECT DISTINCT ?root ({value} AS ?result) WHERE {{\n"
+        f"  {{\n"
+        f"    SELECT {scope.group} (COUNT(DISTINCT ?value) AS ?count) WHERE {{\n"
+        f"      {scope.selection}\n"
+        f"      OPTIONAL {{ {scope.focus} {path.n3()} ?value }}\n"
+        f"    }} GROUP BY {scope.group}\n"
+        f"  }}\n"
+        f"  FILTER(?count {comparison})\n"
+        f"}}"
+    )
+
+
+def _property_conditions(shapes_graph: Graph, property_shape) -> Iterable[tuple]:
+    """Yield (component, kind, condition) of the constraints of a property shape."""
+    min_count = shapes_graph.value(property_shape, SH.minCount)
+    if min_count is not None:
+        yield SH.MinCountConstraintComponent, "count", f"< {int(min_count)}"
+    max_count = shapes_graph.value(property_shape, SH.maxCount)
+    if max_count is not None:
+        yield SH.MaxCountConstraintComponent, "count", f"> {int(max_count)}"
+    node_kind = shapes_graph.value(property_shape, SH.nodeKind)
+    if node_kind in NODE_KIND_TESTS:
+        yield SH.NodeKindConstraintComponent, "value", NODE_KIND_TESTS[node_kind]
+    datatype = shapes_graph.value(property_shape, SH.datatype)
+    if datatype is not None:
+        yield SH.DatatypeConstraintComponent, "value", f"isLiteral(?value) && datatype(?value) = {datatype.n3()}"
+    values = shapes_graph.value(property_shape, SH["in"])
+    if values is not None:
+        members = ", ".join(member.n3() for member in Collection(shapes_graph, values))
+        yield SH.InConstraintComponent, "value", f"?value IN ({members})"
+    pattern = shapes_graph.value(property_shape, SH.pattern)
+    if pattern is not None:
+        flags = shapes_graph.value(property_shape, SH.flags)
+        arguments = f"{Literal(str(pattern)).n3()}" + (f", {Literal(str(flags)).n3()}" if flags else "")
+        yield SH.PatternConstraintComponent, "value", f"!isBlank(?value) && REGEX(STR(?value), {arguments})"
+
+
+def _compile_node_shape(
+    shapes_graph: Graph, node_shape, scope: _Scope, visited: frozenset, level: int
+) -> List[ConstraintQuery]:
+    queries = []
+    for property_shape in sorted(shapes_graph.objects(node_shape, SH.property)):
+        path = shapes_graph.value(property_shape, SH.path)
+        if not isinstance(path, URIRef):
+            # Only predicate paths are generated
+            continue
+        shape, report_path = scope.report or (property_shape, path)
+
+        for component, kind, condition in _property_conditions(shapes_graph, property_shape):
+            if kind == "count":
+                query = _count_query(scope, path, condition)
+            else:
+                query = _value_query(scope, path, condition)
+            queries.append(
+                ConstraintQuery(
+                    shape=shape,
+                    path=report_path,
+                    component=SH.NodeConstraintComponent if scope.report else component,
+                    query=query,
+                )
+            )
+
+        for nested_shape in sorted(shapes_graph.objects(property_shape, SH.node)):
+            if nested_shape in visited:
+                continue
+            queries.extend(
+                _compile_node_shape(
+                    shapes_graph,
+                    nested_shape,
+                    scope.nested(path, level + 1, property_shape, path),
+                    visited | {nested_shape},
+                    level + 1,
+                )
+            )
+    return queries
+
+
+def compile_shapes(shapes_graph: Graph) -> List[ConstraintQuery]:
+    """
+    Compile the node shapes with a sh:targetClass to SPARQL validation queries.
+
+    Each query selects '?root', the violating focus node, and '?result', the
+    violating value of a nested shape (unbound otherwise).
+
+    Args:
+        shapes_graph: Graph with the SHACL shapes
+
+    Returns:
+        List of ConstraintQuery objects
+    """
+    queries = []
+    for node_shape in sorted(set(shapes_graph.subjects(SH.targetClass, None))):
+        for target_class in sorted(shapes_graph.objects(node_shape, SH.targetClass)):
+            scope = _Scope(
+                selection=f"?root {RDF.type.n3()}/{RDFS.subClassOf.n3()}* {target_class.n3()} .",
+                focus="?root",
+                group="?root",
+            )
+            queries.extend(_compile_node_shape(shapes_graph, node_shape, scope, frozenset([node_shape]), 0))
+    return queries
+
+
+def write_queries(
+    queries: List[ConstraintQuery], output_path: Path, writer: Optional[OutputWriter] = None
+) -> List[Path]:
+    """
+    Write each query to a '.rq' file, to run them in a triple store.
+
+    Args:
+        queries: Compiled queries
+        output_path: Directory to write the queries to
+        writer: OutputWriter to write the files with, only if they changed
+
+    Returns:
+        Paths of the query files
+    """
+    writer = writer or OutputWriter()
+    paths = []
+    counts = {}
+    for query in queries:
+        counts[query.name] = counts.get(query.name, 0) + 1
+        suffix = f"-{counts[query.name]}" if counts[query.name] > 1 else ""
+        path = output_path / f"{query.name}{suffix}.rq"
+        writer.write_text(
+            path, f"# shape: {query.shape}\n# path: {query.path}\n# component: {query.component}\n{query.query}\n"
+        )
+        paths.append(path)
+    return paths
+
+
+def load_store(data_paths: Sequence[str | Path], backend: str = "rdflib"):
+    """
+    Load data files into a store the queries can run on.
+
+    Args:
+        data_paths: RDF files, or directories of Turtle files
+        backend: 'rdflib' (in-memory graph) or 'oxigraph' (indexed pyoxigraph store)
+
+    Returns:
+        rdflib Graph or pyoxigraph Store
+
+    Raises:
+        ImportError: If the oxigraph backend is requested without pyoxigraph installed
+        ValueError: If the backend is unknown
+    """
+    if backend == "rdflib":
+        return load_graph(data_paths)
+    if backend != "oxigraph":
+        raise ValueError(f"Unknown store backend '{backend}', expected one of {', '.join(STORE_BACKENDS)}")
+
+    try:
+        import pyoxigraph
+    except ImportError as e:
+        raise ImportError(
+            "The oxigraph store requires pyoxigraph, install it with 'pip install metadata-automation[sparql]'"
+        ) from e
+    store = pyoxigraph.Store()
+    for path in data_paths:
+        path = Path(path)
+        for file in sorted(path.rglob("*.ttl")) if path.is_dir() else [path]:
+            store.bulk_load(path=str(file), format=pyoxigraph.RdfFormat.from_extension(file.suffix.lstrip(".")))
+    return store
+
+
+def _rdflib_term(term) -> Optional[Node]:
+    """Convert a pyoxigraph term to an rdflib term; rdflib terms are returned as is."""
+    if term is None or isinstance(term, Node):
+        return term
+    kind = type(term).__name__
+    if kind == "NamedNode":
+        return URIRef(term.value)
+    if kind == "BlankNode":
+        return BNode(term.value)
+    if term.language:
+        return Literal(term.value, lang=term.language)
+    return Literal(term.value, datatype=URIRef(term.datatype.value))
+
+
+def run_queries(queries: List[ConstraintQuery], store) -> List[Violation]:
+    """
+    Run the validation queries on a store.
+
+    Args:
+        queries: Compiled queries
+        store: rdflib Graph or pyoxigraph Store, see load_store
+
+    Returns:
+        Distinct violations, sorted by focus node
+    """
+    violations = set()
+    for query in queries:
+        for row in store.query(query.query):
+            violations.add(
+                Violation(
+                    focus_node=_rdflib_term(row["root"]),
+                    path=query.path,
+                    component=query.component,
+                    shape=query.shape,
+                    value=_rdflib_term(row["result"]),
+                )
+            )
+    return sorted(violations, key=lambda v: (str(v.focus_node), str(v.path), str(v.component), str(v.value)))
+
+
+def violations_report(violations: List[Violation]) -> Graph:
+    """
+    Create a SHACL validation report from violations.
+
+    Args:
+        violations: Violations returned by run_queries
+
+    Returns:
+        Graph with a sh:ValidationReport
+    """
+    report = Graph()
+    report.bind("sh", SH)
+    report_node = BNode()
+    report.add((report_node, RDF.type, SH.ValidationReport))
+    report.add((report_node, SH.conforms, Literal(not violations)))
+    for violation in violations:
+        result = BNode()
+        report.add((report_node, SH.result, result))
+        report.add((result, RDF.type, SH.ValidationResult))
+        report.add((result, SH.resultSeverity, SH.Violation))
+        report.add((result, SH.focusNode, violation.focus_node))
+        report.add((result, SH.resultPath, violation.path))
+        report.add((result, SH.sourceConstraintComponent, violation.component))
+        report.add((result, SH.sourceShape, violation.shape))
+        if violation.value is not None:
+            report.add((result, SH.value, violation.value))
+    return report
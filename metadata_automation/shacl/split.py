@@ -0,0 +1,60 @@
+"""
+Splitting a combined SHACL shapes graph into a graph per class.
+
+A combined SHACLPlay workbook (``shaclplay --combined``) holds the shapes of
+all classes of a namespace and is converted with a single xls2rdf call into
+one shapes graph. Splitting gives each NodeShape its own graph again, with its
+property shapes and the blank nodes they use (e.g. ``sh:in`` lists), like the
+per-class Turtle files converted from per-class workbooks. The NodeShapes of
+a combined workbook are annotated with the sheet name of their class, which
+names their graph as it names per-class workbooks.
+"""
+
+import re
+from typing import Dict
+
+from rdflib import DCTERMS, OWL, RDF, SH, Graph, URIRef
+
+# Annotation of a NodeShape with the sheet name of its class, written by SHACLPlayConverter.convert_classes
+SHEET_NAME = DCTERMS.identifier
+
+
+def _local_name(node: URIRef) -> str:
+    return re.split(r"[/#:]", str(node).rstrip("/#"))[-1]
+
+
+def split_shapes(shapes_graph: Graph) -> Dict[str, Graph]:
+    """
+    Split a shapes graph into a graph per NodeShape.
+
+    Each graph gets the NodeShape, its property shapes and their blank nodes,
+    the ontology headers of the combined graph and its prefixes. The sheet
+    name annotation of the NodeShape is left out.
+
+    Args:
+        shapes_graph: Combined shapes graph
+
+    Returns:
+        Dictionary of shape name, the sheet name of the class of the NodeShape or, without
+        that annotation, the local name of the NodeShape without its 'Shape' suffix
+        (e.g. 'Dataset' of 'hri:DatasetShape'), to its graph
+    """
+    headers = Graph()
+    for ontology in shapes_graph.subjects(RDF.type, OWL.Ontology):
+        headers += shapes_graph.cbd(ontology)
+
+    graphs = {}
+    for node_shape in sorted(set(shapes_graph.subjects(RDF.type, SH.NodeShape))):
+        if not isinstance(node_shape, URIRef):
+            continue
+        graph = Graph(bind_namespaces="none")
+        for prefix, namespace in shapes_graph.namespaces():
+            graph.bind(prefix, namespace)
+        graph += headers
+        graph += shapes_graph.cbd(node_shape)
+        for property_shape in shapes_graph.objects(node_shape, SH.property):
+            graph += shapes_graph.cbd(property_shape)
+        sheet_name = shapes_graph.value(node_shape, SHEET_NAME)
+        graph.remove((node_shape, SHEET_NAME, None))
+        graphs[str(sheet_name) if sheet_name is not None else _local_name(node_shape).removesuffix("Shape")] = graph
+    return graphs
@@ -0,0 +1,292 @@
+"""
+Partitioned, parallel SHACL validation with the generated shapes.
+
+Validating a large catalog in a single pyshacl run is single-threaded. Here
+the focus nodes of the shapes (the instances of their ``sh:targetClass``) are
+split into partitions. Every partition is validated in a pool of worker
+processes, which load the shapes once, against the part of the data graph
+its focus nodes need: their descriptions, and the descriptions of the values
+nested shapes (``sh:node``) are evaluated on. The partial reports are merged
+into a single SHACL validation report.
+
+Requires the optional pyshacl dependency (``pip install metadata-automation[validate]``).
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from rdflib import RDF, RDFS, SH, BNode, Graph, Literal, URIRef
+from rdflib.util import guess_format
+
+# Shapes graph loaded once per worker process by _init_worker
+_worker_graphs: Dict[str, Graph] = {}
+
+
+@dataclass
+class ValidationResult:
+    """Merged outcome of a partitioned validation."""
+
+    conforms: bool
+    report: Graph
+    focus_nodes: int
+    partitions: int
+
+    @property
+    def results(self) -> int:
+        """Number of validation results in the report."""
+        return len(set(self.report.objects(None, SH.result)))
+
+
+def _require_pyshacl():
+    try:
+        import pyshacl
+    except ImportError as e:
+        raise ImportError(
+            "SHACL validation requires pyshacl, install it with 'pip install metadata-automation[validate]'"
+        ) from e
+    return pyshacl
+
+
+def load_graph(paths: Sequence[str | Path]) -> Graph:
+    """
+    Load RDF files into a single graph.
+
+    Args:
+        paths: RDF files, or directories whose Turtle files (recursively) are loaded
+
+    Returns:
+        Graph with the triples of all files
+    """
+    graph = Graph()
+    for path in paths:
+        path = Path(path)
+        files = sorted(path.rglob("*.ttl")) if path.is_dir() else [path]
+        for file in files:
+            graph.parse(file, format=guess_format(str(file)) or "turtle")
+    return graph
+
+
+def target_partitions(data_graph: Graph, shapes_graph: Graph, partition_size: int) -> List[List[URIRef]]:
+    """
+    Split the focus nodes of the shapes into partitions.
+
+    Focus nodes are the instances of the shapes' target classes, including
+    instances of their subclasses. A partition only contains nodes of one
+    target class, so partitions have a similar validation cost.
+
+    Args:
+        data_graph: Graph to validate
+        shapes_graph: Graph with the SHACL shapes
+        partition_size: Maximum number of focus nodes per partition
+
+    Returns:
+        List of partitions, each a list of focus nodes
+    """
+    seen = set()
+    partitions = []
+    for target_class in sorted(set(shapes_graph.objects(None, SH.targetClass))):
+        classes = set(data_graph.transitive_subjects(RDFS.subClassOf, target_class))
+        nodes = []
+        for cls in sorted(classes):
+            for node in sorted(data_graph.subjects(RDF.type, cls)):
+                if node not in seen:
+                    seen.add(node)
+                    nodes.append(node)
+        partitions.extend(nodes[i : i + partition_size] for i in range(0, len(nodes), partition_size))
+    return partitions
+
+
+def shape_nesting_depth(shapes_graph: Graph) -> int:
+    """
+    Number of levels of value nodes a focus node's validation can reach through sh:node.
+
+    Recursive shapes are counted once per shape on a path.
+
+    Args:
+        shapes_graph: Graph with the SHACL shapes
+
+    Returns:
+        Longest chain of nested shapes
+    """
+    nested: Dict[object, Set[object]] = {}
+    for shape in set(shapes_graph.subjects(SH.targetClass, None)) | set(shapes_graph.objects(None, SH.node)):
+        nested[shape] = set(shapes_graph.objects(shape, SH.node))
+        for property_shape in shapes_graph.objects(shape, SH.property):
+            nested[shape].update(shapes_graph.objects(property_shape, SH.node))
+
+    def depth(shape, path: frozenset) -> int:
+        return max((1 + depth(n, path | {n}) for n in nested.get(shape, ()) if n not in path), default=0)
+
+    return max((depth(shape, frozenset([shape])) for shape in nested), default=0)
+
+
+def reads_types(shapes_graph: Graph) -> bool:
+    """Whether constraints of the shapes read rdf:type values (other than to select targets)."""
+    return (
+        (None, SH["class"], None) in shapes_graph
+        or (None, SH.sparql, None) in shapes_graph
+        or (None, None, RDF.type) in shapes_graph
+    )
+
+
+def partition_graph(data_graph: Graph, focus_nodes: Sequence[URIRef], depth: int, context_types: bool = True) -> Graph:
+    """
+    Extract the part of the data graph needed to validate a partition.
+
+    Contains the descriptions of the focus nodes and of the nodes reachable
+    from them in up to depth steps. Blank nodes are always followed. The
+    rdfs:subClassOf closure of the included types is copied as well, as a
+    focus node may be the instance of a subclass of the target class.
+
+    Args:
+        data_graph: Graph to validate
+        focus_nodes: Focus nodes of the partition
+        depth: Number of levels of value nodes to include
+        context_types: Include the rdf:type of the reachable nodes; without it they are
+                       not targets of the shapes, so they are not validated again
+
+    Returns:
+        Subgraph of the data graph
+    """
+    subgraph = Graph()
+    visited = set()
+    # Blank nodes are at the level of the node referencing them, so they go to the front,
+    # keeping the queue ordered by level: every node is visited at its lowest level
+    frontier = deque((node, 0) for node in focus_nodes)
+    while frontier:
+        node, level = frontier.popleft()
+        if node in visited:
+            continue
+        visited.add(node)
+        for triple in data_graph.triples((node, None, None)):
+            value = triple[2]
+            if isinstance(value, BNode):
+                frontier.appendleft((value, level))
+            elif isinstance(value, URIRef) and level < depth:
+                frontier.append((value, level + 1))
+            if level == 0 or context_types or triple[1] != RDF.type:
+                subgraph.add(triple)
+
+    classes = deque(set(subgraph.objects(None, RDF.type)))
+    while classes:
+        for triple in data_graph.triples((classes.popleft(), RDFS.subClassOf, None)):
+            if triple not in subgraph:
+                subgraph.add(triple)
+                classes.append(triple[2])
+    return subgraph
+
+
+def _init_worker(shapes_paths: Sequence[str]) -> None:
+    """Load the shapes graph in a worker process."""
+    _worker_graphs["shapes"] = load_graph(shapes_paths)
+
+
+def _validate_partition(partition: Tuple[List[URIRef], Graph]) -> Tuple[bool, Graph]:
+    """
+    Validate a partition with the shapes loaded by _init_worker.
+
+    Nodes that are only in the subgraph as values of the focus nodes can be
+    targets as well. They are validated in their own partition, so their
+    results are dropped here.
+    """
+    pyshacl = _require_pyshacl()
+    focus_nodes, subgraph = partition
+    # pyshacl's focus_nodes option is not used, as it also skips the value nodes of nested shapes
+    _conforms, report, _text = pyshacl.validate(subgraph, shacl_graph=_worker_graphs["shapes"], inplace=True)
+
+    focus = set(focus_nodes)
+    for result in list(report.objects(None, SH.result)):
+        if report.value(result, SH.focusNode) not in focus:
+            report.remove((None, SH.result, result))
+            _remove_resource(report, result)
+    conforms = next(report.objects(None, SH.result), None) is None
+    for validation_report in report.subjects(RDF.type, SH.ValidationReport):
+        report.set((validation_report, SH.conforms, Literal(conforms)))
+    return conforms, report
+
+
+def _remove_resource(graph: Graph, node) -> None:
+    """Remove the description of a node, including its blank nodes."""
+    for triple in list(graph.triples((node, None, None))):
+        graph.remove(triple)
+        if isinstance(triple[2], BNode) and next(graph.subjects(None, triple[2]), None) is None:
+            _remove_resource(graph, triple[2])
+
+
+def merge_reports(reports: List[Graph]) -> Graph:
+    """
+    Merge partial validation reports into a single report.
+
+    Args:
+        reports: Validation report graphs
+
+    Returns:
+        Graph with one sh:ValidationReport holding the results of all reports
+    """
+    merged = Graph()
+    merged.bind("sh", SH)
+    report_node = BNode()
+    conforms = True
+
+    for report in reports:
+        partials = set(report.subjects(RDF.type, SH.ValidationReport))
+        for partial in partials:
+            conforms = conforms and bool(report.value(partial, SH.conforms, default=Literal(True)).toPython())
+            merged.addN((report_node, SH.result, result, merged) for result in report.objects(partial, SH.result))
+        merged.addN((s, p, o, merged) for s, p, o in report if s not in partials)
+
+    merged.add((report_node, RDF.type, SH.ValidationReport))
+    merged.add((report_node, SH.conforms, Literal(conforms)))
+    return merged
+
+
+def validate_partitioned(
+    data_paths: Sequence[str | Path],
+    shapes_paths: Sequence[str | Path],
+    jobs: Optional[int] = None,
+    partition_size: int = 100,
+) -> ValidationResult:
+    """
+    Validate data files against shapes, in partitions across a process pool.
+
+    Args:
+        data_paths: RDF files (or directories of Turtle files) with the data to validate
+        shapes_paths: Turtle files (or directories) with the SHACL shapes
+        jobs: Number of worker processes (default: CPU count); 1 validates in the current process
+        partition_size: Maximum number of focus nodes per partition
+
+    Returns:
+        ValidationResult with the merged report
+
+    Raises:
+        ImportError: If pyshacl is not installed
+    """
+    _require_pyshacl()
+    shapes_paths = [str(path) for path in shapes_paths]
+    data_graph = load_graph(data_paths)
+    shapes_graph = load_graph(shapes_paths)
+
+    depth = shape_nesting_depth(shapes_graph)
+    context_types = reads_types(shapes_graph)
+    partitions = [
+        (focus_nodes, partition_graph(data_graph, focus_nodes, depth, context_types))
+        for focus_nodes in target_partitions(data_graph, shapes_graph, partition_size)
+    ]
+
+    if jobs == 1 or len(partitions) <= 1:
+        _worker_graphs["shapes"] = shapes_graph
+        outcomes = [_validate_partition(partition) for partition in partitions]
+        _worker_graphs.clear()
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(shapes_paths,)) as executor:
+            outcomes = list(executor.map(_validate_partition, partitions))
+
+    return ValidationResult(
+        conforms=all(conforms for conforms, _report in outcomes),
+        report=merge_reports([report for _conforms, report in outcomes]),
+        focus_nodes=sum(len(focus_nodes) for focus_nodes, _subgraph in partitions),
+        partitions=len(partitions),
+    )
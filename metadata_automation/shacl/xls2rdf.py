@@ -0,0 +1,151 @@
+"""
+Fast-starting JVM runs of the bundled xls2rdf converter.
+
+Every SHACLPlay file is converted by a separate ``java -jar`` run, which spends
+most of its time loading classes and warming up the JIT compiler. Two things
+cut that overhead:
+
+- A class data sharing (AppCDS) archive of the classes the converter loads,
+  created by the first run and memory-mapped by later runs instead of loading
+  and verifying the classes again. The archive is cached in
+  ``~/.cache/metadata-automation/jvm``, keyed on the JAR digest and the Java
+  version. Java 19+ creates and refreshes it automatically; Java 13 to 18
+  record it on the first run and reuse it afterwards; older Java versions do
+  not support dynamic archives and run without one.
+- JVM options for short-lived runs: C1-only compilation, the serial garbage
+  collector and no performance data file. They can be replaced with the
+  ``METADATA_AUTOMATION_JVM_OPTIONS`` environment variable or the
+  ``--jvm-options`` option.
+"""
+
+import re
+import shlex
+import subprocess
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from metadata_automation.cache import get_cache_dir
+from metadata_automation.profiles import file_digest
+
+JVM_OPTIONS_ENV = "METADATA_AUTOMATION_JVM_OPTIONS"
+
+# Tuned for one-shot conversions: the C2 compiler and a parallel collector never pay off in a run this short
+DEFAULT_JVM_OPTIONS = ("-XX:TieredStopAtLevel=1", "-XX:+UseSerialGC", "-XX:-UsePerfData")
+
+
+def java_version(java: str = "java") -> Optional[str]:
+    """
+    Get the version of a Java runtime.
+
+    Args:
+        java: Java executable
+
+    Returns:
+        Version, e.g. '17.0.2' or '1.8.0_292', or None if Java is not available
+    """
+    try:
+        result = subprocess.run([java, "-version"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    # 'java -version' reports on stderr, e.g. 'openjdk version "17.0.2" 2022-01-18'
+    match = re.search(r'version "([^"]+)"', f"{result.stderr}\n{result.stdout}")
+    return match.group(1) if match else None
+
+
+def _feature_version(version: str) -> int:
+    """Feature release of a Java version, e.g. 17 of '17.0.2' and 8 of '1.8.0_292'."""
+    parts = re.findall(r"\d+", version)
+    if not parts:
+        return 0
+    if parts[0] == "1" and len(parts) > 1:
+        return int(parts[1])
+    return int(parts[0])
+
+
+def parse_jvm_options(value: Optional[str]) -> List[str]:
+    """
+    Parse JVM options given as a single string.
+
+    Args:
+        value: Options separated by whitespace, quoted as in a shell; None for the defaults
+
+    Returns:
+        List of JVM options
+    """
+    if value is None:
+        return list(DEFAULT_JVM_OPTIONS)
+    return shlex.split(value)
+
+
+def cds_archive(jar_path: str | Path, version: str) -> Path:
+    """
+    Path of the class data sharing archive of a JAR.
+
+    Args:
+        jar_path: JAR file
+        version: Java version the archive is created with
+
+    Returns:
+        Path in the cache directory, keyed on the JAR digest and the Java version
+    """
+    jar_path = Path(jar_path)
+    digest = (file_digest(jar_path) or "")[:16]
+    return get_cache_dir("jvm") / f"{jar_path.stem}-{digest}-java{re.sub(r'[^0-9A-Za-z.]+', '_', version)}.jsa"
+
+
+def cds_options(jar_path: str | Path, version: Optional[str]) -> List[str]:
+    """
+    JVM options creating or reusing the class data sharing archive of a JAR.
+
+    Args:
+        jar_path: JAR file
+        version: Java version, see java_version
+
+    Returns:
+        JVM options, empty if the Java version does not support dynamic archives
+    """
+    if version is None or _feature_version(version) < 13:
+        return []
+    archive = cds_archive(jar_path, version)
+    if _feature_version(version) >= 19:
+        # Creates the archive at exit when it is missing or stale, and maps it otherwise
+        return ["-XX:+AutoCreateSharedArchive", f"-XX:SharedArchiveFile={archive}"]
+    if archive.exists():
+        return [f"-XX:SharedArchiveFile={archive}"]
+    return [f"-XX:ArchiveClassesAtExit={archive}"]
+
+
+def xls2rdf_command(
+    jar_path: str | Path,
+    input_file: str | Path,
+    output_file: str | Path,
+    jvm_options: Sequence[str] = DEFAULT_JVM_OPTIONS,
+    version: Optional[str] = None,
+) -> List[str]:
+    """
+    Command converting a SHACLPlay file to SHACL Turtle.
+
+    Args:
+        jar_path: xls2rdf JAR file
+        input_file: SHACLPlay Excel file
+        output_file: Turtle file to write
+        jvm_options: JVM options, see parse_jvm_options
+        version: Java version, see java_version; None runs without a class data sharing archive
+
+    Returns:
+        Command line
+    """
+    return [
+        "java",
+        *jvm_options,
+        *cds_options(jar_path, version),
+        "-jar",
+        str(jar_path),
+        "convert",
+        "-i",
+        str(input_file),
+        "-o",
+        str(output_file),
+        "-sh",
+        "-np",
+    ]
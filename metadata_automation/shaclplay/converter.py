@@ -4,32 +4,73 @@ SHACLPlay Excel converter for Health-RI metadata.
 Converts Health-RI Excel metadata files to SHACLPlay-compatible Excel format.
 """
 
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Sequence, Tuple
 
 import numpy as np
 import pandas as pd
 
-from .utils import (
-    get_current_datetime_iso,
-    parse_cardinality,
-)
-from .vocab_mappings import get_vocab_mapping
+from metadata_automation.model import Class, Property, Range, read_prefixes
+from metadata_automation.prefixes import used_prefixes
+from metadata_automation.vocabularies import VocabularyStore
+from metadata_automation.workbook import read_excel
+
+from .utils import get_current_datetime_iso
+
+# Column of the NodeShapes sheet of a combined workbook with the class sheet name of each NodeShape; files split from
+# its shapes are named after it, like the files of per-class workbooks, see metadata_automation.shacl.split
+SHEET_NAME_COLUMN = "dct:identifier"
+
+
+@lru_cache(maxsize=8)
+def _read_template(template_path: str, mtime_ns: int, reader: Optional[str]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Read the NodeShapes and PropertyShapes sheets of a SHACLPlay template.
+
+    Cached per template path and modification time, so building several
+    workbooks in one process reads the template only once.
+    """
+    # Read template structure for NodeShapes (to get headers and metadata structure)
+    nodeshapes = read_excel(template_path, sheet_name="NodeShapes (classes)", reader=reader, header=None)
+
+    # Read template structure for PropertyShapes
+    propertyshapes = read_excel(
+        template_path,
+        sheet_name="PropertyShapes (properties)",
+        reader=reader,
+        header=None,
+    )
+    return nodeshapes, propertyshapes
 
 
 class SHACLPlayConverter:
     """Converts Health-RI Excel metadata to SHACLPlay Excel format."""
 
-    def __init__(self, template_path: Path, source_excel_path: Path):
+    def __init__(
+        self,
+        template_path: Path,
+        source_excel_path: Path,
+        vocabularies: Optional[VocabularyStore] = None,
+        build_date: Optional[datetime] = None,
+        reader: Optional[str] = None,
+    ):
         """
         Initialize the converter.
 
         Args:
             template_path: Path to the SHACLPlay template Excel file
             source_excel_path: Path to the source Health-RI Excel file
+            vocabularies: Controlled vocabularies for sh:in lists (default: the vocabularies in the repository)
+            build_date: Fixed dcterms:modified date of the shapes (default: the current time)
+            reader: Excel reader backend, see metadata_automation.workbook.resolve_reader
         """
         self.template_path = template_path
         self.source_excel_path = source_excel_path
+        self.vocabularies = vocabularies if vocabularies is not None else VocabularyStore()
+        self.build_date = build_date
+        self.reader = reader
         self.prefixes_df = None
         self.template_nodeshapes = None
         self.template_propertyshapes = None
@@ -38,29 +79,24 @@ class SHACLPlayConverter:
 
     def _load_template(self):
         """Load the SHACLPlay template to get structure."""
-        # Read template structure for NodeShapes (to get headers and metadata structure)
-        self.template_nodeshapes = pd.read_excel(self.template_path, sheet_name="NodeShapes (classes)", header=None)
-
-        # Read template structure for PropertyShapes
-        self.template_propertyshapes = pd.read_excel(
-            self.template_path,
-            sheet_name="PropertyShapes (properties)",
-            header=None,
+        # The template frames are only ever copied, so they can be shared between converters
+        template_path = Path(self.template_path)
+        self.template_nodeshapes, self.template_propertyshapes = _read_template(
+            str(template_path.resolve()), template_path.stat().st_mtime_ns, self.reader
         )
 
     def _load_source_prefixes(self):
         """Load prefixes from the source Health-RI Excel file and convert to SHACLPlay format."""
         # Read source prefixes (has header row with 'prefix' and 'namespace' columns)
-        source_prefixes = pd.read_excel(
+        source_prefixes = read_excel(
             self.source_excel_path,
+            reader=self.reader,
             sheet_name="prefixes",
             header=0,  # First row is header
         )
 
         # Create a prefix lookup dictionary for easy access
-        self.prefix_lookup = {}
-        for _idx, row in source_prefixes.iterrows():
-            self.prefix_lookup[str(row["prefix"]).strip()] = str(row["namespace"]).strip()
+        self.prefix_lookup = read_prefixes(source_prefixes)
 
         # Convert to SHACLPlay format:
         # - Row 0: empty row (all NaN)
@@ -99,24 +135,12 @@ class SHACLPlayConverter:
             raise KeyError(f"Namespace prefix '{namespace_prefix}' not found in prefixes")
         return self.prefix_lookup[namespace_prefix]
 
-    def convert_class_sheet(
-        self,
-        class_sheet_df: pd.DataFrame,
-        class_name: str,
-        class_uri: str,
-        target_class: str,
-        description: str = None,
-        namespace_override: str = None,
-    ) -> tuple[pd.DataFrame, pd.DataFrame]:
+    def convert_class(self, model_class: Class, namespace_override: str = None) -> tuple[pd.DataFrame, pd.DataFrame]:
         """
-        Convert a class sheet from Health-RI format to SHACLPlay format.
+        Convert a class to SHACLPlay format.
 
         Args:
-            class_sheet_df: DataFrame of the class sheet (e.g., 'Dataset')
-            class_name: Name of the class (e.g., 'Dataset')
-            class_uri: Ontology name with prefix (e.g., 'hri:Dataset')
-            target_class: Target class URI (e.g., 'dcat:Dataset')
-            description: Optional description of the class
+            model_class: Class with its properties (e.g., 'hri:Dataset')
             namespace_override: Optional namespace to override all class and property namespaces
 
         Returns:
@@ -124,15 +148,62 @@ class SHACLPlayConverter:
         """
         # Build NodeShapes sheet
         nodeshapes_df = self._build_nodeshapes(
-            class_name,
-            class_uri,
-            target_class,
-            description,
+            model_class.name,
+            model_class.uri,
+            model_class.target_class,
+            model_class.description,
             namespace_override,
         )
 
         # Build PropertyShapes sheet
-        propertyshapes_df = self._build_propertyshapes(class_sheet_df, class_name, class_uri, namespace_override)
+        propertyshapes_df = self._build_propertyshapes(
+            model_class.properties, model_class.name, model_class.uri, namespace_override
+        )
+
+        return nodeshapes_df, propertyshapes_df
+
+    def convert_classes(
+        self, model_classes: Sequence[Class], namespace_override: str = None
+    ) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Convert the classes of a namespace to a single SHACLPlay workbook.
+
+        The NodeShapes sheet gets a row per class, annotated with the sheet name
+        of the class, and the PropertyShapes sheet the property rows of every
+        class, each class under its own section header, so the workbook is
+        converted with a single xls2rdf call.
+
+        Args:
+            model_classes: Classes of one namespace, e.g. all 'hri' classes
+            namespace_override: Optional namespace to override all class and property namespaces
+
+        Returns:
+            Tuple of (nodeshapes_df, propertyshapes_df)
+        """
+        converted = [self.convert_class(model_class, namespace_override) for model_class in model_classes]
+        namespace_prefix = namespace_override if namespace_override else model_classes[0].prefix
+        namespace_url = self._get_namespace_url(namespace_prefix)
+
+        # Header rows of the first class, with the rows of every class below them
+        nodeshapes_df = pd.concat(
+            [converted[0][0].iloc[:13]] + [nodeshapes.iloc[13:] for nodeshapes, _ in converted], ignore_index=True
+        )
+        nodeshapes_df.iat[0, 1] = f"{namespace_url}aux-{namespace_prefix}Shapes"
+        label = f"Excel template for {namespace_prefix} classes"
+        nodeshapes_df.iat[2, 1] = label
+        nodeshapes_df.iat[3, 1] = label
+        nodeshapes_df.iat[4, 1] = f"This is an excel template for {len(model_classes)} {namespace_prefix} classes."
+        nodeshapes_df[len(nodeshapes_df.columns)] = (
+            [np.nan] * 12 + [SHEET_NAME_COLUMN] + [model_class.sheet_name for model_class in model_classes]
+        )
+
+        sections = []
+        for model_class, (_, propertyshapes) in zip(model_classes, converted, strict=True):
+            section = propertyshapes.iloc[7:].copy()
+            section.iat[0, 0] = f"Properties on {model_class.name}"
+            sections.append(section)
+        propertyshapes_df = pd.concat([converted[0][1].iloc[:7]] + sections, ignore_index=True)
+        propertyshapes_df.iat[0, 1] = f"{namespace_url}{namespace_prefix}Shapes"
 
         return nodeshapes_df, propertyshapes_df
 
@@ -181,7 +252,7 @@ class SHACLPlayConverter:
 
         # Update version and modified date
         df.iat[5, 1] = "0.1"  # owl:versionInfo
-        df.iat[6, 1] = get_current_datetime_iso()  # dcterms:modified
+        df.iat[6, 1] = get_current_datetime_iso(self.build_date)  # dcterms:modified
 
         # Add a new row for the actual NodeShape data (after the 13 template rows)
         # Create new row with the NodeShape data
@@ -199,7 +270,7 @@ class SHACLPlayConverter:
 
     def _build_propertyshapes(
         self,
-        class_sheet_df: pd.DataFrame,
+        properties: Sequence[Property],
         class_name: str,
         class_uri: str,
         namespace_override: str = None,
@@ -208,7 +279,7 @@ class SHACLPlayConverter:
         Build the PropertyShapes sheet.
 
         Args:
-            class_sheet_df: DataFrame of the class properties
+            properties: Properties of the class
             class_name: Name of the class
             class_uri: Ontology name with prefix
             namespace_override: Optional namespace to override the extracted namespace
@@ -235,13 +306,9 @@ class SHACLPlayConverter:
         section_header = df.iloc[7].copy()
         property_rows.append(section_header)
 
-        # Process each property from the class sheet
-        for _idx, row in class_sheet_df.iterrows():
-            if pd.isna(row["Property label"]) or row["Property label"] == "nan":
-                continue
-
-            property_row = self._convert_property_to_shaclplay(row, class_name, class_uri, namespace_prefix)
-            property_rows.append(property_row)
+        # Process each property of the class
+        for model_property in properties:
+            property_rows.append(self._convert_property_to_shaclplay(model_property, class_name, namespace_prefix))
 
         # Combine header rows (0-6) with property rows
         header_rows = [df.iloc[i] for i in range(7)]
@@ -255,18 +322,16 @@ class SHACLPlayConverter:
 
     def _convert_property_to_shaclplay(
         self,
-        property_row: pd.Series,
+        model_property: Property,
         class_name: str,
-        class_uri: str,
         namespace_prefix: str,
     ) -> pd.Series:
         """
-        Convert a single property row to SHACLPlay format.
+        Convert a single property to SHACLPlay format.
 
         Args:
-            property_row: Row from class sheet
+            model_property: Property of the class
             class_name: Name of the class
-            class_uri: Ontology name with prefix (e.g., 'hri:Dataset')
             namespace_prefix: Namespace prefix to use (may be overridden)
 
         Returns:
@@ -277,8 +342,7 @@ class SHACLPlayConverter:
         new_row = pd.Series([np.nan] * 24, dtype=str)
 
         # Column 0: URI (PropertyShape identifier)
-        prop_label = property_row["Property label"]
-        prop_uri = property_row["Property URI"]
+        prop_uri = model_property.uri
 
         # Separate the class/shape name from the property name using a '#'.
         # If a namespace URL ends in '#', use a '/'.
@@ -294,122 +358,112 @@ class SHACLPlayConverter:
         new_row[2] = prop_uri
 
         # Column 3: sh:name@en (property label)
-        new_row[3] = prop_label
+        new_row[3] = model_property.label
 
         # Column 4: sh:description@en (definition or usage note)
-        description = property_row.get("Definition", "")
-        usage_note = property_row.get("Usage note", "")
-        if pd.notna(description) and description != "nan":
-            new_row[4] = description
-        elif pd.notna(usage_note) and usage_note != "nan":
-            new_row[4] = usage_note
+        if model_property.definition is not None:
+            new_row[4] = model_property.definition
+        elif model_property.usage_note is not None:
+            new_row[4] = model_property.usage_note
 
         # Column 5: # (comments - leave empty)
         new_row[5] = np.nan
 
         # Columns 6-7: sh:minCount and sh:maxCount
-        cardinality = property_row.get("Cardinality", "")
-        min_count, max_count = parse_cardinality(cardinality)
-        if min_count is not None:
-            new_row[6] = min_count
-        if max_count is not None:
-            new_row[7] = max_count
+        cardinality = model_property.cardinality
+        if cardinality is not None and cardinality.min_count:
+            new_row[6] = cardinality.min_count
+        if cardinality is not None and cardinality.max_count is not None:
+            new_row[7] = cardinality.max_count
 
         # Columns 8-10: sh:nodeKind, sh:datatype, sh:node
         # Decision logic based on Range column (Option 3)
-        range_value = str(property_row.get("Range", ""))
-        sh_node_col = str(property_row.get("SHACL_sh:node", ""))  # Renamed from 'SHACL range'
+        # Without a range, none of the patterns apply
+        range_value = model_property.range or Range("")
+        sh_node = model_property.node  # Renamed from 'SHACL range'
 
-        # Pattern 1: Range contains "(IRI)" suffix → sh:nodeKind = sh:IRI only
-        # Check explicitly for (IRI) at the end to avoid matching "dcat:Class (IRI)" in middle
-        if range_value.strip().endswith("(IRI)"):
+        # Pattern 1: Range has an "(IRI)" suffix → sh:nodeKind = sh:IRI only
+        if range_value.is_iri:
             new_row[8] = "sh:IRI"  # sh:nodeKind
             # No sh:datatype, no sh:node
 
         # Pattern 2: Range = "rdfs:Literal" → sh:nodeKind = sh:Literal only
-        elif range_value.strip() == "rdfs:Literal":
+        elif range_value.is_literal:
             new_row[8] = "sh:Literal"  # sh:nodeKind
             # No sh:datatype, no sh:node
 
-        # Pattern 3: Range contains ":" but no "(IRI)" suffix → use sh:node from 'SHACL_sh:node' column
-        elif ":" in range_value and not range_value.strip().endswith("(IRI)") and sh_node_col and sh_node_col != "nan":
+        # Pattern 3: Range is a class → use sh:node from 'SHACL_sh:node' column
+        elif range_value.is_class and sh_node:
             # Convert SHACL_sh:node column value to full URI if needed
-            if ":" in sh_node_col:
+            if ":" in sh_node:
                 # Prefixed format (e.g., "hri:KindShape", "eucaim:RelationshipShape")
-                sh_node_prefix = sh_node_col.split(":")[0]
-                shape_name = sh_node_col.split(":")[1]  # Gets "KindShape", "RelationshipShape", etc.
+                sh_node_prefix, shape_name = sh_node.split(":")[:2]
                 # Look up the namespace URL from prefixes
-                sh_node_namespace_url = self._get_namespace_url(sh_node_prefix)
-                new_row[10] = f"{sh_node_namespace_url}{shape_name}"
-            elif ":" not in sh_node_col:
-                # Plain name (e.g., "KindShape") - use the current class namespace
-                namespace_url = self._get_namespace_url(namespace_prefix)
-                new_row[10] = f"{namespace_url}{sh_node_col}"
+                new_row[10] = f"{self._get_namespace_url(sh_node_prefix)}{shape_name}"
             else:
-                # Already a full URI
-                new_row[10] = sh_node_col
+                # Plain name (e.g., "KindShape") - use the current class namespace
+                new_row[10] = f"{self._get_namespace_url(namespace_prefix)}{sh_node}"
             # No sh:nodeKind, no sh:datatype when using SHACL_sh:node
 
-        # Pattern 4: Range starts with "xsd:" → use as sh:datatype
-        elif range_value.startswith("xsd:"):
+        # Pattern 4: Range is an XML Schema datatype → use as sh:datatype
+        elif range_value.is_datatype:
             new_row[8] = "sh:Literal"  # sh:nodeKind
-            new_row[9] = range_value  # sh:datatype (e.g., "xsd:dateTime")
+            new_row[9] = range_value.value  # sh:datatype (e.g., "xsd:dateTime")
             # No sh:node
 
         # Columns 11-14: sh:qualifiedValueShape, sh:qualifiedMinCount, sh:qualifiedMaxCount, sh:or
         # (Leave empty for now - not commonly used)
 
         # Column 15: sh:pattern
-        pattern = property_row.get("SHACL_pattern", "")
-        if pd.notna(pattern) and pattern != "nan":
-            new_row[15] = pattern
+        if model_property.pattern is not None:
+            new_row[15] = model_property.pattern
 
         # Column 16: SHACL_sh:uniqueLang (leave empty for now)
 
         # Column 17: sh:in (controlled vocabulary)
-        vocab_url = property_row.get("Controlled vocabluary (if applicable)", "")
-        if pd.notna(vocab_url) and vocab_url != "nan":
-            vocab_mapping = get_vocab_mapping(vocab_url)
-            if vocab_mapping:
-                new_row[17] = vocab_mapping["sh_in"]
+        vocabulary = self.vocabularies.get(model_property.vocabulary) if model_property.vocabulary else None
+        if vocabulary:
+            new_row[17] = f"( {' '.join(vocabulary.curies(self.prefix_lookup))} )"
 
         # Columns 18: sh:languageIn (leave empty)
 
         # Columns 19: SHACL_sh:uniqueLang
-        new_row[19] = property_row.get("SHACL_sh:uniqueLang", np.nan)
+        if model_property.unique_lang is not None:
+            new_row[19] = model_property.unique_lang
 
         # Column 20: sh:defaultValue
-        default_value = property_row.get("SHACL_default_value", "")
-        if pd.notna(default_value) and default_value != "nan":
-            new_row[20] = default_value
+        if model_property.default_value is not None:
+            new_row[20] = model_property.default_value
 
         # Column 21: sh:pattern (duplicate, leave empty)
 
         # Column 22: dash:viewer
-        viewer = property_row.get("SHACL_dash:viewer", "")
-        if pd.notna(viewer) and viewer != "nan":
-            new_row[22] = viewer
+        if model_property.viewer is not None:
+            new_row[22] = model_property.viewer
 
         # Column 23: dash:editor
-        editor = property_row.get("SHACL_dash:editor", "")
-        if pd.notna(editor) and editor != "nan":
-            # Check if we need to override to EnumSelectEditor for controlled vocabs
-            if pd.notna(vocab_url) and vocab_url != "nan":
-                vocab_mapping = get_vocab_mapping(vocab_url)
-                if vocab_mapping:
-                    new_row[23] = vocab_mapping["editor"]
-                else:
-                    new_row[23] = editor
-            else:
-                new_row[23] = editor
+        if model_property.editor is not None:
+            # Controlled vocabularies are edited by selecting one of their concepts
+            new_row[23] = "dash:EnumSelectEditor" if vocabulary else model_property.editor
 
         return new_row
 
-    def get_prefixes_dataframe(self) -> pd.DataFrame:
+    def get_prefixes_dataframe(self, *used_in: pd.DataFrame) -> pd.DataFrame:
         """
         Get the prefixes DataFrame from the template.
 
+        Args:
+            *used_in: Sheets of a SHACLPlay file (e.g., its NodeShapes and PropertyShapes);
+                      if given, only the prefixes referenced in their cells are included
+
         Returns:
             DataFrame with prefixes
         """
-        return self.prefixes_df.copy()
+        if not used_in:
+            return self.prefixes_df.copy()
+
+        cells = [value for df in used_in for value in df.to_numpy().ravel() if isinstance(value, str)]
+        referenced = used_prefixes(cells, self.prefix_lookup)
+        # Keep the leading empty row
+        keep = [idx == 0 or str(prefix).strip() in referenced for idx, prefix in enumerate(self.prefixes_df[1])]
+        return self.prefixes_df[keep].reset_index(drop=True)
@@ -2,12 +2,19 @@
 Utility functions for SHACLPlay Excel generation.
 """
 
+import io
 import re
+import zipfile
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, Tuple
 
 import pandas as pd
+from openpyxl.writer.excel import ExcelWriter as WorkbookWriter
+
+from metadata_automation.model import Cardinality
+from metadata_automation.output import OutputWriter
+from metadata_automation.reproducible import normalize_xlsx
 
 
 def slugify_property_label(label: str) -> str:
@@ -36,40 +43,35 @@ def parse_cardinality(cardinality: str) -> Tuple[Optional[int], Optional[int]]:
         cardinality: Cardinality string (e.g., "1", "0..n", "1..n")
 
     Returns:
-        Tuple of (min_count, max_count). max_count is None for unbounded.
+        Tuple of (min_count, max_count). min_count is None without a lower bound,
+        max_count is None for unbounded.
+
+    Raises:
+        ValueError: If the string is not a cardinality
 
     Examples:
         "1" -> (1, 1)
-        "0..n" -> (0, None)
+        "0..n" -> (None, None)
         "1..n" -> (1, None)
-        "0..1" -> (0, 1)
+        "0..1" -> (None, 1)
     """
-    if not cardinality or str(cardinality) == "nan":
+    parsed = Cardinality.parse(cardinality)
+    if parsed is None:
         return (None, None)
+    return (parsed.min_count or None, parsed.max_count)
 
-    cardinality = str(cardinality).strip()
-
-    # Check if it's a range (e.g., "0..n", "1..n")
-    if ".." in cardinality:
-        parts = cardinality.split("..")
-        min_count = int(parts[0].strip()) if parts[0].strip() != "0" else None
-        max_part = parts[1].strip()
-        max_count = None if max_part == "n" else int(max_part)
-        return (min_count, max_count)
-    else:
-        # Single value (e.g., "1")
-        count = int(cardinality)
-        return (count, count)
 
-
-def get_current_datetime_iso() -> str:
+def get_current_datetime_iso(build_date: Optional[datetime] = None) -> str:
     """
     Get current datetime in ISO format suitable for dcterms:modified.
 
+    Args:
+        build_date: Fixed build date to use instead of the current time (reproducible mode)
+
     Returns:
         ISO datetime string (e.g., "2025-02-10T00:00:00")
     """
-    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return (build_date or datetime.now()).strftime("%Y-%m-%d %H:%M:%S")
 
 
 def write_shaclplay_excel(
@@ -77,33 +79,59 @@ def write_shaclplay_excel(
     nodeshapes_df: pd.DataFrame,
     propertyshapes_df: pd.DataFrame,
     output_path: Path,
-) -> None:
+    output_writer: Optional[OutputWriter] = None,
+    build_date: Optional[datetime] = None,
+    compress: bool = True,
+) -> str:
     """
     Write SHACLPlay data to Excel file with three sheets.
 
+    The workbook is rendered in memory and only written if it differs from
+    the existing file. Without compression, the ZIP entries of the workbook
+    are stored as they are: the file is larger, but neither deflated when it
+    is written nor inflated when it is converted, which suits intermediate
+    files that are converted right away.
+
     Args:
         prefixes_df: DataFrame for prefixes sheet
         nodeshapes_df: DataFrame for NodeShapes sheet
         propertyshapes_df: DataFrame for PropertyShapes sheet
         output_path: Path to output Excel file
+        output_writer: OutputWriter counting the written and unchanged files
+        build_date: Build date of reproducible mode; the workbook gets fixed ZIP metadata and document dates
+        compress: Whether to deflate the ZIP entries; False stores them uncompressed
+
+    Returns:
+        Message reporting whether the file was written or unchanged; files are written from worker threads, so
+        the caller reports it
     """
-    # Create parent directory if it doesn't exist
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    buffer = io.BytesIO()
 
     # Write to Excel with three sheets
-    with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
-        prefixes_df.to_excel(writer, sheet_name="prefixes", index=False, header=False)
-        nodeshapes_df.to_excel(
-            writer,
-            sheet_name="NodeShapes (classes)",
-            index=False,
-            header=False,
-        )
-        propertyshapes_df.to_excel(
-            writer,
-            sheet_name="PropertyShapes (properties)",
-            index=False,
-            header=False,
-        )
-
-    print(f"Written SHACLPlay Excel to {output_path}")
+    writer = pd.ExcelWriter(buffer, engine="openpyxl")
+    prefixes_df.to_excel(writer, sheet_name="prefixes", index=False, header=False)
+    nodeshapes_df.to_excel(
+        writer,
+        sheet_name="NodeShapes (classes)",
+        index=False,
+        header=False,
+    )
+    propertyshapes_df.to_excel(
+        writer,
+        sheet_name="PropertyShapes (properties)",
+        index=False,
+        header=False,
+    )
+    if compress:
+        writer.close()
+    else:
+        # pandas always deflates, so the workbook is saved into a ZIP file with stored entries directly
+        WorkbookWriter(writer.book, zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED, allowZip64=True)).save()
+
+    data = buffer.getvalue()
+    if build_date is not None:
+        data = normalize_xlsx(data, build_date, zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED)
+
+    if (output_writer or OutputWriter()).write_bytes(output_path, data):
+        return f"Written SHACLPlay Excel to {output_path}"
+    return f"Unchanged SHACLPlay Excel {output_path}"
@@ -0,0 +1,268 @@
+"""
+Offline store of controlled vocabularies.
+
+The 'Controlled vocabluary (if applicable)' column of a class sheet references
+a vocabulary by the URL (or name) of its SKOS concept scheme. The store reads
+local dumps of these vocabularies, e.g. EU authority tables downloaded as RDF
+or CSV into ``inputs/vocabularies``, and resolves a reference to the concepts
+of the scheme.
+
+Parsing RDF dumps with thousands of concepts is slow, so every dump is indexed
+once into the on-disk cache: a small index of the concept schemes per dump,
+keyed on the dump's content digest, and a sorted list of concept IRIs per
+scheme. Opening the store only reads the index; the concepts of a scheme are
+read from the cache when the scheme is first looked up.
+
+CSV/TSV dumps need a 'concept' (or 'uri') column with the concept IRIs, and
+can have a 'scheme' column with the IRI of their concept scheme. Without it,
+the scheme is the IRI a concept IRI's last path segment is appended to.
+"""
+
+import csv
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from rdflib import DCTERMS, RDFS, SKOS, Graph, URIRef
+from rdflib.util import guess_format
+
+from metadata_automation.cache import get_cache_dir
+from metadata_automation.profiles import file_digest
+
+# Vocabulary dumps shipped with the repository
+DEFAULT_VOCABULARIES_PATH = Path(__file__).parent.parent.resolve() / "inputs" / "vocabularies"
+
+RDF_SUFFIXES = (".ttl", ".rdf", ".xml", ".owl", ".nt", ".n3", ".jsonld", ".trig", ".nq")
+CSV_DELIMITERS = {".csv": ",", ".tsv": "\t"}
+
+# Version of the cached index layout; bump when it changes
+INDEX_VERSION = 1
+
+# A local name that can be written as a CURIE in a SHACLPlay cell
+LOCAL_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_][\w.-]*(?<!\.)$")
+
+
+@dataclass(frozen=True)
+class Vocabulary:
+    """The concepts of a SKOS concept scheme."""
+
+    scheme: str
+    concepts: Tuple[str, ...]
+
+    def curies(self, prefixes: Dict[str, str]) -> List[str]:
+        """
+        Write the concepts as CURIEs with the given prefixes.
+
+        Concepts outside the namespaces of the prefixes are written as '<IRI>'.
+
+        Args:
+            prefixes: Mapping of prefix to namespace
+
+        Returns:
+            Concepts, in the order of the vocabulary
+        """
+        # Longest namespaces first, so the most specific prefix is used
+        namespaces = sorted(prefixes.items(), key=lambda item: len(item[1]), reverse=True)
+        curies = []
+        for concept in self.concepts:
+            for prefix, namespace in namespaces:
+                local_name = concept[len(namespace) :]
+                if namespace and concept.startswith(namespace) and LOCAL_NAME_PATTERN.match(local_name):
+                    curies.append(f"{prefix}:{local_name}")
+                    break
+            else:
+                curies.append(f"<{concept}>")
+        return curies
+
+
+def normalize_reference(reference: str) -> str:
+    """
+    Normalize a vocabulary reference for lookup.
+
+    URLs match regardless of their 'http'/'https' scheme and trailing '/' or '#';
+    names match case-insensitively.
+
+    Args:
+        reference: URL or name of a concept scheme
+
+    Returns:
+        Lookup key
+    """
+    reference = reference.strip()
+    if re.match(r"^https?://", reference):
+        return re.sub(r"^https?://", "", reference).rstrip("/#")
+    return reference.lower()
+
+
+def _read_rdf(path: Path) -> Dict[str, dict]:
+    graph = Graph()
+    graph.parse(path, format=guess_format(str(path)) or "xml")
+
+    schemes: Dict[str, dict] = {}
+
+    def scheme(iri) -> dict:
+        return schemes.setdefault(str(iri), {"labels": set(), "concepts": set()})
+
+    for concept, iri in graph.subject_objects(SKOS.inScheme):
+        scheme(iri)["concepts"].add(str(concept))
+    for concept, iri in graph.subject_objects(SKOS.topConceptOf):
+        scheme(iri)["concepts"].add(str(concept))
+    for iri, concept in graph.subject_objects(SKOS.hasTopConcept):
+        scheme(iri)["concepts"].add(str(concept))
+    for iri in list(schemes):
+        for predicate in (SKOS.prefLabel, DCTERMS.title, RDFS.label):
+            for label in graph.objects(URIRef(iri), predicate):
+                if getattr(label, "language", None) in (None, "en"):
+                    schemes[iri]["labels"].add(str(label))
+    return schemes
+
+
+def _read_csv(path: Path) -> Dict[str, dict]:
+    schemes: Dict[str, dict] = {}
+    with path.open(newline="", encoding="utf-8-sig") as handle:
+        reader = csv.DictReader(handle, delimiter=CSV_DELIMITERS[path.suffix.lower()])
+        columns = {name.strip().lower(): name for name in reader.fieldnames or []}
+        concept_column = columns.get("concept") or columns.get("uri")
+        if concept_column is None:
+            raise ValueError(f"Vocabulary file {path} has no 'concept' or 'uri' column")
+        scheme_column = columns.get("scheme")
+        for row in reader:
+            concept = (row.get(concept_column) or "").strip()
+            if not concept:
+                continue
+            iri = (row.get(scheme_column) or "").strip() if scheme_column else ""
+            if not iri:
+                iri = re.split(r"[/#](?=[^/#]*$)", concept)[0]
+            schemes.setdefault(iri, {"labels": set(), "concepts": set()})["concepts"].add(concept)
+    return schemes
+
+
+def read_vocabulary_file(path: str | Path) -> Dict[str, dict]:
+    """
+    Read the concept schemes of a vocabulary dump.
+
+    Args:
+        path: SKOS RDF file, or CSV/TSV file with concept IRIs
+
+    Returns:
+        Mapping of scheme IRI to a dict with its 'labels' and 'concepts' (sets of strings)
+
+    Raises:
+        ValueError: If the file type is not supported, or a CSV file has no concept column
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix in CSV_DELIMITERS:
+        return _read_csv(path)
+    if suffix in RDF_SUFFIXES:
+        return _read_rdf(path)
+    raise ValueError(f"Unsupported vocabulary file type: {path}")
+
+
+def vocabulary_files(paths: Sequence[str | Path]) -> List[Path]:
+    """Vocabulary dumps in the given files and directories (recursively), sorted per directory."""
+    files = []
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            files.extend(sorted(f for f in path.rglob("*") if f.suffix.lower() in RDF_SUFFIXES + tuple(CSV_DELIMITERS)))
+        else:
+            files.append(path)
+    return files
+
+
+class VocabularyStore:
+    """Controlled vocabularies from local dumps, indexed in the on-disk cache."""
+
+    def __init__(self, paths: Sequence[str | Path] = (DEFAULT_VOCABULARIES_PATH,), cache_dir: Optional[Path] = None):
+        """
+        Initialize the store, indexing the dumps that are not indexed yet.
+
+        Args:
+            paths: Vocabulary files, or directories with vocabulary files
+            cache_dir: Directory of the index (default: the 'vocabularies' cache directory)
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else get_cache_dir("vocabularies")
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.files = vocabulary_files([path for path in paths if Path(path).exists()])
+        self._entries: Dict[str, dict] = {}
+        self._references: Dict[str, str] = {}
+        self._loaded: Dict[str, Vocabulary] = {}
+        self.digests = [self._index_file(path) for path in self.files]
+
+    def _index_file(self, path: Path) -> str:
+        """Index a vocabulary dump, reusing its cached index when its content did not change."""
+        digest = file_digest(path)
+        index_path = self.cache_dir / f"{digest}.json"
+        index = None
+        if index_path.exists():
+            index = json.loads(index_path.read_text(encoding="utf-8"))
+            stale = index.get("version") != INDEX_VERSION or any(
+                not (self.cache_dir / entry["file"]).exists() for entry in index["schemes"].values()
+            )
+            if stale:
+                index = None
+        if index is None:
+            index = {"version": INDEX_VERSION, "schemes": {}}
+            for iri, scheme in sorted(read_vocabulary_file(path).items()):
+                concepts_file = f"{digest}-{hashlib.sha256(iri.encode('utf-8')).hexdigest()[:16]}.txt"
+                (self.cache_dir / concepts_file).write_text(
+                    "".join(f"{concept}\n" for concept in sorted(scheme["concepts"])), encoding="utf-8"
+                )
+                index["schemes"][iri] = {"labels": sorted(scheme["labels"]), "file": concepts_file}
+            index_path.write_text(json.dumps(index, indent=2), encoding="utf-8")
+
+        # Later files override schemes of earlier files
+        for iri, entry in index["schemes"].items():
+            self._entries[iri] = entry
+            self._loaded.pop(iri, None)
+            for reference in [iri, *entry["labels"]]:
+                self._references[normalize_reference(reference)] = iri
+        return digest
+
+    @property
+    def schemes(self) -> List[str]:
+        """IRIs of the concept schemes in the store."""
+        return sorted(self._entries)
+
+    def fingerprint(self) -> str:
+        """Digest of the content of the indexed dumps, to fingerprint artifacts generated from them."""
+        return hashlib.sha256(json.dumps(self.digests).encode("utf-8")).hexdigest()
+
+    def resolve(self, reference: str) -> Optional[str]:
+        """
+        Resolve a vocabulary reference to the IRI of its concept scheme.
+
+        Args:
+            reference: URL or name of the concept scheme, as written in a class sheet
+
+        Returns:
+            Scheme IRI, or None if the vocabulary is not in the store
+        """
+        if not isinstance(reference, str) or not reference.strip():
+            return None
+        return self._references.get(normalize_reference(reference))
+
+    def get(self, reference: str) -> Optional[Vocabulary]:
+        """
+        Get a vocabulary by reference, reading its concepts from the cache on first use.
+
+        Args:
+            reference: URL or name of the concept scheme, as written in a class sheet
+
+        Returns:
+            Vocabulary, or None if the vocabulary is not in the store
+        """
+        iri = self.resolve(reference)
+        if iri is None:
+            return None
+        if iri not in self._loaded:
+            concepts = (self.cache_dir / self._entries[iri]["file"]).read_text(encoding="utf-8").split()
+            self._loaded[iri] = Vocabulary(scheme=iri, concepts=tuple(concepts))
+        return self._loaded[iri]
+
+    def __contains__(self, reference: str) -> bool:
+        return self.resolve(reference) is not None
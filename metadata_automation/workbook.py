@@ -0,0 +1,472 @@
+"""
+Snapshots of parsed source workbooks.
+
+Parsing a workbook with openpyxl is the fixed cost of every command, paid
+again by every invocation. A snapshot holds the cell values of all sheets of
+a workbook, parsed once and stored in the on-disk cache as a pickle keyed by
+the workbook's content digest (and the pandas and openpyxl versions). Later
+runs load the snapshot in milliseconds instead of parsing the XLSX file.
+
+Sheets are turned into DataFrames from the snapshot with the parser
+``pd.read_excel`` uses, so ``read_excel(path, sheet_name=...)`` gives the same
+DataFrame as ``pd.read_excel`` for the options supported here: ``header``,
+``dtype`` and ``usecols`` (a list or callable).
+
+Workbooks are parsed with a selectable reader backend: ``openpyxl`` (in
+read-only mode, the pandas default) or ``calamine``, a Rust-based reader that
+is typically an order of magnitude faster (``pip install
+metadata-automation[calamine]``). The backend defaults to the
+``METADATA_AUTOMATION_EXCEL_READER`` environment variable, or openpyxl.
+
+A source can also be a directory with a CSV (or TSV) file per sheet, named
+after the sheet, e.g. ``prefixes.csv``, ``classes.csv`` and ``Dataset.csv``.
+Such a directory is read like a workbook: its files are parsed directly,
+which is much faster than parsing XLSX, so it is not snapshotted. See
+export_source and import_source to convert between both layouts.
+"""
+
+import csv
+import io
+import math
+import os
+import pickle
+import re
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import pandas as pd
+from pandas.errors import EmptyDataError
+from pandas.io.parsers import TextParser
+
+from metadata_automation.cache import get_cache_dir
+from metadata_automation.output import OutputWriter
+from metadata_automation.profiles import content_fingerprint, file_digest
+from metadata_automation.reproducible import ZIP_EPOCH, normalize_xlsx
+
+# Version of the snapshot layout; bump when it changes
+SNAPSHOT_VERSION = 1
+
+READER_BACKENDS = ("openpyxl", "calamine")
+DEFAULT_READER = "openpyxl"
+READER_ENV = "METADATA_AUTOMATION_EXCEL_READER"
+
+# Module a reader backend needs, as pandas imports it
+READER_MODULES = {"openpyxl": "openpyxl", "calamine": "python_calamine"}
+
+# Sheet files of a source directory
+SOURCE_DELIMITERS = {".csv": ",", ".tsv": "\t"}
+SOURCE_FORMATS = ("csv", "tsv")
+
+
+def resolve_reader(reader: Optional[str] = None) -> str:
+    """
+    Get the reader backend to parse workbooks with.
+
+    Args:
+        reader: Name of the backend (default: the METADATA_AUTOMATION_EXCEL_READER
+                environment variable, or openpyxl)
+
+    Returns:
+        Name of the backend
+
+    Raises:
+        ValueError: If the backend is unknown
+        ImportError: If the package of the backend is not installed
+    """
+    reader = reader or os.environ.get(READER_ENV) or DEFAULT_READER
+    if reader not in READER_BACKENDS:
+        raise ValueError(f"Unknown Excel reader '{reader}', expected one of {', '.join(READER_BACKENDS)}")
+    if find_spec(READER_MODULES[reader]) is None:
+        raise ImportError(
+            f"The {reader} Excel reader requires {READER_MODULES[reader].replace('_', '-')}, "
+            f"install it with 'pip install metadata-automation[{reader}]'"
+        )
+    return reader
+
+
+class WorkbookSnapshot:
+    """Cell values of the sheets of a workbook."""
+
+    def __init__(self, sheets: Dict[str, List[list]]):
+        """
+        Initialize the snapshot.
+
+        Args:
+            sheets: Rows of cell values per sheet name, in workbook order
+        """
+        self.sheets = sheets
+
+    @property
+    def sheet_names(self) -> List[str]:
+        """Names of the sheets, in workbook order."""
+        return list(self.sheets)
+
+    @classmethod
+    def from_excel(cls, path: str | Path, reader: Optional[str] = None) -> "WorkbookSnapshot":
+        """
+        Parse all sheets of an Excel file.
+
+        Args:
+            path: Path to the Excel file
+            reader: Reader backend, see resolve_reader
+
+        Returns:
+            WorkbookSnapshot
+        """
+        sheets = {}
+        with pd.ExcelFile(path, engine=resolve_reader(reader)) as workbook:
+            for sheet_name in workbook.sheet_names:
+                # Raw cell values: no header, no type conversion and no NA detection
+                frame = workbook.parse(sheet_name, header=None, dtype=object, na_filter=False)
+                sheets[sheet_name] = frame.values.tolist()
+        return cls(sheets)
+
+    @classmethod
+    def from_directory(cls, path: str | Path) -> "WorkbookSnapshot":
+        """
+        Read the sheets of a source directory.
+
+        Sheets are ordered as in a source workbook: 'prefixes', 'classes', the
+        class sheets in the order of the 'classes' sheet, and the other sheets
+        by name. Cells are typed by their content, as import_source writes them:
+        integers, decimals and TRUE/FALSE are numbers and booleans, other cells
+        text, so a number or boolean entered as text in the workbook is read as
+        a number or boolean.
+
+        Args:
+            path: Directory with a CSV or TSV file per sheet
+
+        Returns:
+            WorkbookSnapshot
+        """
+        sheets = {}
+        for sheet_name, sheet_file in source_sheet_files(path).items():
+            with sheet_file.open(newline="", encoding="utf-8-sig") as handle:
+                rows = list(csv.reader(handle, delimiter=SOURCE_DELIMITERS[sheet_file.suffix.lower()]))
+            # Like a parsed worksheet: no trailing empty rows, and rows of equal length
+            while rows and not any(rows[-1]):
+                rows.pop()
+            width = max((len(row) for row in rows), default=0)
+            sheets[sheet_name] = [
+                [_parse_cell(value) if value else "" for value in row + [""] * (width - len(row))] for row in rows
+            ]
+        return cls({name: sheets[name] for name in _source_sheet_order(sheets)})
+
+    @classmethod
+    def load(
+        cls, path: str | Path, cache_dir: Optional[Path] = None, reader: Optional[str] = None
+    ) -> "WorkbookSnapshot":
+        """
+        Load the snapshot of an Excel file from the cache, parsing and caching it when it is not there.
+
+        Args:
+            path: Path to the Excel file
+            cache_dir: Directory of the snapshots (default: the 'workbooks' cache directory)
+            reader: Reader backend, see resolve_reader; backends have their own snapshots
+
+        Returns:
+            WorkbookSnapshot
+        """
+        reader = resolve_reader(reader)
+        cache_dir = Path(cache_dir) if cache_dir else get_cache_dir("workbooks")
+        key = content_fingerprint("workbook", SNAPSHOT_VERSION, reader, file_digest(path))
+        snapshot_path = cache_dir / f"{key}.pickle"
+        if snapshot_path.exists():
+            try:
+                with snapshot_path.open("rb") as handle:
+                    return cls(pickle.load(handle))
+            except (OSError, pickle.UnpicklingError, EOFError):
+                # Corrupt or partially written snapshot, parse the workbook again
+                pass
+
+        snapshot = cls.from_excel(path, reader)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = snapshot_path.with_suffix(f".{id(snapshot)}.tmp")
+        with tmp_path.open("wb") as handle:
+            pickle.dump(snapshot.sheets, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(snapshot_path)
+        return snapshot
+
+    def parse(self, sheet_name: str, header: Optional[int] = 0, dtype=None, usecols=None) -> pd.DataFrame:
+        """
+        Create a DataFrame of a sheet, as pd.read_excel does.
+
+        Args:
+            sheet_name: Name of the sheet
+            header: Row with the column names, or None for a sheet without header
+            dtype: Data type of the columns, e.g. str
+            usecols: Columns to read, as list of names or callable on the column name
+
+        Returns:
+            DataFrame
+
+        Raises:
+            ValueError: If the workbook has no sheet with this name
+        """
+        if sheet_name not in self.sheets:
+            raise ValueError(f"Worksheet named '{sheet_name}' not found")
+        data = self.sheets[sheet_name]
+        if not data:
+            return pd.DataFrame()
+        try:
+            # The parser consumes its rows, so it gets copies
+            parser = TextParser(
+                [list(row) for row in data],
+                header=header,
+                dtype=dtype,
+                usecols=usecols,
+                skip_blank_lines=False,
+            )
+            return parser.read()
+        except EmptyDataError:
+            return pd.DataFrame()
+
+
+def source_sheet_files(path: str | Path) -> Dict[str, Path]:
+    """
+    Get the sheet files of a source directory.
+
+    Args:
+        path: Directory with a CSV or TSV file per sheet
+
+    Returns:
+        Mapping of sheet name to file
+
+    Raises:
+        ValueError: If a sheet has both a CSV and a TSV file
+    """
+    files = {}
+    for sheet_file in sorted(Path(path).iterdir()):
+        if sheet_file.suffix.lower() not in SOURCE_DELIMITERS or not sheet_file.is_file():
+            continue
+        if sheet_file.stem in files:
+            raise ValueError(f"Sheet '{sheet_file.stem}' has more than one file in {path}")
+        files[sheet_file.stem] = sheet_file
+    return files
+
+
+def _source_sheet_order(sheets: Dict[str, List[list]]) -> List[str]:
+    """Order sheets as in a source workbook."""
+    class_sheets = []
+    classes = sheets.get("classes") or []
+    header = [str(cell).strip() for cell in classes[0]] if classes else []
+    if "sheet_name" in header:
+        column = header.index("sheet_name")
+        class_sheets = [str(row[column]).strip() for row in classes[1:]]
+    order = ["prefixes", "classes", *class_sheets, *sorted(sheets)]
+    return [name for name in dict.fromkeys(order) if name in sheets]
+
+
+@lru_cache(maxsize=16)
+def _load_snapshot(path: str, mtime_ns: int, size: int, reader: str) -> WorkbookSnapshot:
+    return WorkbookSnapshot.load(path, reader=reader)
+
+
+@lru_cache(maxsize=16)
+def _load_directory(path: str, files: tuple) -> WorkbookSnapshot:
+    return WorkbookSnapshot.from_directory(path)
+
+
+def load_workbook(path: str | Path, reader: Optional[str] = None) -> WorkbookSnapshot:
+    """
+    Get the snapshot of an Excel file, or the sheets of a source directory.
+
+    Snapshots are kept in memory per file path, modification time and size, so
+    the steps of a run share one snapshot.
+
+    Args:
+        path: Path to the Excel file, or source directory
+        reader: Reader backend, see resolve_reader; not used for source directories
+
+    Returns:
+        WorkbookSnapshot
+    """
+    path = Path(path).resolve()
+    if path.is_dir():
+        files = tuple(
+            (name, sheet_file.stat().st_mtime_ns, sheet_file.stat().st_size)
+            for name, sheet_file in source_sheet_files(path).items()
+        )
+        return _load_directory(str(path), files)
+    stat = path.stat()
+    return _load_snapshot(str(path), stat.st_mtime_ns, stat.st_size, resolve_reader(reader))
+
+
+def read_excel(
+    path: str | Path, sheet_name: str, reader: Optional[str] = None, cache: bool = True, **kwargs
+) -> pd.DataFrame:
+    """
+    Read a sheet of an Excel file or source directory, see WorkbookSnapshot.parse.
+
+    Args:
+        path: Path to the Excel file, or source directory
+        sheet_name: Name of the sheet
+        reader: Reader backend, see resolve_reader
+        cache: Read the sheet from the workbook's snapshot; without it only this sheet is
+               parsed, e.g. for generated workbooks that change on every run
+        **kwargs: Options of WorkbookSnapshot.parse
+
+    Returns:
+        DataFrame
+
+    Raises:
+        ValueError: If the workbook has no sheet with this name
+    """
+    if not cache and not Path(path).is_dir():
+        return pd.read_excel(path, sheet_name=sheet_name, engine=resolve_reader(reader), **kwargs)
+    return load_workbook(path, reader).parse(sheet_name, **kwargs)
+
+
+def _format_cell(value: Any) -> str:
+    """Write a parsed cell value as text."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    return str(value)
+
+
+def _parse_cell(text: str) -> Any:
+    """Read a non-empty cell value written by _format_cell, keeping text that does not round-trip as number as text."""
+    if re.fullmatch(r"-?(0|[1-9]\d*)", text):
+        return int(text)
+    if re.fullmatch(r"-?\d+\.\d+(e[+-]\d+)?", text) and str(float(text)) == text:
+        return float(text)
+    if text in ("TRUE", "FALSE"):
+        return text == "TRUE"
+    return text
+
+
+def export_source(
+    path: str | Path,
+    output_path: str | Path,
+    source_format: str = "csv",
+    reader: Optional[str] = None,
+    writer: Optional[OutputWriter] = None,
+) -> List[Path]:
+    """
+    Export the sheets of a workbook to a source directory.
+
+    Args:
+        path: Path to the Excel file
+        output_path: Directory to write a file per sheet to
+        source_format: 'csv' or 'tsv'
+        reader: Reader backend, see resolve_reader
+        writer: OutputWriter to write the files with, only if they changed
+
+    Returns:
+        Paths of the sheet files
+
+    Raises:
+        ValueError: If the format is unknown, or the directory has sheet files in the other format
+    """
+    if source_format not in SOURCE_FORMATS:
+        raise ValueError(f"Unknown source format '{source_format}', expected one of {', '.join(SOURCE_FORMATS)}")
+    output_path = Path(output_path)
+    suffix = f".{source_format}"
+    if output_path.is_dir():
+        other = [f.name for f in source_sheet_files(output_path).values() if f.suffix.lower() != suffix]
+        if other:
+            raise ValueError(f"{output_path} has sheet files in another format: {', '.join(other)}")
+
+    writer = writer or OutputWriter()
+    snapshot = load_workbook(path, reader)
+    paths = []
+    for sheet_name in snapshot.sheet_names:
+        buffer = io.StringIO()
+        sheet_writer = csv.writer(buffer, delimiter=SOURCE_DELIMITERS[suffix], lineterminator="\n")
+        sheet_writer.writerows([_format_cell(value) for value in row] for row in snapshot.sheets[sheet_name])
+        sheet_file = output_path / f"{sheet_name}{suffix}"
+        writer.write_text(sheet_file, buffer.getvalue())
+        paths.append(sheet_file)
+    return paths
+
+
+def import_source(path: str | Path, output_path: str | Path, writer: Optional[OutputWriter] = None) -> List[str]:
+    """
+    Create a workbook from a source directory.
+
+    Numbers and booleans are written as such, other cells as text. The
+    workbook has no formatting, and fixed metadata, so importing the same
+    sheets twice gives the same file.
+
+    Args:
+        path: Source directory
+        output_path: Path of the Excel file
+        writer: OutputWriter to write the file with, only if it changed
+
+    Returns:
+        Names of the sheets
+
+    Raises:
+        ValueError: If the directory has no sheet files
+    """
+    snapshot = load_workbook(path)
+    if not snapshot.sheet_names:
+        raise ValueError(f"No CSV or TSV sheet files found in {path}")
+
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as excel_writer:
+        for sheet_name in snapshot.sheet_names:
+            rows = [[None if value == "" else value for value in row] for row in snapshot.sheets[sheet_name]]
+            pd.DataFrame(rows).to_excel(excel_writer, sheet_name=sheet_name, index=False, header=False)
+    # A fixed date, so an unchanged source directory gives an unchanged workbook
+    (writer or OutputWriter()).write_bytes(output_path, normalize_xlsx(buffer.getvalue(), ZIP_EPOCH))
+    return snapshot.sheet_names
+
+
+@dataclass
+class ReaderBenchmark:
+    """Time to parse a workbook with a reader backend."""
+
+    workbook: str
+    reader: str
+    seconds: Optional[float] = None
+    error: Optional[str] = None
+
+
+def benchmark_reader_backends(
+    paths: Sequence[str | Path], readers: Sequence[str] = READER_BACKENDS, repeat: int = 3
+) -> List[ReaderBenchmark]:
+    """
+    Measure the time to parse all sheets of workbooks with each reader backend.
+
+    The time to load the workbook's snapshot from the cache is measured as the
+    'snapshot' reader, for comparison.
+
+    Args:
+        paths: Excel files
+        readers: Reader backends to compare
+        repeat: Number of parses per workbook and backend; the best timing is kept
+
+    Returns:
+        Results per workbook and backend; backends that are not installed have an error
+    """
+    results = []
+    for path in paths:
+        path = Path(path)
+        for reader in [*readers, "snapshot"]:
+            result = ReaderBenchmark(workbook=path.name, reader=reader)
+            try:
+                if reader == "snapshot":
+                    # Make sure the snapshot is cached, so only loading it is measured
+                    WorkbookSnapshot.load(path)
+                else:
+                    resolve_reader(reader)
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    if reader == "snapshot":
+                        WorkbookSnapshot.load(path)
+                    else:
+                        WorkbookSnapshot.from_excel(path, reader)
+                    timings.append(time.perf_counter() - start)
+                result.seconds = min(timings)
+            except (ImportError, ValueError) as e:
+                result.error = str(e)
+            results.append(result)
+    return results
@@ -1,11 +1,25 @@
 """Shared pytest fixtures and configuration for metadata-automation tests."""
 
+import os
 from pathlib import Path
 
 import pytest
 from click.testing import CliRunner
 
 
+@pytest.fixture(scope="session", autouse=True)
+def isolated_cache_dir(tmp_path_factory):
+    """Keep on-disk caches written during tests out of the user's cache directory."""
+    cache_dir = tmp_path_factory.mktemp("cache")
+    previous = os.environ.get("METADATA_AUTOMATION_CACHE_DIR")
+    os.environ["METADATA_AUTOMATION_CACHE_DIR"] = str(cache_dir)
+    yield cache_dir
+    if previous is None:
+        os.environ.pop("METADATA_AUTOMATION_CACHE_DIR", None)
+    else:
+        os.environ["METADATA_AUTOMATION_CACHE_DIR"] = previous
+
+
 @pytest.fixture(scope="session")
 def tests_dir():
     """Path to the tests directory."""
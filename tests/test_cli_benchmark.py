@@ -0,0 +1,109 @@
+"""Tests for benchmark CLI command."""
+
+import json
+
+import pytest
+
+from metadata_automation.cli import benchmark, benchmark_readers
+
+GENERATED_MODULE = """
+from datetime import datetime
+from typing import Optional, Union
+
+from pydantic import AnyHttpUrl, BaseModel, Field
+
+
+class Checksum(BaseModel):
+    value: str
+
+
+class HRIDistribution(BaseModel):
+    access_url: AnyHttpUrl = Field(description="Access URL")
+    byte_size: Union[int, str] = Field(description="Size in bytes")
+    modified: Optional[datetime] = Field(default=None, description="Last modified")
+    checksum: Optional[Checksum] = Field(default=None, description="Checksum")
+"""
+
+
+class TestBenchmarkCLI:
+    """Integration tests for benchmark CLI command."""
+
+    @pytest.fixture
+    def sempyro_dir(self, tmp_path):
+        """Directory with a generated SeMPyRO-like module."""
+        sempyro_dir = tmp_path / "sempyro_classes" / "hri"
+        sempyro_dir.mkdir(parents=True)
+        (sempyro_dir / "hri-Distribution.py").write_text(GENERATED_MODULE)
+        return sempyro_dir.parent
+
+    def test_benchmark_reports_metrics(self, runner, sempyro_dir):
+        """Test that import, build and validation metrics are reported."""
+        result = runner.invoke(benchmark, ["-i", str(sempyro_dir), "--instances", "50", "--repeat", "1"])
+
+        assert result.exit_code == 0
+        assert "hri-Distribution" in result.output
+        assert "import:" in result.output
+        assert "model build:" in result.output
+        assert "instances/s" in result.output
+
+    def test_benchmark_fails_on_import_error(self, runner, sempyro_dir):
+        """Test that a module that cannot be imported fails the benchmark."""
+        (sempyro_dir / "hri" / "hri-Broken.py").write_text("logger = logging.getLogger(__name__)\n")
+
+        result = runner.invoke(benchmark, ["-i", str(sempyro_dir), "--instances", "10", "--repeat", "1"])
+
+        assert result.exit_code != 0
+        assert "Modules that could not be imported:" in result.output
+        assert "hri-Broken" in result.output
+
+    def test_benchmark_fails_without_valid_payload(self, runner, sempyro_dir):
+        """Test that a model for which no valid synthetic payload can be created fails the benchmark."""
+        (sempyro_dir / "hri" / "hri-File.py").write_text(
+            "from pathlib import Path\n\nfrom pydantic import BaseModel\n\n\n"
+            "class HRIFile(BaseModel):\n    path: Path\n"
+        )
+
+        result = runner.invoke(benchmark, ["-i", str(sempyro_dir), "--instances", "10", "--repeat", "1"])
+
+        assert result.exit_code != 0
+        assert "Could not create a valid synthetic payload for HRIFile" in result.output
+        assert "Modules whose models could not be validated:" in result.output
+        assert "Modules benchmarked: 2" in result.output
+
+    def test_benchmark_baseline_regression(self, runner, sempyro_dir, tmp_path):
+        """Test writing a baseline and failing when results regress against it."""
+        baseline = tmp_path / "baseline.json"
+        args = ["-i", str(sempyro_dir), "--instances", "50", "--repeat", "1", "--baseline", str(baseline)]
+
+        result = runner.invoke(benchmark, args + ["--update-baseline"])
+        assert result.exit_code == 0
+        assert baseline.exists()
+
+        # Pretend the previous run validated far more instances per second
+        data = json.loads(baseline.read_text())
+        data["hri-Distribution"]["validations_per_second"] *= 100
+        baseline.write_text(json.dumps(data))
+
+        result = runner.invoke(benchmark, args)
+        assert result.exit_code != 0
+        assert "Regressions" in result.output
+        assert "validations_per_second" in result.output
+
+    def test_benchmark_update_baseline_requires_baseline(self, runner, sempyro_dir):
+        """Test that --update-baseline without --baseline is rejected."""
+        result = runner.invoke(benchmark, ["-i", str(sempyro_dir), "--update-baseline"])
+
+        assert result.exit_code != 0
+        assert "--update-baseline requires --baseline" in result.output
+
+    def test_benchmark_readers(self, runner, test_input_dir):
+        """Test that every reader backend and the snapshot are timed per workbook."""
+        result = runner.invoke(
+            benchmark_readers, ["--input-excel", str(test_input_dir / "test_metadata.xlsx"), "--repeat", "1"]
+        )
+
+        assert result.exit_code == 0
+        assert "test_metadata.xlsx" in result.output
+        assert "openpyxl:" in result.output
+        assert "snapshot:" in result.output
+        assert "Workbooks benchmarked: 1" in result.output
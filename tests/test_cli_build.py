@@ -0,0 +1,158 @@
+"""Tests for build CLI command."""
+
+import subprocess
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+
+import yaml
+
+from metadata_automation.cli import build
+
+
+class TestBuildCLI:
+    """Integration tests for build CLI command."""
+
+    def test_build_requires_inputs(self, runner):
+        """Test error when neither a manifest nor input workbooks are given."""
+        result = runner.invoke(build, [])
+
+        assert result.exit_code != 0
+        assert "Provide --manifest or at least one --input-excel" in result.output
+
+    def test_build_manifest_invalid_profile(self, runner, tmp_path):
+        """Test error handling for a manifest profile with unknown keys."""
+        manifest = tmp_path / "manifest.yaml"
+        manifest.write_text(yaml.dump({"profiles": [{"input_excel": "a.xlsx", "output": "out"}]}))
+
+        result = runner.invoke(build, ["--manifest", str(manifest)])
+
+        assert result.exit_code != 0
+        assert "Unknown manifest keys: output" in result.output
+
+    def test_build_manifest_multiple_workbooks(
+        self, runner, tmp_path, test_input_dir, test_expected_dir, test_imports_path
+    ):
+        """Test building several workbooks from a manifest in one run."""
+        manifest = tmp_path / "manifest.yaml"
+        manifest.write_text(
+            yaml.dump(
+                {
+                    "defaults": {
+                        "namespace": "hri",
+                        "linkml_output_path": "out/linkml",
+                        "sempyro_output_path": "out/sempyro_classes",
+                        "imports_path": str(test_imports_path),
+                    },
+                    "profiles": [
+                        {
+                            "input_excel": str(test_input_dir / "test_metadata.xlsx"),
+                            "shaclplay_output_path": "out/shaclplay/test",
+                        },
+                        {"input_excel": str(test_input_dir / "multi_metadata.xlsx")},
+                    ],
+                }
+            )
+        )
+
+        result = runner.invoke(build, ["--manifest", str(manifest), "--jobs", "2"])
+
+        assert result.exit_code == 0, result.output
+        assert "Successfully built: 2 of 2 workbooks" in result.output
+        assert result.output.count("Formatting generated Python files with ruff") == 1
+        assert (tmp_path / "out" / "shaclplay" / "test" / "SHACL-testclass.xlsx").exists()
+
+        for class_name in ["TestClass", "ClassA", "ClassB"]:
+            actual_class = tmp_path / "out" / "sempyro_classes" / "hri" / f"hri-{class_name}.py"
+            expected_class = test_expected_dir / "sempyro_classes" / "hri" / f"hri-{class_name}.py"
+            assert actual_class.read_text() == expected_class.read_text()
+
+    def test_build_base_profile_seeds_derived_profiles(self, runner, tmp_path, test_input_dir, monkeypatch):
+        """Test that base profiles are built first and seed the cache their derived profiles reuse from."""
+        monkeypatch.setenv("METADATA_AUTOMATION_CACHE_DIR", str(tmp_path / "cache"))
+        base_excel, derived_excel = tmp_path / "base.xlsx", tmp_path / "derived.xlsx"
+        for workbook in (base_excel, derived_excel):
+            workbook.write_bytes((test_input_dir / "test_metadata.xlsx").read_bytes())
+        manifest = tmp_path / "manifest.yaml"
+        manifest.write_text(
+            yaml.dump(
+                {
+                    "profiles": [
+                        {
+                            "input_excel": str(derived_excel),
+                            "base_profile": str(base_excel),
+                            "shaclplay_output_path": "out/derived",
+                        },
+                        {"input_excel": str(base_excel), "shaclplay_output_path": "out/base"},
+                    ],
+                }
+            )
+        )
+
+        result = runner.invoke(build, ["--manifest", str(manifest), "--jobs", "2"])
+
+        assert result.exit_code == 0, result.output
+        assert "Classes reused from base profile: 1 of 1" in result.output
+        assert (tmp_path / "out" / "derived" / "SHACL-testclass.xlsx").read_bytes() == (
+            tmp_path / "out" / "base" / "SHACL-testclass.xlsx"
+        ).read_bytes()
+
+    def test_build_intermediate_shaclplay(self, runner, tmp_path, test_input_dir):
+        """Test that intermediate SHACLPlay files are converted uncompressed and removed, keeping the Turtle files."""
+        manifest = tmp_path / "manifest.yaml"
+        manifest.write_text(
+            yaml.dump(
+                {
+                    "profiles": [
+                        {
+                            "input_excel": str(test_input_dir / "test_metadata.xlsx"),
+                            "namespace": "hri",
+                            "shaclplay_output_path": "out/shaclplay",
+                            "shacl_output_path": "out/shacl_shapes",
+                        }
+                    ],
+                }
+            )
+        )
+        converted = []
+
+        def run_xls2rdf(cmd, **kwargs):
+            if "-i" in cmd:
+                with zipfile.ZipFile(cmd[cmd.index("-i") + 1]) as archive:
+                    converted.extend(entry.compress_type for entry in archive.infolist())
+                Path(cmd[cmd.index("-o") + 1]).write_text("<urn:a> <urn:b> <urn:c> .\n")
+            return subprocess.CompletedProcess(cmd, 0, "", "")
+
+        with patch("metadata_automation.cli.subprocess.run", side_effect=run_xls2rdf):
+            result = runner.invoke(build, ["--manifest", str(manifest), "--intermediate-shaclplay"])
+
+        assert result.exit_code == 0, result.output
+        assert converted and set(converted) == {zipfile.ZIP_STORED}
+        assert (tmp_path / "out" / "shacl_shapes" / "hri" / "hri-testclass.ttl").exists()
+        assert not (tmp_path / "out" / "shaclplay").exists()
+
+    def test_build_reports_failed_workbook(self, runner, tmp_path, test_input_dir, test_imports_path):
+        """Test that a failing workbook fails the build without stopping the others."""
+        manifest = tmp_path / "manifest.yaml"
+        manifest.write_text(
+            yaml.dump(
+                {
+                    "defaults": {
+                        "linkml_output_path": "out/linkml",
+                        "sempyro_output_path": "out/sempyro_classes",
+                        "imports_path": str(test_imports_path),
+                    },
+                    "profiles": [
+                        {"input_excel": str(test_input_dir / "bad_metadata.xlsx"), "namespace": "bad"},
+                        {"input_excel": str(test_input_dir / "test_metadata.xlsx"), "namespace": "hri"},
+                    ],
+                }
+            )
+        )
+
+        result = runner.invoke(build, ["--manifest", str(manifest)])
+
+        assert result.exit_code != 0
+        assert "Successfully built: 1 of 2 workbooks" in result.output
+        assert "    - bad" in result.output
+        assert (tmp_path / "out" / "sempyro_classes" / "hri" / "hri-TestClass.py").exists()
@@ -7,6 +7,7 @@ import pandas as pd
 import pytest
 
 from metadata_automation.cli import main
+from metadata_automation.workbook import read_excel
 
 
 class TestSHACLPlayEdgeCases:
@@ -20,7 +21,7 @@ class TestSHACLPlayEdgeCases:
             pd.DataFrame({"col": [1]}).to_excel(writer, sheet_name="dummy", index=False)
 
         # Mock to raise generic exception (not ValueError)
-        original_read_excel = pd.read_excel
+        original_read_excel = read_excel
 
         def mock_read_excel(*args, **kwargs):
             sheet_name = kwargs.get("sheet_name")
@@ -28,7 +29,7 @@ class TestSHACLPlayEdgeCases:
                 raise RuntimeError("Generic read error")
             return original_read_excel(*args, **kwargs)
 
-        with patch("metadata_automation.cli.pd.read_excel", side_effect=mock_read_excel):
+        with patch("metadata_automation.cli.read_excel", side_effect=mock_read_excel):
             result = runner.invoke(
                 main,
                 [
@@ -53,7 +54,7 @@ class TestSHACLPlayEdgeCases:
             )
 
         # Mock pd.read_excel to raise generic exception for classes sheet only
-        original_read_excel = pd.read_excel
+        original_read_excel = read_excel
         call_count = [0]
 
         def mock_read_excel(*args, **kwargs):
@@ -62,7 +63,7 @@ class TestSHACLPlayEdgeCases:
                 raise RuntimeError("Simulated generic error")
             return original_read_excel(*args, **kwargs)
 
-        with patch("metadata_automation.cli.pd.read_excel", side_effect=mock_read_excel):
+        with patch("metadata_automation.cli.read_excel", side_effect=mock_read_excel):
             result = runner.invoke(
                 main,
                 [
@@ -129,7 +130,7 @@ class TestSHACLPlayEdgeCases:
             ).to_excel(writer, sheet_name="classes", index=False)
 
         # Mock read_excel to raise generic exception for TestClass sheet
-        original_read_excel = pd.read_excel
+        original_read_excel = read_excel
 
         def mock_read_excel(*args, **kwargs):
             sheet_name = kwargs.get("sheet_name")
@@ -137,7 +138,7 @@ class TestSHACLPlayEdgeCases:
                 raise RuntimeError("Simulated error reading class sheet")
             return original_read_excel(*args, **kwargs)
 
-        with patch("metadata_automation.cli.pd.read_excel", side_effect=mock_read_excel):
+        with patch("metadata_automation.cli.read_excel", side_effect=mock_read_excel):
             result = runner.invoke(
                 main,
                 [
@@ -426,7 +427,10 @@ class TestSeMPyROEdgeCases:
                 mock_load.return_value = {"ex-TestClass": ["import"]}
 
                 with patch("metadata_automation.cli.generate_from_linkml"):
-                    with patch("metadata_automation.cli.remove_unwanted_classes"):
+                    with (
+                        patch("metadata_automation.cli.remove_unwanted_classes"),
+                        patch("metadata_automation.cli.find_class_ranges", return_value=[("TestClass", 0, 1)]),
+                    ):
                         with patch("metadata_automation.cli.subprocess.run") as mock_run:
                             mock_result = MagicMock()
                             mock_result.stdout = "1 file reformatted"
@@ -472,7 +476,10 @@ class TestSeMPyROEdgeCases:
                 mock_load.return_value = {"ex-TestClass": ["import"]}
 
                 with patch("metadata_automation.cli.generate_from_linkml"):
-                    with patch("metadata_automation.cli.remove_unwanted_classes"):
+                    with (
+                        patch("metadata_automation.cli.remove_unwanted_classes"),
+                        patch("metadata_automation.cli.find_class_ranges", return_value=[("TestClass", 0, 1)]),
+                    ):
                         with patch("metadata_automation.cli.subprocess.run") as mock_run:
                             error = subprocess.CalledProcessError(returncode=1, cmd=["ruff"])
                             error.stderr = "ruff error message"
@@ -30,7 +30,7 @@ class TestSHACLPlayErrors:
             mock_parent2.resolve.return_value = mock_resolved
             mock_resolved.__truediv__ = lambda self, other: mock_template
 
-            mock_path_class.side_effect = lambda arg: (mock_file_path if arg == cli_module.__file__ else Path(arg))
+            mock_path_class.side_effect = lambda arg: mock_file_path if arg == cli_module.__file__ else Path(arg)
 
             result = runner.invoke(
                 main,
@@ -82,7 +82,7 @@ class TestSHACLPlayErrors:
             mock_parent2.resolve.return_value = mock_resolved
             mock_resolved.__truediv__ = lambda self, other: mock_template
 
-            mock_path_class.side_effect = lambda arg: (mock_file_path if arg == "__file__" else Path(arg))
+            mock_path_class.side_effect = lambda arg: mock_file_path if arg == "__file__" else Path(arg)
 
             result = runner.invoke(
                 main,
@@ -121,7 +121,7 @@ class TestSHACLPlayErrors:
             mock_parent2.resolve.return_value = mock_resolved
             mock_resolved.__truediv__ = lambda self, other: mock_template
 
-            mock_path_class.side_effect = lambda arg: (mock_file_path if arg == "__file__" else Path(arg))
+            mock_path_class.side_effect = lambda arg: mock_file_path if arg == "__file__" else Path(arg)
 
             result = runner.invoke(
                 main,
@@ -161,7 +161,7 @@ class TestSHACLPlayErrors:
             mock_parent2.resolve.return_value = mock_resolved
             mock_resolved.__truediv__ = lambda self, other: mock_template
 
-            mock_path_class.side_effect = lambda arg: (mock_file_path if arg == "__file__" else Path(arg))
+            mock_path_class.side_effect = lambda arg: mock_file_path if arg == "__file__" else Path(arg)
 
             result = runner.invoke(
                 main,
@@ -235,7 +235,7 @@ class TestSHACLPlayErrors:
             mock_parent2.resolve.return_value = mock_resolved
             mock_resolved.__truediv__ = lambda self, other: mock_template
 
-            mock_path_class.side_effect = lambda arg: (mock_file_path if arg == "__file__" else Path(arg))
+            mock_path_class.side_effect = lambda arg: mock_file_path if arg == "__file__" else Path(arg)
 
             with patch("metadata_automation.cli.SHACLPlayConverter"):
                 result = runner.invoke(
@@ -273,7 +273,7 @@ class TestSHACLFromSHACLPlayErrors:
             mock_parent2.resolve.return_value = mock_resolved
             mock_resolved.__truediv__ = lambda self, other: mock_jar
 
-            mock_path_class.side_effect = lambda arg: (mock_file_path if arg == cli_module.__file__ else Path(arg))
+            mock_path_class.side_effect = lambda arg: mock_file_path if arg == cli_module.__file__ else Path(arg)
 
             result = runner.invoke(
                 main,
@@ -523,7 +523,10 @@ class TestSeMPyROErrors:
                 mock_load.return_value = {"ex-TestClass": ["import: something"]}
 
                 with patch("metadata_automation.cli.generate_from_linkml"):
-                    with patch("metadata_automation.cli.remove_unwanted_classes"):
+                    with (
+                        patch("metadata_automation.cli.remove_unwanted_classes"),
+                        patch("metadata_automation.cli.find_class_ranges", return_value=[("TestClass", 0, 1)]),
+                    ):
                         with patch("metadata_automation.cli.subprocess.run") as mock_run:
                             mock_run.side_effect = FileNotFoundError("ruff not found")
 
@@ -1,8 +1,15 @@
 """Tests for sempyro CLI command."""
 
+import importlib.util
+import shutil
+
+import pandas as pd
 import pytest
 
 from metadata_automation.cli import sempyro
+from metadata_automation.linkml.creator import SHARED_SCHEMAS
+from metadata_automation.sempyro.utils import load_yaml
+from metadata_automation.workbook import export_source
 
 
 class TestSemPyRoCLI:
@@ -185,3 +192,380 @@ class TestSemPyRoCLI:
         assert actual_linkml_classb.read_text() == expected_linkml_classb.read_text()
         assert actual_class_classa.read_text() == expected_class_classa.read_text()
         assert actual_class_classb.read_text() == expected_class_classb.read_text()
+
+    def test_sempyro_infers_missing_imports(self, runner, test_excel, sempyro_output_dirs, tmp_path, monkeypatch):
+        """Test that classes without an imports configuration get inferred imports and can be imported."""
+        # Imports are inferred from, and the generated module imports, the installed sempyro
+        sempyro_package = pytest.importorskip("sempyro")
+        linkml_output_dir, sempyro_output_dir = sempyro_output_dirs
+        # HRI is not in the installed sempyro; other classes of the imports configuration may supply it
+        (tmp_path / "hri_namespace.py").write_text(
+            'from rdflib import Namespace\n\nHRI = Namespace("http://data.health-ri.nl/core/p2#")\n'
+        )
+        monkeypatch.syspath_prepend(str(tmp_path))
+        imports_file = tmp_path / "imports.yaml"
+        imports_file.write_text('hri-Other: "from hri_namespace import HRI"\n')
+
+        result = runner.invoke(
+            sempyro,
+            [
+                "--input-excel",
+                str(test_excel),
+                "--namespace",
+                "hri",
+                "--linkml-output-path",
+                str(linkml_output_dir),
+                "--sempyro-output-path",
+                str(sempyro_output_dir),
+                "--imports-path",
+                str(imports_file),
+            ],
+        )
+
+        assert result.exit_code == 0
+        assert "Classes generated with inferred imports:" in result.output
+        generated = (sempyro_output_dir / "hri" / "hri-TestClass.py").read_text()
+        assert "import logging" in generated
+        assert "from pydantic import ConfigDict, Field" in generated
+
+        spec = importlib.util.spec_from_file_location("hri_test_class", sempyro_output_dir / "hri" / "hri-TestClass.py")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        assert issubclass(module.HRITestclass, sempyro_package.RDFModel)
+
+    def test_sempyro_unresolved_imports_fail(self, runner, test_excel, sempyro_output_dirs, tmp_path):
+        """Test that a class whose imports cannot all be inferred is not written and fails the command."""
+        linkml_output_dir, sempyro_output_dir = sempyro_output_dirs
+        imports_file = tmp_path / "imports.yaml"
+        imports_file.write_text("{}\n")
+
+        result = runner.invoke(
+            sempyro,
+            [
+                "--input-excel",
+                str(test_excel),
+                "--namespace",
+                "hri",
+                "--linkml-output-path",
+                str(linkml_output_dir),
+                "--sempyro-output-path",
+                str(sempyro_output_dir),
+                "--imports-path",
+                str(imports_file),
+            ],
+        )
+
+        assert result.exit_code != 0
+        assert "Could not infer imports for hri-TestClass: HRI" in result.output
+        assert "Classes not generated due to unresolved imports:" in result.output
+        assert not (sempyro_output_dir / "hri" / "hri-TestClass.py").exists()
+
+    def test_sempyro_no_infer_imports_skips_class(self, runner, test_excel, sempyro_output_dirs, tmp_path):
+        """Test that --no-infer-imports skips classes without an imports configuration."""
+        linkml_output_dir, sempyro_output_dir = sempyro_output_dirs
+        imports_file = tmp_path / "imports.yaml"
+        imports_file.write_text("{}\n")
+
+        result = runner.invoke(
+            sempyro,
+            [
+                "--input-excel",
+                str(test_excel),
+                "--namespace",
+                "hri",
+                "--linkml-output-path",
+                str(linkml_output_dir),
+                "--sempyro-output-path",
+                str(sempyro_output_dir),
+                "--imports-path",
+                str(imports_file),
+                "--no-infer-imports",
+            ],
+        )
+
+        assert result.exit_code == 0
+        assert "Classes skipped due to missing imports configuration:" in result.output
+        assert not (sempyro_output_dir / "hri" / "hri-TestClass.py").exists()
+
+    def test_sempyro_combined_matches_per_class(
+        self, runner, multi_excel, test_expected_dir, sempyro_output_dirs, cli_args_with_temp_paths
+    ):
+        """Test that --combined renders the same classes as per-class generation."""
+        linkml_output_dir, sempyro_output_dir = sempyro_output_dirs
+
+        result = runner.invoke(
+            sempyro,
+            [
+                "--input-excel",
+                str(multi_excel),
+                "--namespace",
+                "hri",
+                "--combined",
+            ]
+            + cli_args_with_temp_paths,
+        )
+
+        assert result.exit_code == 0
+        assert (linkml_output_dir / "hri" / "hri.yaml").exists()
+
+        for class_name in ["ClassA", "ClassB"]:
+            actual_class = sempyro_output_dir / "hri" / f"hri-{class_name}.py"
+            expected_class = test_expected_dir / "sempyro_classes" / "hri" / f"hri-{class_name}.py"
+            assert actual_class.read_text() == expected_class.read_text()
+
+    def test_sempyro_stream_matches_per_class(
+        self, runner, multi_excel, test_expected_dir, sempyro_output_dirs, cli_args_with_temp_paths
+    ):
+        """Test that --stream generates the same classes, and is rejected with --combined."""
+        linkml_output_dir, sempyro_output_dir = sempyro_output_dirs
+        args = ["--input-excel", str(multi_excel), "--namespace", "hri", "--stream"] + cli_args_with_temp_paths
+
+        result = runner.invoke(sempyro, args)
+
+        assert result.exit_code == 0
+        assert "Streaming 2 class schemas" in result.output
+        for class_name in ["ClassA", "ClassB"]:
+            actual_class = sempyro_output_dir / "hri" / f"hri-{class_name}.py"
+            expected_class = test_expected_dir / "sempyro_classes" / "hri" / f"hri-{class_name}.py"
+            assert actual_class.read_text() == expected_class.read_text()
+
+        result = runner.invoke(sempyro, args + ["--combined"])
+        assert result.exit_code == 1
+        assert "--stream cannot be combined with --combined or --base-profile" in result.output
+
+    def test_sempyro_rerun_leaves_unchanged_files(
+        self, runner, test_excel, sempyro_output_dirs, cli_args_with_temp_paths
+    ):
+        """Test that a second run does not rewrite files whose content did not change."""
+        linkml_output_dir, sempyro_output_dir = sempyro_output_dirs
+        args = ["--input-excel", str(test_excel), "--namespace", "hri"] + cli_args_with_temp_paths
+
+        result = runner.invoke(sempyro, args)
+        assert result.exit_code == 0
+        assert "Files: 1 written, 0 unchanged" in result.output
+        outputs = [linkml_output_dir / "hri" / "hri-TestClass.yaml", sempyro_output_dir / "hri" / "hri-TestClass.py"]
+        modified = [path.stat().st_mtime_ns for path in outputs]
+
+        result = runner.invoke(sempyro, args)
+        assert result.exit_code == 0
+        assert "Files: 0 written, 1 unchanged" in result.output
+        assert [path.stat().st_mtime_ns for path in outputs] == modified
+        # The staging directory is removed
+        assert [path.name for path in (sempyro_output_dir / "hri").iterdir()] == ["hri-TestClass.py"]
+
+    def test_sempyro_base_profile_reuses_unchanged_classes(
+        self, runner, multi_excel, test_excel, test_expected_dir, tmp_path, test_imports_path
+    ):
+        """Test that classes unchanged from the base profile are reused instead of generated."""
+
+        def run(output_dir, base_profile):
+            return runner.invoke(
+                sempyro,
+                [
+                    "--input-excel",
+                    str(multi_excel),
+                    "--namespace",
+                    "hri",
+                    "--linkml-output-path",
+                    str(output_dir / "linkml"),
+                    "--sempyro-output-path",
+                    str(output_dir / "sempyro_classes"),
+                    "--imports-path",
+                    str(test_imports_path),
+                    "--base-profile",
+                    str(base_profile),
+                ],
+            )
+
+        # No classes in common with an unrelated base profile
+        result = run(tmp_path / "unrelated", test_excel)
+        assert result.exit_code == 0
+        assert "0 of 2 classes are unchanged from the base profile" in result.output
+
+        # The first build against the base profile generates and caches the shared classes
+        result = run(tmp_path / "first", multi_excel)
+        assert result.exit_code == 0
+        assert "2 of 2 classes are unchanged from the base profile" in result.output
+        assert "Successfully generated: 2 classes" in result.output
+
+        result = run(tmp_path / "second", multi_excel)
+        assert result.exit_code == 0
+        assert "Reused from base profile: 2 classes" in result.output
+        assert "Successfully generated: 0 classes" in result.output
+        for class_name in ["ClassA", "ClassB"]:
+            actual_class = tmp_path / "second" / "sempyro_classes" / "hri" / f"hri-{class_name}.py"
+            expected_class = test_expected_dir / "sempyro_classes" / "hri" / f"hri-{class_name}.py"
+            assert actual_class.read_text() == expected_class.read_text()
+
+    def test_sempyro_base_profile_regenerates_dependents(
+        self, runner, test_input_dir, tmp_path, test_imports_path, monkeypatch
+    ):
+        """Test that a class changed from the base profile invalidates the classes that reference it."""
+        monkeypatch.setenv("METADATA_AUTOMATION_CACHE_DIR", str(tmp_path / "cache"))
+        base_dir = tmp_path / "base"
+        export_source(test_input_dir / "multi_metadata.xlsx", base_dir, "csv")
+        classes = pd.read_csv(base_dir / "classes.csv", dtype=str)
+        classes["SeMPyRO_import_classes"] = [None, "hri:ClassA"]
+        classes.to_csv(base_dir / "classes.csv", index=False)
+        derived_dir = tmp_path / "derived"
+        shutil.copytree(base_dir, derived_dir)
+        properties = pd.read_csv(derived_dir / "ClassA.csv", dtype=str)
+        properties.loc[0, "Definition"] = "The changed title"
+        properties.to_csv(derived_dir / "ClassA.csv", index=False)
+
+        result = runner.invoke(
+            sempyro,
+            [
+                "--input-excel",
+                str(derived_dir),
+                "--namespace",
+                "hri",
+                "--linkml-output-path",
+                str(tmp_path / "linkml"),
+                "--sempyro-output-path",
+                str(tmp_path / "sempyro_classes"),
+                "--imports-path",
+                str(test_imports_path),
+                "--base-profile",
+                str(base_dir),
+            ],
+        )
+
+        assert result.exit_code == 0, result.output
+        # hri:ClassB is unchanged itself, but imports the changed hri:ClassA
+        assert "0 of 2 classes are unchanged from the base profile" in result.output
+
+    def test_sempyro_seed_profile_cache(self, runner, multi_excel, tmp_path, test_imports_path, monkeypatch):
+        """Test that a base profile seeding the cache lets derived profiles reuse classes from their first build."""
+        monkeypatch.setenv("METADATA_AUTOMATION_CACHE_DIR", str(tmp_path / "cache"))
+
+        def run(output_dir, *options):
+            return runner.invoke(
+                sempyro,
+                [
+                    "--input-excel",
+                    str(multi_excel),
+                    "--namespace",
+                    "hri",
+                    "--linkml-output-path",
+                    str(output_dir / "linkml"),
+                    "--sempyro-output-path",
+                    str(output_dir / "sempyro_classes"),
+                    "--imports-path",
+                    str(test_imports_path),
+                    *options,
+                ],
+            )
+
+        result = run(tmp_path / "base", "--seed-profile-cache")
+        assert result.exit_code == 0
+        assert "Successfully generated: 2 classes" in result.output
+
+        result = run(tmp_path / "derived", "--base-profile", str(multi_excel))
+        assert result.exit_code == 0
+        assert "Reused from base profile: 2 classes" in result.output
+        for class_file in ["hri-ClassA.py", "hri-ClassB.py"]:
+            assert (tmp_path / "derived" / "sempyro_classes" / "hri" / class_file).read_text() == (
+                tmp_path / "base" / "sempyro_classes" / "hri" / class_file
+            ).read_text()
+
+    def test_sempyro_base_profile_requires_shared_schemas(
+        self, runner, multi_excel, tmp_path, test_imports_path, monkeypatch
+    ):
+        """Test that base profiles fail when the shared schemas they are fingerprinted on are missing."""
+        missing_schema = tmp_path / "missing" / "rdf_model.yaml"
+        monkeypatch.setitem(SHARED_SCHEMAS, "../rdf_model", ("RDF model", missing_schema))
+
+        result = runner.invoke(
+            sempyro,
+            [
+                "--input-excel",
+                str(multi_excel),
+                "--namespace",
+                "hri",
+                "--linkml-output-path",
+                str(tmp_path / "linkml"),
+                "--sempyro-output-path",
+                str(tmp_path / "sempyro_classes"),
+                "--imports-path",
+                str(test_imports_path),
+                "--base-profile",
+                str(multi_excel),
+            ],
+        )
+
+        assert result.exit_code == 1
+        assert f"Failed to load base profile: RDF model schema not found at {missing_schema}" in result.output
+
+    def test_sempyro_used_prefixes_only(
+        self, runner, test_excel, test_expected_dir, sempyro_output_dirs, cli_args_with_temp_paths
+    ):
+        """Test that LinkML schemas declare only the prefixes they reference."""
+        linkml_output_dir, sempyro_output_dir = sempyro_output_dirs
+
+        result = runner.invoke(
+            sempyro,
+            ["--input-excel", str(test_excel), "--namespace", "hri", "--used-prefixes-only"] + cli_args_with_temp_paths,
+        )
+        assert result.exit_code == 0
+
+        schema = load_yaml(linkml_output_dir / "hri" / "hri-TestClass.yaml")
+        assert list(schema["prefixes"]) == ["hri", "dct"]
+
+        # The generated classes do not depend on the declared prefixes
+        actual_class = sempyro_output_dir / "hri" / "hri-TestClass.py"
+        expected_class = test_expected_dir / "sempyro_classes" / "hri" / "hri-TestClass.py"
+        assert actual_class.read_text() == expected_class.read_text()
+
+    @pytest.mark.parametrize("mode", ["--per-class", "--combined"])
+    def test_sempyro_vocabulary_enums(
+        self, runner, test_excel, sempyro_output_dirs, cli_args_with_temp_paths, tmp_path, mode
+    ):
+        """Test that IRI ranges of controlled vocabulary properties become enums of their concepts."""
+        linkml_output_dir, sempyro_output_dir = sempyro_output_dirs
+        sheets = pd.read_excel(test_excel, sheet_name=None)
+        vocabulary_row = {
+            "Property label": "theme",
+            "Definition": "The theme",
+            "Property URI": "dcat:theme",
+            "Controlled vocabluary (if applicable)": "Theme vocabulary",
+            "Cardinality": "0..n",
+            "SeMPyRO_rdf_term": "DCAT.theme",
+            "SeMPyRO_rdf_type": "uri",
+            "SeMPyRO_range": "AnyHttpUrl",
+        }
+        sheets["TestClass"] = pd.concat([sheets["TestClass"], pd.DataFrame([vocabulary_row])])
+        excel_path = tmp_path / "vocabulary_metadata.xlsx"
+        with pd.ExcelWriter(excel_path) as writer:
+            for sheet_name, sheet in sheets.items():
+                sheet.to_excel(writer, sheet_name=sheet_name, index=False)
+        vocabulary_path = tmp_path / "themes.ttl"
+        vocabulary_path.write_text(
+            """
+            @prefix skos: <http://www.w3.org/2004/02/skos/core#> .
+            @prefix theme: <http://example.com/theme/> .
+            <http://example.com/theme> skos:prefLabel "Theme vocabulary"@en .
+            theme:HEAL skos:inScheme <http://example.com/theme> .
+            theme:AGRI skos:inScheme <http://example.com/theme> .
+            """
+        )
+
+        result = runner.invoke(
+            sempyro,
+            ["--input-excel", str(excel_path), "--namespace", "hri", mode, "--vocabulary-enums"]
+            + ["--vocabularies", str(vocabulary_path)]
+            + cli_args_with_temp_paths,
+        )
+        assert result.exit_code == 0
+
+        schema = load_yaml(linkml_output_dir / "hri" / "hri-TestClass.yaml")
+        assert schema["slots"]["dcat_theme"]["range"] == "ThemeEnum"
+        assert list(schema["enums"]["ThemeEnum"]["permissible_values"]) == [
+            "http://example.com/theme/AGRI",
+            "http://example.com/theme/HEAL",
+        ]
+
+        generated = (sempyro_output_dir / "hri" / "hri-TestClass.py").read_text()
+        assert "from enum import Enum" in generated
+        assert 'AGRI = "http://example.com/theme/AGRI"' in generated
+        assert "dcat_theme: Optional[list[ThemeEnum]]" in generated
@@ -4,8 +4,11 @@ import re
 from pathlib import Path
 
 import pytest
+from rdflib import DCTERMS, Graph
+from rdflib.compare import isomorphic
 
-from metadata_automation.cli import shacl_from_shaclplay
+from metadata_automation.cli import _write_shacl_turtle, shacl_from_shaclplay, shaclplay
+from metadata_automation.output import OutputWriter
 
 
 def normalize_turtle(content: str) -> str:
@@ -62,6 +65,21 @@ class TestShaclFromShaclplayCLI:
         assert expected_file.exists()
         assert_turtle_equivalent(output_file, expected_file)
 
+    def test_shacl_from_shaclplay_python_engine(self, runner, shaclplay_multi_input_dir, test_expected_dir, tmp_path):
+        """Test SHACL Turtle generation with the native Python reader, without Java."""
+        output_dir = tmp_path / "output"
+
+        result = runner.invoke(
+            shacl_from_shaclplay,
+            ["--input-path", str(shaclplay_multi_input_dir), "--output-path", str(output_dir), "--engine", "python"],
+        )
+
+        assert result.exit_code == 0, result.output
+        for class_name in ("classa", "classb"):
+            output_graph = Graph().parse(output_dir / "hri" / f"hri-{class_name}.ttl")
+            expected_graph = Graph().parse(test_expected_dir / "multi" / "hri" / f"hri-{class_name}.ttl")
+            assert isomorphic(output_graph, expected_graph)
+
     def test_shacl_from_shaclplay_no_files(self, runner, tmp_path):
         """Test error handling when no SHACLPlay files found."""
         empty_dir = tmp_path / "empty"
@@ -134,3 +152,81 @@ class TestShaclFromShaclplayCLI:
         # Files should be named as {namespace}/{namespace}-{classname}.ttl
         expected_file = output_dir / "hri" / "hri-testclass.ttl"
         assert expected_file.exists()
+
+    def test_split_names_files_after_class_sheets(self, runner, test_input_dir, tmp_path):
+        """Test that --split names the files of a combined file like the files of per-class files."""
+        openpyxl = pytest.importorskip("openpyxl")
+
+        # Class sheets named differently from their classes, e.g. 'FirstSheet' for hri:ClassA
+        workbook = openpyxl.load_workbook(test_input_dir / "multi_metadata.xlsx")
+        sheet_names = {"ClassA": "FirstSheet", "ClassB": "Second-Sheet"}
+        for old_name, new_name in sheet_names.items():
+            workbook[old_name].title = new_name
+        for row in workbook["classes"].iter_rows(min_row=2):
+            if row[0].value in sheet_names:
+                row[0].value = sheet_names[row[0].value]
+        source = tmp_path / "source.xlsx"
+        workbook.save(source)
+
+        output_names = {}
+        for mode in ("--per-class", "--combined"):
+            shaclplay_dir = tmp_path / mode.strip("-") / "shaclplay"
+            result = runner.invoke(shaclplay, ["--input-excel", str(source), "--output-path", str(shaclplay_dir), mode])
+            assert result.exit_code == 0, result.output
+
+            output_dir = tmp_path / mode.strip("-") / "shacl"
+            result = runner.invoke(
+                shacl_from_shaclplay,
+                ["-i", str(shaclplay_dir), "-o", str(output_dir), "--engine", "python", "--split"],
+            )
+            assert result.exit_code == 0, result.output
+            output_names[mode] = sorted(path.name for path in (output_dir / "hri").glob("*.ttl"))
+
+        assert output_names["--per-class"] == ["hri-firstsheet.ttl", "hri-second-sheet.ttl"]
+        assert output_names["--combined"] == output_names["--per-class"]
+        split_graph = Graph().parse(tmp_path / "combined" / "shacl" / "hri" / "hri-firstsheet.ttl")
+        assert not list(split_graph.objects(None, DCTERMS.identifier))
+
+    def test_combined_files_detected_by_suffix(self, runner, test_input_dir, tmp_path):
+        """Test that only files written by shaclplay --combined are converted as combined files."""
+        per_class_dir = tmp_path / "per_class"
+        result = runner.invoke(
+            shaclplay,
+            ["--input-excel", str(test_input_dir / "test_metadata.xlsx"), "--output-path", str(per_class_dir)],
+        )
+        assert result.exit_code == 0, result.output
+        # A per-class file of a class named after its namespace
+        (per_class_dir / "SHACL-testclass.xlsx").rename(per_class_dir / "SHACL-hri.xlsx")
+
+        combined_dir = tmp_path / "combined"
+        result = runner.invoke(
+            shaclplay,
+            [
+                "--input-excel",
+                str(test_input_dir / "multi_metadata.xlsx"),
+                "--output-path",
+                str(combined_dir),
+                "--combined",
+            ],
+        )
+        assert result.exit_code == 0, result.output
+
+        for shaclplay_dir in (per_class_dir, combined_dir):
+            result = runner.invoke(
+                shacl_from_shaclplay,
+                ["-i", str(shaclplay_dir), "-o", str(tmp_path / "shacl"), "--engine", "python"],
+            )
+            assert result.exit_code == 0, result.output
+
+        assert sorted(path.name for path in (tmp_path / "shacl" / "hri").glob("*.ttl")) == ["hri-hri.ttl", "hri.ttl"]
+
+    def test_missing_staged_file_warns(self, tmp_path, capsys):
+        """Test that a conversion without Turtle output is not reported as generated."""
+        output_file = tmp_path / "hri" / "hri-testclass.ttl"
+
+        _write_shacl_turtle(tmp_path / ".hri-testclass.staged.ttl", output_file, None, OutputWriter(), None)
+
+        captured = capsys.readouterr()
+        assert f"⚠ Warning: No Turtle was converted, {output_file} was not generated" in captured.err
+        assert "Successfully generated" not in captured.out
+        assert not output_file.exists()
@@ -2,9 +2,11 @@ from pathlib import Path
 
 import pandas as pd
 import pytest
+from freezegun import freeze_time
 from pandas.testing import assert_frame_equal
 
 from metadata_automation.cli import shaclplay
+from metadata_automation.workbook import export_source
 
 
 class TestShaclplayCLI:
@@ -47,6 +49,51 @@ class TestShaclplayCLI:
         expected_file = Path(__file__).resolve().parent / "test_expected" / "default" / "SHACL-testclass.xlsx"
         self._assert_excel_matches(output_file, expected_file)
 
+    def test_shaclplay_source_directory(self, runner, test_excel, tmp_path):
+        """Test that a source directory gives the same SHACLPlay files as its workbook."""
+        source_dir = tmp_path / "source"
+        export_source(test_excel, source_dir, "tsv")
+        output_dir = tmp_path / "output"
+
+        result = runner.invoke(shaclplay, ["--input-excel", str(source_dir), "--output-path", str(output_dir)])
+
+        assert result.exit_code == 0
+        expected_file = Path(__file__).resolve().parent / "test_expected" / "default" / "SHACL-testclass.xlsx"
+        self._assert_excel_matches(output_dir / "SHACL-testclass.xlsx", expected_file)
+
+    def test_shaclplay_reference_cycle(self, runner, test_input_dir, tmp_path):
+        """Test that classes inheriting from each other are reported before generating any file."""
+        source_dir = tmp_path / "source"
+        export_source(test_input_dir / "multi_metadata.xlsx", source_dir, "csv")
+        classes = pd.read_csv(source_dir / "classes.csv", dtype=str)
+        classes["SeMPyRO_inherits_from"] = ["hri:ClassB", "hri:ClassA"]
+        classes.to_csv(source_dir / "classes.csv", index=False)
+        output_dir = tmp_path / "output"
+
+        result = runner.invoke(shaclplay, ["--input-excel", str(source_dir), "--output-path", str(output_dir)])
+
+        assert result.exit_code == 1
+        assert "Classes reference each other in a cycle" in result.output
+        assert not list(output_dir.glob("*.xlsx"))
+
+    def test_shaclplay_nested_shape_cycle(self, runner, test_input_dir, tmp_path):
+        """Test that classes whose nested shapes reference each other are generated in one level, with a warning."""
+        source_dir = tmp_path / "source"
+        export_source(test_input_dir / "multi_metadata.xlsx", source_dir, "csv")
+        for class_name, other in (("ClassA", "ClassB"), ("ClassB", "ClassA")):
+            properties = pd.read_csv(source_dir / f"{class_name}.csv", dtype=str)
+            reference = {**properties.iloc[0].to_dict(), "Property label": "related", "Property URI": "dct:relation"}
+            reference.update({"Range": f"hri:{other}", "SHACL_sh:node": f"hri:{other}Shape"})
+            pd.concat([properties, pd.DataFrame([reference])]).to_csv(source_dir / f"{class_name}.csv", index=False)
+        output_dir = tmp_path / "output"
+
+        result = runner.invoke(shaclplay, ["--input-excel", str(source_dir), "--output-path", str(output_dir)])
+
+        assert result.exit_code == 0, result.output
+        assert "Nested shapes of hri:ClassA, hri:ClassB reference each other in a cycle" in result.output
+        assert "Generating level 1 of 1 (2 classes)" in result.output
+        assert sorted(path.name for path in output_dir.glob("*.xlsx")) == ["SHACL-classa.xlsx", "SHACL-classb.xlsx"]
+
     def test_shaclplay_missing_excel(self, runner, tmp_path):
         """Test error handling for missing input file."""
         result = runner.invoke(shaclplay, ["--input-excel", "nonexistent.xlsx", "--output-path", str(tmp_path)])
@@ -96,3 +143,110 @@ class TestShaclplayCLI:
 
         self._assert_excel_matches(actual_classa, expected_classa)
         self._assert_excel_matches(actual_classb, expected_classb)
+
+    def test_shaclplay_combined(self, runner, test_input_dir, test_expected_dir, tmp_path):
+        """Test that --combined writes the shapes of all classes of a namespace to one SHACLPlay file."""
+        output_dir = tmp_path / "output"
+        args = ["--input-excel", str(test_input_dir / "multi_metadata.xlsx"), "--output-path", str(output_dir)]
+
+        result = runner.invoke(shaclplay, args + ["--combined"])
+
+        assert result.exit_code == 0
+        assert [path.name for path in output_dir.iterdir()] == ["SHACL-hri.combined.xlsx"]
+        combined_file = output_dir / "SHACL-hri.combined.xlsx"
+        nodeshapes = pd.read_excel(combined_file, sheet_name="NodeShapes (classes)", header=None)
+        assert nodeshapes.iloc[13:, 0].tolist() == ["hri:ClassAShape", "hri:ClassBShape"]
+        propertyshapes = pd.read_excel(combined_file, sheet_name="PropertyShapes (properties)", header=None)
+        expected_rows = 7 + sum(
+            len(pd.read_excel(path, sheet_name="PropertyShapes (properties)", header=None)) - 7
+            for path in (test_expected_dir / "multi").glob("SHACL-*.xlsx")
+        )
+        assert len(propertyshapes) == expected_rows
+        assert propertyshapes[0].isin(["Properties on ClassA", "Properties on ClassB"]).sum() == 2
+
+        result = runner.invoke(
+            shaclplay, args + ["--combined", "--base-profile", str(test_input_dir / "multi_metadata.xlsx")]
+        )
+        assert result.exit_code == 1
+        assert "--combined cannot be combined with --base-profile" in result.output
+
+    def test_shaclplay_base_profile_reuses_unchanged_classes(self, runner, test_excel, tmp_path):
+        """Test that SHACLPlay files of classes unchanged from the base profile are reused."""
+        args = ["--input-excel", str(test_excel), "--base-profile", str(test_excel)]
+
+        result = runner.invoke(shaclplay, args + ["--output-path", str(tmp_path / "first")])
+        assert result.exit_code == 0
+        assert "Reused" not in result.output
+
+        result = runner.invoke(shaclplay, args + ["--output-path", str(tmp_path / "second")])
+        assert result.exit_code == 0
+        assert "Classes reused from base profile: 1 of 1" in result.output
+
+        expected_file = Path(__file__).resolve().parent / "test_expected" / "default" / "SHACL-testclass.xlsx"
+        self._assert_excel_matches(tmp_path / "second" / "SHACL-testclass.xlsx", expected_file)
+
+    def test_shaclplay_seed_profile_cache(self, runner, test_excel, tmp_path, monkeypatch):
+        """Test that a base profile seeding the cache lets derived profiles reuse files from their first build."""
+        monkeypatch.setenv("METADATA_AUTOMATION_CACHE_DIR", str(tmp_path / "cache"))
+        args = ["--input-excel", str(test_excel)]
+
+        result = runner.invoke(shaclplay, args + ["--output-path", str(tmp_path / "base"), "--seed-profile-cache"])
+        assert result.exit_code == 0
+        assert "Reused" not in result.output
+
+        result = runner.invoke(
+            shaclplay, args + ["--output-path", str(tmp_path / "derived"), "--base-profile", str(test_excel)]
+        )
+        assert result.exit_code == 0
+        assert "Classes reused from base profile: 1 of 1" in result.output
+        assert (tmp_path / "derived" / "SHACL-testclass.xlsx").read_bytes() == (
+            tmp_path / "base" / "SHACL-testclass.xlsx"
+        ).read_bytes()
+
+    def test_shaclplay_used_prefixes_only(self, runner, test_excel, test_expected_dir, tmp_path):
+        """Test that only the prefixes referenced by the class are declared."""
+        result = runner.invoke(
+            shaclplay,
+            ["--input-excel", str(test_excel), "--output-path", str(tmp_path), "--used-prefixes-only"],
+        )
+        assert result.exit_code == 0
+
+        output_file = tmp_path / "SHACL-testclass.xlsx"
+        prefixes_df = pd.read_excel(output_file, sheet_name="prefixes", header=None)
+        assert list(prefixes_df[1].dropna()) == ["hri", "dct", "dcat", "dash", "sh"]
+
+        expected_file = test_expected_dir / "default" / "SHACL-testclass.xlsx"
+        for sheet_name in ["NodeShapes (classes)", "PropertyShapes (properties)"]:
+            actual_df = pd.read_excel(output_file, sheet_name=sheet_name, header=None)
+            expected_df = pd.read_excel(expected_file, sheet_name=sheet_name, header=None)
+            actual_df.iat[6, 1] = expected_df.iat[6, 1] = None
+            assert_frame_equal(actual_df, expected_df, check_dtype=False)
+
+    def test_shaclplay_build_date_is_reproducible(self, runner, test_excel, tmp_path):
+        """Test that runs with the same build date write byte-identical files."""
+        outputs = []
+        for name, now in [("first", "2026-01-01 10:00:00"), ("second", "2026-03-01 18:30:00")]:
+            with freeze_time(now):
+                result = runner.invoke(
+                    shaclplay,
+                    ["--input-excel", str(test_excel), "--output-path", str(tmp_path / name)],
+                    env={"SOURCE_DATE_EPOCH": "1700000000"},
+                )
+            assert result.exit_code == 0
+            assert "Reproducible mode, build date 2023-11-14T22:13:20" in result.output
+            outputs.append((tmp_path / name / "SHACL-testclass.xlsx").read_bytes())
+
+        assert outputs[0] == outputs[1]
+        nodeshapes_df = pd.read_excel(
+            tmp_path / "first" / "SHACL-testclass.xlsx", sheet_name="NodeShapes (classes)", header=None
+        )
+        assert nodeshapes_df.iat[6, 1] == "2023-11-14 22:13:20"
+
+    def test_shaclplay_invalid_build_date(self, runner, test_excel, tmp_path):
+        """Test that a build date that is not a timestamp or ISO date is rejected."""
+        result = runner.invoke(
+            shaclplay,
+            ["--input-excel", str(test_excel), "--output-path", str(tmp_path), "--build-date", "yesterday"],
+        )
+        assert result.exit_code == 2
+        assert "is not a Unix timestamp or ISO 8601 date" in result.output
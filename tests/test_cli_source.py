@@ -0,0 +1,52 @@
+"""Tests for export-source and import-source CLI commands."""
+
+import pandas as pd
+
+from metadata_automation.cli import export_source, import_source
+
+
+class TestSourceCLI:
+    """Integration tests for export-source and import-source CLI commands."""
+
+    def test_export_and_import_source(self, runner, test_input_dir, tmp_path):
+        """Test that a workbook exported to CSV files is imported with the same sheets."""
+        source_dir = tmp_path / "source"
+        output_excel = tmp_path / "metadata.xlsx"
+
+        result = runner.invoke(
+            export_source,
+            ["--input-excel", str(test_input_dir / "test_metadata.xlsx"), "--output-path", str(source_dir)],
+        )
+        assert result.exit_code == 0
+        assert sorted(path.name for path in source_dir.iterdir()) == ["TestClass.csv", "classes.csv", "prefixes.csv"]
+        assert "Files: 3 written, 0 unchanged" in result.output
+
+        result = runner.invoke(import_source, ["--input-path", str(source_dir), "--output-excel", str(output_excel)])
+        assert result.exit_code == 0
+        assert pd.ExcelFile(output_excel).sheet_names == ["prefixes", "classes", "TestClass"]
+
+        # Unchanged sources give an unchanged workbook
+        result = runner.invoke(import_source, ["--input-path", str(source_dir), "--output-excel", str(output_excel)])
+        assert "Files: 0 written, 1 unchanged" in result.output
+
+    def test_export_source_rejects_other_format(self, runner, test_input_dir, tmp_path):
+        """Test that exporting next to sheet files of the other format fails."""
+        input_excel = str(test_input_dir / "test_metadata.xlsx")
+        source_dir = tmp_path / "source"
+        runner.invoke(export_source, ["--input-excel", input_excel, "--output-path", str(source_dir)])
+
+        result = runner.invoke(
+            export_source, ["--input-excel", input_excel, "--output-path", str(source_dir), "--format", "tsv"]
+        )
+
+        assert result.exit_code != 0
+        assert "has sheet files in another format" in result.output
+
+    def test_import_source_empty_directory(self, runner, tmp_path):
+        """Test error handling for a directory without sheet files."""
+        result = runner.invoke(
+            import_source, ["--input-path", str(tmp_path), "--output-excel", str(tmp_path / "metadata.xlsx")]
+        )
+
+        assert result.exit_code != 0
+        assert "No CSV or TSV sheet files found" in result.output
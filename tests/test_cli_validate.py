@@ -0,0 +1,190 @@
+"""Tests for validate CLI command."""
+
+import pytest
+from rdflib import SH, Graph
+
+from metadata_automation.cli import sparql_from_shacl, validate
+
+SHAPES = """
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix dcat: <https://www.w3.org/ns/dcat#> .
+@prefix dct: <http://purl.org/dc/terms/> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix hri: <http://data.health-ri.nl/core/p2#> .
+
+hri:DatasetShape a sh:NodeShape ;
+  sh:targetClass dcat:Dataset ;
+  sh:property hri:DatasetShape-title, hri:DatasetShape-distribution .
+
+hri:DatasetShape-title sh:path dct:title ; sh:minCount 1 ; sh:nodeKind sh:Literal .
+hri:DatasetShape-distribution sh:path dcat:distribution ; sh:node hri:DistributionShape .
+
+hri:DistributionShape a sh:NodeShape ;
+  sh:targetClass dcat:Distribution ;
+  sh:property [ sh:path dct:format ; sh:minCount 1 ] .
+"""
+
+
+def _data(datasets: int, valid: bool) -> str:
+    lines = [
+        "@prefix dcat: <https://www.w3.org/ns/dcat#> .",
+        "@prefix dct: <http://purl.org/dc/terms/> .",
+        "@prefix ex: <http://example.org/> .",
+    ]
+    for i in range(datasets):
+        lines.append(f'ex:ds{i} a dcat:Dataset ; dcat:distribution ex:dist{i} ; dct:title "Dataset {i}" .')
+        if valid or i % 2:
+            lines.append(f'ex:dist{i} a dcat:Distribution ; dct:format "CSV" .')
+        else:
+            lines.append(f"ex:dist{i} a dcat:Distribution .")
+    return "\n".join(lines)
+
+
+class TestValidateCLI:
+    """Integration tests for validate CLI command."""
+
+    @pytest.fixture
+    def shapes_path(self, tmp_path):
+        """Directory with a generated-like shapes file."""
+        shapes_dir = tmp_path / "shacl_shapes" / "hri"
+        shapes_dir.mkdir(parents=True)
+        (shapes_dir / "hri-dataset.ttl").write_text(SHAPES)
+        return shapes_dir.parent
+
+    def test_validate_conforming_data(self, runner, shapes_path, tmp_path):
+        """Test that conforming data passes validation."""
+        pytest.importorskip("pyshacl")
+        data_file = tmp_path / "catalog.ttl"
+        data_file.write_text(_data(10, valid=True))
+
+        result = runner.invoke(
+            validate, ["--data", str(data_file), "--shapes-path", str(shapes_path), "--partition-size", "3"]
+        )
+
+        assert result.exit_code == 0
+        assert "Validated 20 focus nodes in 8 partitions" in result.output
+        assert "Conforms: yes" in result.output
+
+    def test_validate_report_matches_unpartitioned_validation(self, runner, shapes_path, tmp_path):
+        """Test that the merged report has the same results as validating the whole graph at once."""
+        pyshacl = pytest.importorskip("pyshacl")
+
+        data_file = tmp_path / "catalog.ttl"
+        data_file.write_text(_data(10, valid=False))
+        report_file = tmp_path / "report.ttl"
+
+        result = runner.invoke(
+            validate,
+            [
+                "--data",
+                str(data_file),
+                "--shapes-path",
+                str(shapes_path),
+                "--output-path",
+                str(report_file),
+                "--partition-size",
+                "3",
+                "--jobs",
+                "2",
+            ],
+        )
+
+        assert result.exit_code == 1
+        assert "Conforms: no" in result.output
+        # 5 distributions without format, and the 5 datasets they belong to
+        assert "Validation results: 10" in result.output
+
+        def results(report):
+            return sorted(
+                (str(report.value(r, SH.focusNode)), str(report.value(r, SH.sourceConstraintComponent)))
+                for r in report.objects(None, SH.result)
+            )
+
+        _conforms, expected, _text = pyshacl.validate(
+            Graph().parse(data=_data(10, valid=False), format="turtle"),
+            shacl_graph=Graph().parse(data=SHAPES, format="turtle"),
+        )
+        report = Graph().parse(report_file)
+        assert len(set(report.subjects(None, SH.ValidationReport))) == 1
+        assert results(report) == results(expected)
+
+    def test_validate_subclass_instances(self, runner, tmp_path):
+        """Test that instances of subclasses of a target class are validated as in an unpartitioned run."""
+        pyshacl = pytest.importorskip("pyshacl")
+        shapes = """
+        @prefix sh: <http://www.w3.org/ns/shacl#> .
+        @prefix ex: <http://example.org/> .
+        ex:AShape a sh:NodeShape ; sh:targetClass ex:A ; sh:property [ sh:path ex:name ; sh:minCount 1 ] .
+        """
+        data = """
+        @prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+        @prefix ex: <http://example.org/> .
+        ex:B rdfs:subClassOf ex:A .
+        ex:a1 a ex:A .
+        ex:b1 a ex:B .
+        """
+        shapes_file, data_file = tmp_path / "shapes.ttl", tmp_path / "data.ttl"
+        shapes_file.write_text(shapes)
+        data_file.write_text(data)
+
+        result = runner.invoke(
+            validate,
+            ["--data", str(data_file), "--shapes-path", str(shapes_file), "--partition-size", "1", "--jobs", "1"],
+        )
+
+        _conforms, expected, _text = pyshacl.validate(
+            Graph().parse(data=data, format="turtle"), shacl_graph=Graph().parse(data=shapes, format="turtle")
+        )
+        assert len(set(expected.objects(None, SH.result))) == 2
+        assert result.exit_code == 1
+        assert "Validated 2 focus nodes in 2 partitions" in result.output
+        assert "Validation results: 2" in result.output
+
+    @pytest.mark.parametrize("store", ["rdflib", "oxigraph"])
+    def test_validate_sparql_engine(self, runner, shapes_path, tmp_path, store):
+        """Test that the compiled SPARQL queries report the same results as a SHACL processor."""
+        if store == "oxigraph":
+            pytest.importorskip("pyoxigraph")
+        data_file = tmp_path / "catalog.ttl"
+        data_file.write_text(_data(10, valid=False))
+        report_file = tmp_path / "report.ttl"
+
+        result = runner.invoke(
+            validate,
+            [
+                "--data",
+                str(data_file),
+                "--shapes-path",
+                str(shapes_path),
+                "--output-path",
+                str(report_file),
+                "--engine",
+                "sparql",
+                "--store",
+                store,
+            ],
+        )
+
+        assert result.exit_code == 1
+        assert "Compiled 4 SPARQL queries" in result.output
+        assert "Conforms: no" in result.output
+        # 5 distributions without format, and the 5 datasets they belong to
+        assert "Validation results: 10" in result.output
+        report = Graph().parse(report_file)
+        components = sorted(str(report.value(r, SH.sourceConstraintComponent)) for r in report.objects(None, SH.result))
+        assert components == [str(SH.MinCountConstraintComponent)] * 5 + [str(SH.NodeConstraintComponent)] * 5
+
+    def test_sparql_from_shacl(self, runner, shapes_path, tmp_path):
+        """Test that a query is written per constraint."""
+        output_path = tmp_path / "queries"
+
+        result = runner.invoke(sparql_from_shacl, ["--input-path", str(shapes_path), "--output-path", str(output_path)])
+
+        assert result.exit_code == 0
+        assert "Written 4 queries" in result.output
+        assert sorted(path.name for path in output_path.glob("*.rq")) == [
+            "DatasetShape-distribution-Node.rq",
+            "DatasetShape-title-MinCount.rq",
+            "DatasetShape-title-NodeKind.rq",
+            "format-MinCount.rq",
+        ]
@@ -1,5 +1,7 @@
 """Unit tests to test utility modules."""
 
+import keyword
+from datetime import datetime
 from pathlib import Path
 
 import pandas as pd
@@ -7,16 +9,41 @@ import pytest
 import yaml
 from freezegun import freeze_time
 from linkml.generators.pydanticgen.pydanticgen import SplitMode
+from linkml.generators.pydanticgen.template import Import, ObjectImport
 
-from metadata_automation.linkml.creator import LinkMLCreator
+from metadata_automation.dependencies import ClassGraph
+from metadata_automation.linkml.creator import SHARED_SCHEMAS, LinkMLCreator
+from metadata_automation.manifest import load_manifest, profiles_from_workbooks
+from metadata_automation.model import Cardinality, Class, Property, Range, load_profile
+from metadata_automation.output import OutputWriter, intermediate_directory
+from metadata_automation.prefixes import curie_prefixes, used_prefixes
+from metadata_automation.profiles import BaseProfile, content_fingerprint
+from metadata_automation.reproducible import canonical_turtle, parse_build_date
+from metadata_automation.sempyro.benchmark import ModuleBenchmark, benchmark_module, find_regressions, synthetic_payload
 from metadata_automation.sempyro.cleanup import remove_unwanted_classes
+from metadata_automation.sempyro.import_registry import ImportRegistry
+from metadata_automation.sempyro.import_resolver import ImportResolver, free_names
 from metadata_automation.sempyro.sempyro_generator import CustomPydanticGenerator
+from metadata_automation.sempyro.template_env import get_template_environment
 from metadata_automation.sempyro.utils import (
     add_rdf_model_to_yaml,
     add_validation_logic_to_schema,
     load_yaml,
+    parse_import_entries,
     parse_import_statements,
 )
+from metadata_automation.shacl.shaclplay_reader import ColumnSpec, nodeshape_uri, read_shaclplay
+from metadata_automation.shacl.sparql import compile_shapes, run_queries
+from metadata_automation.shacl.split import split_shapes
+from metadata_automation.shacl.validation import partition_graph, shape_nesting_depth, target_partitions
+from metadata_automation.shacl.xls2rdf import (
+    DEFAULT_JVM_OPTIONS,
+    cds_archive,
+    cds_options,
+    java_version,
+    parse_jvm_options,
+    xls2rdf_command,
+)
 from metadata_automation.shaclplay.converter import SHACLPlayConverter
 from metadata_automation.shaclplay.utils import (
     get_current_datetime_iso,
@@ -24,10 +51,8 @@ from metadata_automation.shaclplay.utils import (
     slugify_property_label,
     write_shaclplay_excel,
 )
-from metadata_automation.shaclplay.vocab_mappings import (
-    get_vocab_mapping,
-    has_vocab_mapping,
-)
+from metadata_automation.vocabularies import VocabularyStore
+from metadata_automation.workbook import WorkbookSnapshot, export_source, import_source, load_workbook, resolve_reader
 
 
 def test_load_yaml_errors(tmp_path: Path):
@@ -55,6 +80,98 @@ def test_parse_import_statements():
     assert imports.imports[2].objects[0].alias == "L"
 
 
+def test_parse_import_entries():
+    imports = parse_import_entries(
+        [
+            {"module": "logging"},
+            {"module": "numpy", "alias": "np"},
+            {"module": "typing", "objects": ["List", {"name": "Optional", "alias": "Opt"}]},
+            {"module": "typing", "objects": ["List", "Union"]},
+            "from sempyro.time import PeriodOfTime",
+        ]
+    )
+
+    assert [i.module for i in imports] == ["logging", "numpy", "typing", "sempyro.time"]
+    assert imports["numpy"].alias == "np"
+    assert sorted(o.name for o in imports["typing"].objects) == ["List", "Optional", "Union"]
+
+    with pytest.raises(ValueError):
+        parse_import_entries([{"objects": ["List"]}])
+
+
+def test_import_registry_deduplicates_blocks():
+    registry = ImportRegistry(
+        {
+            "hri-A": "import logging\nfrom sempyro.time import PeriodOfTime\nfrom sempyro.time import PeriodOfTime",
+            "hri-B": "from sempyro.time import PeriodOfTime\nimport logging",
+            "hri-C": [{"module": "logging"}, {"module": "sempyro.time", "objects": ["PeriodOfTime"]}],
+            "hri-D": "import os",
+        }
+    )
+
+    assert len(registry) == 4
+    assert registry.unique_blocks == 2
+    assert "hri-A" in registry
+    assert "hri-E" not in registry
+
+    imports = registry.get("hri-A")
+    assert [o.name for o in imports["sempyro.time"].objects] == ["PeriodOfTime"]
+    # Returned imports are copies, so callers cannot alter the shared block
+    imports.imports.clear()
+    assert len(registry.get("hri-B")) == 2
+
+    symbols = registry.symbols()
+    assert symbols["PeriodOfTime"] == Import(module="sempyro.time", objects=[ObjectImport(name="PeriodOfTime")])
+    assert "logging" not in symbols
+
+
+def test_free_names():
+    code = (
+        "import logging\n"
+        "logger = logging.getLogger(__name__)\n"
+        "class A(Base):\n"
+        "    x: Optional[list[LiteralField]] = Field(default=None)\n"
+        "    def check(cls, value):\n"
+        "        return convert(value)\n"
+    )
+    assert free_names(code) == {"Base", "Optional", "LiteralField", "Field", "convert"}
+
+
+def test_import_resolver_uses_static_index(tmp_path: Path, monkeypatch):
+    package = tmp_path / "src" / "fakesempyro"
+    (package / "dcat").mkdir(parents=True)
+    (package / "__init__.py").write_text("from .model import LiteralField\n", encoding="utf-8")
+    (package / "model.py").write_text("class LiteralField:\n    pass\n\nclass _Hidden:\n    pass\n")
+    (package / "dcat" / "__init__.py").write_text("from .dataset import DCATDataset\n", encoding="utf-8")
+    (package / "dcat" / "dataset.py").write_text("raise RuntimeError('never imported')\nclass DCATDataset:\n    pass\n")
+    monkeypatch.syspath_prepend(str(tmp_path / "src"))
+
+    cache_dir = tmp_path / "cache"
+    resolver = ImportResolver(packages=("typing", "fakesempyro"), cache_dir=cache_dir)
+    code = "import logging\nclass A(DCATDataset):\n    x: Optional[LiteralField] = None\n    y: Unknown = None\n"
+    imports, unresolved = resolver.resolve(code)
+
+    assert resolver.index["DCATDataset"] == "fakesempyro.dcat"
+    assert resolver.index["LiteralField"] == "fakesempyro"
+    assert "_Hidden" not in resolver.index
+    assert {i.module for i in imports} == {"typing", "fakesempyro", "fakesempyro.dcat"}
+    assert unresolved == {"Unknown"}
+    assert len(list(cache_dir.glob("symbol-index-*.json"))) == 1
+
+    # A second resolver reads the index from the disk cache
+    cached = ImportResolver(packages=("typing", "fakesempyro"), cache_dir=cache_dir)
+    assert cached.index == resolver.index
+
+    # Base classes are named after namespace and class, and imported as aliases
+    code = "class A(FAKEDataset, DCATDataSet, HRI):\n    pass\n"
+    symbols = {"HRI": Import(module="hri_namespace", objects=[ObjectImport(name="HRI")])}
+    imports, unresolved = resolver.resolve(code, symbols)
+    modules = {i.module: i.objects for i in imports}
+    assert modules["fakesempyro.dcat"] == [ObjectImport(name="DCATDataset", alias="DCATDataSet")]
+    assert modules["hri_namespace"] == [ObjectImport(name="HRI")]
+    assert unresolved == {"FAKEDataset"}
+
+
 def test_add_validation_logic_to_schema(tmp_path: Path):
     schema_path = tmp_path / "schema.yaml"
     schema_data = {"classes": {"HRIDataset": {"annotations": {"existing": "value"}}}}
@@ -67,6 +184,24 @@ def test_add_validation_logic_to_schema(tmp_path: Path):
     assert "validator_logic" in annotations
 
 
+def test_sempyro_inputs_independent_of_working_directory(tmp_path: Path, monkeypatch):
+    """Test that the shared SeMPyRO inputs are found from any working directory."""
+    monkeypatch.chdir(tmp_path)
+    schema_path = tmp_path / "schema.yaml"
+    schema_path.write_text(yaml.safe_dump({"classes": {"HRIDataset": {}}}), encoding="utf-8")
+
+    creator = LinkMLCreator(tmp_path / "linkml")
+    add_validation_logic_to_schema({"schema_path": schema_path})
+
+    assert "HRIDataset" in creator.validation_logic
+    assert "DistributionStatus" in creator.vocabulary_ranges
+    assert all(source.exists() for _name, source in SHARED_SCHEMAS.values())
+    assert (
+        "validator_logic"
+        in yaml.safe_load(schema_path.read_text(encoding="utf-8"))["classes"]["HRIDataset"]["annotations"]
+    )
+
+
 def test_add_rdf_model_to_yaml(tmp_path: Path):
     schema_path = tmp_path / "schema.yaml"
     schema_data = {
@@ -122,7 +257,6 @@ def test_linkml_creator_build_and_write(tmp_path: Path):
         ]
     )
 
-    creator.filtered_sheets = {"TestSheet": class_sheet}
     row = pd.Series(
         {
             "sheet_name": "TestSheet",
@@ -136,8 +270,9 @@ def test_linkml_creator_build_and_write(tmp_path: Path):
         }
     )
 
-    creator.build_base_class(row)
-    creator.build_sempyro_class(row)
+    model_class = Class.from_row(row, Property.from_sheet(class_sheet))
+    creator.build_base_class(model_class)
+    creator.build_sempyro_class(model_class)
 
     linkml_id = "http://example.com/TestClass"
     class_data = creator.linkml_data[linkml_id]["data"]["classes"]["HRITestclass"]
@@ -193,12 +328,86 @@ def test_write_shaclplay_excel(tmp_path: Path):
     assert "PropertyShapes (properties)" in sheets
 
 
-def test_vocab_mappings():
+def test_write_shaclplay_excel_uncompressed(tmp_path: Path):
+    """Test that intermediate SHACLPlay files are written with stored ZIP entries, in a removed directory."""
+    import zipfile
+
+    prefixes_df = pd.DataFrame([[None, None, None], ["PREFIX", "hri", "http://example.com/"]])
+    nodeshapes_df = pd.DataFrame([[None, None], ["hri:TestShape", "Test"]])
+    propertyshapes_df = pd.DataFrame([[None, None], ["hri:TestShape#title", "title"]])
+
+    with intermediate_directory("shaclplay-") as directory:
+        output_path = Path(directory) / "shaclplay.xlsx"
+        for build_date in (None, datetime(2026, 2, 11)):
+            write_shaclplay_excel(
+                prefixes_df, nodeshapes_df, propertyshapes_df, output_path, build_date=build_date, compress=False
+            )
+            with zipfile.ZipFile(output_path) as archive:
+                assert {entry.compress_type for entry in archive.infolist()} == {zipfile.ZIP_STORED}
+            assert pd.read_excel(output_path, sheet_name="NodeShapes (classes)", header=None).iloc[1, 0] == (
+                "hri:TestShape"
+            )
+    assert not Path(directory).exists()
+
+
+def test_parse_build_date():
+    assert parse_build_date("1700000000") == datetime(2023, 11, 14, 22, 13, 20)
+    assert parse_build_date("2026-02-11") == datetime(2026, 2, 11)
+    assert parse_build_date("2026-02-11T13:34:56+01:00") == datetime(2026, 2, 11, 12, 34, 56)
+    with pytest.raises(ValueError):
+        parse_build_date("yesterday")
+
+
+def test_canonical_turtle():
+    """Test that graphs with the same triples are serialized identically."""
+    first = """
+    @prefix sh: <http://www.w3.org/ns/shacl#> .
+    @prefix ex: <http://example.org/> .
+    ex:Shape sh:property _:b1, _:b2 .
+    _:b1 sh:path ex:title ; sh:minCount 1 .
+    _:b2 sh:path ex:format ; sh:in (ex:csv ex:json) .
+    """
+    second = """
+    @prefix ex: <http://example.org/> .
+    @prefix sh: <http://www.w3.org/ns/shacl#> .
+    ex:Shape sh:property [ sh:in (ex:csv ex:json) ; sh:path ex:format ] .
+    ex:Shape sh:property [ sh:minCount 1 ; sh:path ex:title ] .
+    """
+
+    assert canonical_turtle(first) == canonical_turtle(second)
+    assert "@prefix sh: <http://www.w3.org/ns/shacl#> ." in canonical_turtle(first)
+
+
+def test_vocabulary_store(tmp_path: Path, monkeypatch):
+    store = VocabularyStore()
     url = "http://publications.europa.eu/resource/authority/access-right"
-    mapping = get_vocab_mapping(url)
-    assert mapping["editor"] == "dash:EnumSelectEditor"
-    assert has_vocab_mapping(url) is True
-    assert has_vocab_mapping("https://example.com/unknown") is False
+    assert url in store
+    assert "https://publications.europa.eu/resource/authority/access-right/" in store
+    assert "Access right" in store
+    assert "https://example.com/unknown" not in store
+    vocabulary = store.get(url)
+    assert vocabulary.curies({"eu": url + "/"}) == ["eu:NON_PUBLIC", "eu:PUBLIC", "eu:RESTRICTED"]
+    assert vocabulary.curies({})[0] == f"<{url}/NON_PUBLIC>"
+
+    (tmp_path / "themes.csv").write_text(
+        "uri,label\nhttp://example.org/theme/HEAL,Health\nhttp://example.org/theme/AGRI,Agriculture\n"
+    )
+    cache_dir = tmp_path / "cache"
+    store = VocabularyStore([tmp_path / "themes.csv"], cache_dir=cache_dir)
+    assert store.schemes == ["http://example.org/theme"]
+    assert store.get("http://example.org/theme").concepts == (
+        "http://example.org/theme/AGRI",
+        "http://example.org/theme/HEAL",
+    )
+
+    # Unchanged dumps are served from the cached index, without reading them again
+    def fail(path):
+        raise AssertionError(f"{path} read again")
+
+    monkeypatch.setattr("metadata_automation.vocabularies.read_vocabulary_file", fail)
+    cached = VocabularyStore([tmp_path / "themes.csv"], cache_dir=cache_dir)
+    assert cached.get("http://example.org/theme") == store.get("http://example.org/theme")
+    assert cached.fingerprint() == store.fingerprint()
 
 
 def test_shaclplay_converter_branches(template_file: Path, test_input_dir: Path):
@@ -231,15 +440,15 @@ def test_shaclplay_converter_branches(template_file: Path, test_input_dir: Path)
     }
 
     row_iri = pd.Series({**base_row, "Range": "dcat:Dataset (IRI)"})
-    iri_out = converter._convert_property_to_shaclplay(row_iri, "TestClass", "hri:TestClass", "hri")
+    iri_out = converter._convert_property_to_shaclplay(Property.from_row(row_iri), "TestClass", "hri")
     assert iri_out[8] == "sh:IRI"
 
     row_literal = pd.Series({**base_row, "Range": "rdfs:Literal"})
-    literal_out = converter._convert_property_to_shaclplay(row_literal, "TestClass", "hri:TestClass", "hri")
+    literal_out = converter._convert_property_to_shaclplay(Property.from_row(row_literal), "TestClass", "hri")
     assert literal_out[8] == "sh:Literal"
 
     row_node = pd.Series({**base_row, "Range": "hri:Kind"})
-    node_out = converter._convert_property_to_shaclplay(row_node, "TestClass", "hri:TestClass", "hri")
+    node_out = converter._convert_property_to_shaclplay(Property.from_row(row_node), "TestClass", "hri")
     assert "KindShape" in str(node_out[10])
 
     row_xsd = pd.Series(
@@ -249,7 +458,7 @@ def test_shaclplay_converter_branches(template_file: Path, test_input_dir: Path)
             "SHACL_sh:node": "nan",
         }
     )
-    xsd_out = converter._convert_property_to_shaclplay(row_xsd, "TestClass", "hri:TestClass", "hri")
+    xsd_out = converter._convert_property_to_shaclplay(Property.from_row(row_xsd), "TestClass", "hri")
     assert xsd_out[8] == "sh:Literal"
     assert xsd_out[9] == "xsd:dateTime"
     assert xsd_out[15] == "[A-Za-z]+"
@@ -289,3 +498,750 @@ def test_custom_pydantic_generator_branches(tmp_path: Path):
 
     module = generator.render()
     assert module is not None
+
+
+def test_build_combined_schema(tmp_path, test_input_dir):
+    """Test merging the per-class schemas of a namespace into one schema."""
+    creator = LinkMLCreator(tmp_path)
+    creator.load_excel(str(test_input_dir / "multi_metadata.xlsx"), ["Info", "User Guide"])
+    creator.build_sempyro()
+
+    assert creator.class_modules("hri") == {"hri-ClassA": "HRIClassa", "hri-ClassB": "HRIClassb"}
+
+    schema = creator.build_combined_schema("hri")
+    assert list(schema["classes"])[:2] == ["HRIClassa", "HRIClassb"]
+    for class_id in ["HRIClassa", "HRIClassb"]:
+        assert "slots" not in schema["classes"][class_id]
+        assert schema["classes"][class_id]["attributes"]
+    assert "slots" not in schema
+
+
+def test_template_environment_is_shared(tmp_path, monkeypatch):
+    """Test that generators share one template environment loaded from the package."""
+    monkeypatch.chdir(tmp_path)
+
+    env = get_template_environment()
+    assert get_template_environment() is env
+    assert get_template_environment(persist_cache=False) is not env
+
+    # SeMPyRO templates override the linkml defaults, regardless of the working directory
+    _, filename, _ = env.loader.get_source(env, "class.py.jinja")
+    assert Path(filename).parent.name == "templates"
+    assert "metadata_automation" in Path(filename).parts
+    assert env.get_template("class.py.jinja") is env.get_template("class.py.jinja")
+
+
+def test_synthetic_payload_validates():
+    """Test that synthetic payloads are valid instances of the model."""
+    from typing import Optional, Union
+
+    from pydantic import AnyHttpUrl, BaseModel
+
+    class Nested(BaseModel):
+        value: str
+        note: Optional[str] = None
+
+    class Model(BaseModel):
+        url: AnyHttpUrl
+        size: Union[Nested, int]
+        items: list[Nested]
+        optional: Optional[float] = None
+
+    payload = synthetic_payload(Model, index=3)
+    assert payload["size"] == 3
+    assert payload["items"] == [{"value": "value-3"}]
+    assert Model.model_validate(payload).optional == 3.5
+    assert set(synthetic_payload(Model, required_only=True)) == {"url", "size", "items"}
+
+
+def test_find_regressions():
+    """Test comparing benchmark results against a baseline."""
+    baseline = {"hri-Dataset": {"import_seconds": 0.01, "build_seconds": 0.01, "validations_per_second": 1000}}
+
+    ok = ModuleBenchmark("hri-Dataset", import_seconds=0.011, build_seconds=0.009, validations_per_second=900)
+    assert find_regressions([ok], baseline, tolerance=0.25) == []
+
+    slow = ModuleBenchmark("hri-Dataset", import_seconds=0.02, build_seconds=0.01, validations_per_second=500)
+    regressions = find_regressions([slow], baseline, tolerance=0.25)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("hri-Dataset: import_seconds")
+
+    new_module = ModuleBenchmark("hri-Kind", import_seconds=1.0)
+    assert find_regressions([new_module], baseline) == []
+
+
+def test_benchmark_module_repeats_import(tmp_path):
+    """Test that the import of a module is timed once per repetition, like the other metrics."""
+    counter = tmp_path / "imports.txt"
+    module_path = tmp_path / "hri-Counted.py"
+    module_path.write_text(
+        "from pathlib import Path\n"
+        "from pydantic import BaseModel\n"
+        f"Path({str(counter)!r}).open('a').write('x')\n"
+        "class HRICounted(BaseModel):\n"
+        "    title: str\n"
+    )
+
+    result = benchmark_module(module_path, instances=10, repeat=3)
+
+    assert counter.read_text() == "xxx"
+    assert result.models == ["HRICounted"]
+    assert result.import_seconds is not None and result.validations_per_second is not None
+
+
+def test_load_excel_profile_has_only_referenced_sheets(tmp_path):
+    """Test that only sheets referenced in 'classes' become classes of the profile."""
+    excel_path = tmp_path / "metadata.xlsx"
+    class_sheet = pd.DataFrame(
+        {
+            "Property label": ["title", None],
+            "Property URI": ["dct:title", None],
+            "Definition": ["The title", "Row without a label"],
+            "Cardinality": ["1", None],
+            "SeMPyRO_range": ["str", None],
+            "SeMPyRO_rdf_term": ["DCTERMS.title", None],
+            "SeMPyRO_rdf_type": ["rdfs_literal", None],
+            "Usage note": ["Not used", None],
+        }
+    )
+    with pd.ExcelWriter(excel_path) as writer:
+        pd.DataFrame({"prefix": [" hri "], "namespace": ["http://example.com/hri/"]}).to_excel(
+            writer, sheet_name="prefixes", index=False
+        )
+        pd.DataFrame({"sheet_name": ["Dataset"], "class_URI": ["hri:Dataset"], "description": [None]}).to_excel(
+            writer, sheet_name="classes", index=False
+        )
+        class_sheet.to_excel(writer, sheet_name="Dataset", index=False)
+        class_sheet.to_excel(writer, sheet_name="Dataset - old", index=False)
+
+    creator = LinkMLCreator(tmp_path)
+    creator.load_excel(str(excel_path), ["Info", "User Guide"])
+
+    assert creator.prefixes == {"hri": "http://example.com/hri/"}
+    assert [model_class.sheet_name for model_class in creator.profile.classes] == ["Dataset"]
+    model_class = creator.profile.classes[0]
+    assert model_class.description is None
+    assert [model_property.label for model_property in model_class.properties] == ["title"]
+    assert model_class.properties[0].usage_note == "Not used"
+
+
+def test_load_manifest(tmp_path):
+    """Test loading build profiles from a manifest."""
+    manifest = tmp_path / "manifest.yaml"
+    manifest.write_text(
+        yaml.dump(
+            {
+                "defaults": {"sempyro_output_path": "out/sempyro_classes"},
+                "profiles": [
+                    {"input_excel": "hri.xlsx", "namespace": "hri", "shaclplay_output_path": "out/shaclplay/hri"},
+                    {"input_excel": "eucaim.xlsx", "sempyro_output_path": None},
+                ],
+            }
+        )
+    )
+
+    hri, eucaim = load_manifest(manifest)
+
+    assert hri.input_excel == tmp_path / "hri.xlsx"
+    assert hri.sempyro_output_path == tmp_path / "out" / "sempyro_classes"
+    assert hri.steps == ["shaclplay", "sempyro"]
+    assert eucaim.name == "eucaim"
+    assert eucaim.steps == []
+
+
+def test_profiles_from_workbooks():
+    """Test that each workbook gets its own SHACLPlay output directory."""
+    profiles = profiles_from_workbooks(["inputs/a.xlsx", "inputs/b.xlsx"], "out")
+
+    assert [p.shaclplay_output_path for p in profiles] == [Path("out/shaclplay/a"), Path("out/shaclplay/b")]
+    assert {p.sempyro_output_path for p in profiles} == {Path("out/sempyro_classes")}
+    assert profiles[0].steps == ["shaclplay", "shacl-from-shaclplay", "sempyro"]
+
+
+def test_base_profile_reuses_shared_artifacts(tmp_path):
+    """Test that only artifacts of classes shared with the base profile are cached and reused."""
+    shared, own = content_fingerprint("shared"), content_fingerprint("own")
+    base = BaseProfile(tmp_path / "base.xlsx", "test", [shared])
+
+    generated = tmp_path / "first" / "hri-Dataset.py"
+    generated.parent.mkdir()
+    generated.write_text("class HRIDataset: ...\n")
+
+    output = tmp_path / "second" / "hri-Dataset.py"
+    assert not base.reuse(shared, output)
+
+    base.store(shared, generated)
+    base.store(own, generated)
+    assert base.reuse(shared, output)
+    assert output.read_text() == generated.read_text()
+    assert not base.reuse(own, tmp_path / "third" / "hri-Dataset.py")
+    assert content_fingerprint("shared") == shared
+
+
+def test_used_prefixes_only_keeps_referenced_prefixes():
+    prefixes = {"dcat": "https://www.w3.org/ns/dcat#", "eu": "http://eu/", "xsd": "http://xsd#", "http": "x"}
+
+    assert curie_prefixes({"range": ["dcat:Dataset", "( eu:PUBLIC eu:RESTRICTED )"]}) == {"dcat", "eu"}
+    assert curie_prefixes("dcterms:modified^^xsd:dateTime") == {"dcterms", "xsd"}
+    # Full URIs do not reference a prefix
+    assert curie_prefixes("http://example.com/a:b") == set()
+    assert used_prefixes(["eu:PUBLIC", "dcat:Dataset", "http://example.com/"], prefixes) == {
+        "dcat": "https://www.w3.org/ns/dcat#",
+        "eu": "http://eu/",
+    }
+
+
+def test_linkml_creator_used_prefixes_only(tmp_path: Path):
+    creator = LinkMLCreator(tmp_path, used_prefixes_only=True)
+    creator.prefixes = {
+        "linkml": "https://w3id.org/linkml/",
+        "hri": "http://example.com/",
+        "dct": "http://purl.org/dc/terms/",
+        "foaf": "http://xmlns.com/foaf/0.1/",
+    }
+    class_sheet = pd.DataFrame(
+        [
+            {
+                "Property label": "title",
+                "Definition": "Title",
+                "Property URI": "dct:title",
+                "SeMPyRO_rdf_term": "DCTERMS.title",
+                "SeMPyRO_rdf_type": "rdfs_literal",
+                "Cardinality": "1",
+                "SeMPyRO_range": "str",
+            }
+        ]
+    )
+    row = pd.Series(
+        {
+            "sheet_name": "TestSheet",
+            "class_URI": "hri:TestClass",
+            "SeMPyRO_inherits_from": "nan",
+            "description": "Test class",
+            "SeMPyRO_import_classes": "nan",
+            "SeMPyRO_add_rdf_model": "no",
+            "SeMPyRO_annotations_ontology": "http://example.com/ontology",
+            "SeMPyRO_annotations_IRI": "http://example.com/TestClass",
+        }
+    )
+    model_class = Class.from_row(row, Property.from_sheet(class_sheet))
+    creator.build_base_class(model_class)
+    creator.build_sempyro_class(model_class)
+    creator.write_to_file()
+
+    schema = yaml.safe_load((tmp_path / "hri" / "hri-TestClass.yaml").read_text())
+    assert list(schema["prefixes"]) == ["linkml", "hri", "dct"]
+    assert list(creator.build_combined_schema("hri")["prefixes"]) == ["linkml", "hri", "dct"]
+    # The built schema itself keeps all prefixes
+    assert "foaf" in creator.linkml_data["http://example.com/TestClass"]["data"]["prefixes"]
+
+
+def test_partition_graph_includes_nested_values():
+    from rdflib import RDF, Graph, URIRef
+
+    shapes = Graph().parse(
+        data="""
+        @prefix sh: <http://www.w3.org/ns/shacl#> .
+        @prefix ex: <http://example.org/> .
+        ex:AShape sh:targetClass ex:A ; sh:property [ sh:path ex:b ; sh:node ex:BShape ] .
+        ex:BShape sh:targetClass ex:B ; sh:property [ sh:path ex:c ; sh:minCount 1 ] .
+        """,
+        format="turtle",
+    )
+    data = Graph().parse(
+        data="""
+        @prefix ex: <http://example.org/> .
+        ex:a1 a ex:A ; ex:b ex:b1 ; ex:label [ ex:text "a1" ] .
+        ex:a2 a ex:A ; ex:b ex:b2 .
+        ex:b1 a ex:B ; ex:c ex:c1 .
+        ex:b2 a ex:B .
+        ex:c1 ex:d ex:unrelated .
+        """,
+        format="turtle",
+    )
+    ex = "http://example.org/"
+
+    assert shape_nesting_depth(shapes) == 1
+    partitions = target_partitions(data, shapes, partition_size=1)
+    assert partitions == [[URIRef(ex + "a1")], [URIRef(ex + "a2")], [URIRef(ex + "b1")], [URIRef(ex + "b2")]]
+
+    subgraph = partition_graph(data, partitions[0], depth=1, context_types=False)
+    subjects = {str(s) for s in subgraph.subjects() if isinstance(s, URIRef)}
+    assert subjects == {ex + "a1", ex + "b1"}
+    assert len(list(subgraph.objects(None, URIRef(ex + "text")))) == 1
+    # The nested value is not a target in this partition
+    assert (URIRef(ex + "b1"), RDF.type, URIRef(ex + "B")) not in subgraph
+    assert (URIRef(ex + "b1"), RDF.type, URIRef(ex + "B")) in partition_graph(data, partitions[0], depth=1)
+
+
+def test_compile_shapes_to_sparql():
+    from rdflib import SH, Graph, Literal, URIRef
+
+    shapes = Graph().parse(
+        data="""
+        @prefix sh: <http://www.w3.org/ns/shacl#> .
+        @prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+        @prefix ex: <http://example.org/> .
+        ex:AShape sh:targetClass ex:A ; sh:property ex:AShape-b, ex:AShape-code .
+        ex:AShape-b sh:path ex:b ; sh:maxCount 1 ; sh:nodeKind sh:IRI ; sh:node ex:BShape .
+        ex:AShape-code sh:path ex:code ; sh:datatype xsd:string ; sh:pattern "^[a-z]+$" ; sh:in ( "abc" "def" ) .
+        ex:BShape sh:property ex:BShape-c .
+        ex:BShape-c sh:path ex:c ; sh:minCount 1 .
+        """,
+        format="turtle",
+    )
+    data = Graph().parse(
+        data="""
+        @prefix ex: <http://example.org/> .
+        ex:Sub <http://www.w3.org/2000/01/rdf-schema#subClassOf> ex:A .
+        ex:a1 a ex:A ; ex:b ex:b1 ; ex:code "abc" .
+        ex:a2 a ex:Sub ; ex:b ex:b1, ex:b2 ; ex:code "ABC" .
+        ex:a3 a ex:A ; ex:b "b3" ; ex:code 1 .
+        ex:b1 ex:c ex:c1 .
+        """,
+        format="turtle",
+    )
+    ex = "http://example.org/"
+
+    queries = compile_shapes(shapes)
+    assert [query.name for query in queries] == [
+        "AShape-b-MaxCount",
+        "AShape-b-NodeKind",
+        "AShape-b-Node",
+        "AShape-code-Datatype",
+        "AShape-code-In",
+        "AShape-code-Pattern",
+    ]
+
+    violations = {
+        (str(v.focus_node).removeprefix(ex), str(v.component).removeprefix(str(SH)), v.value)
+        for v in run_queries(queries, data)
+    }
+    assert violations == {
+        ("a2", "MaxCountConstraintComponent", None),
+        ("a2", "NodeConstraintComponent", URIRef(ex + "b2")),
+        ("a2", "InConstraintComponent", Literal("ABC")),
+        ("a2", "PatternConstraintComponent", Literal("ABC")),
+        ("a3", "NodeKindConstraintComponent", Literal("b3")),
+        ("a3", "NodeConstraintComponent", Literal("b3")),
+        ("a3", "DatatypeConstraintComponent", Literal(1)),
+        ("a3", "InConstraintComponent", Literal(1)),
+        ("a3", "PatternConstraintComponent", Literal(1)),
+    }
+
+
+def test_linkml_creator_vocabulary_enums(tmp_path: Path):
+    (tmp_path / "status.csv").write_text(
+        "concept\nhttp://example.com/status/COMPLETED\nhttp://example.com/status/DEPRECATED\n"
+    )
+    creator = LinkMLCreator(tmp_path, vocabularies=VocabularyStore([tmp_path / "status.csv"], tmp_path / "cache"))
+    creator.prefixes = {"hri": "http://example.com/"}
+    slot = {
+        "Definition": "Status",
+        "Property URI": "adms:status",
+        "SeMPyRO_rdf_term": "ADMS.status",
+        "SeMPyRO_rdf_type": "uri",
+        "Cardinality": "0..1",
+        "Controlled vocabluary (if applicable)": "https://example.com/status/",
+    }
+    class_sheet = pd.DataFrame(
+        [
+            {**slot, "Property label": "status", "SeMPyRO_range": "AnyHttpUrl, Location"},
+            # A hand-written vocabulary type is replaced, other ranges are kept
+            {**slot, "Property label": "state", "SeMPyRO_range": "DistributionStatus"},
+            {
+                **slot,
+                "Property label": "other",
+                "SeMPyRO_range": "AnyHttpUrl",
+                "Controlled vocabluary (if applicable)": "nan",
+            },
+        ]
+    )
+    row = pd.Series(
+        {
+            "sheet_name": "TestSheet",
+            "class_URI": "hri:TestClass",
+            "SeMPyRO_inherits_from": "nan",
+            "description": "Test class",
+            "SeMPyRO_import_classes": "nan",
+            "SeMPyRO_add_rdf_model": "no",
+            "SeMPyRO_annotations_ontology": "http://example.com/ontology",
+            "SeMPyRO_annotations_IRI": "http://example.com/TestClass",
+        }
+    )
+    model_class = Class.from_row(row, Property.from_sheet(class_sheet))
+    creator.build_base_class(model_class)
+    creator.build_sempyro_class(model_class)
+
+    data = creator.linkml_data["http://example.com/TestClass"]["data"]
+    assert data["slots"]["adms_status"]["any_of"] == [{"range": "StatusEnum"}, {"range": "Location"}]
+    assert "DistributionStatus" in creator.vocabulary_ranges
+    assert data["slots"]["adms_state"]["range"] == "StatusEnum"
+    assert data["slots"]["adms_other"]["range"] == "AnyHttpUrl"
+    assert data["enums"]["StatusEnum"]["enum_uri"] == "http://example.com/status"
+    assert data["enums"]["StatusEnum"]["permissible_values"]["http://example.com/status/COMPLETED"] == {
+        "title": "COMPLETED",
+        "meaning": "http://example.com/status/COMPLETED",
+    }
+    assert creator.build_combined_schema("hri")["enums"] == data["enums"]
+
+
+def test_linkml_creator_vocabulary_enum_value_names():
+    concepts = [
+        "http://example.com/theme/1st-level",
+        "http://example.com/theme/a-b",
+        "http://example.com/theme/class",
+        "http://example.com/theme/HEAL",
+        "http://example.com/theme/sub/HEAL",
+        "http://example.com/theme/AGRI",
+    ]
+    names = LinkMLCreator._enum_value_names(concepts)
+
+    assert names == {
+        "http://example.com/theme/1st-level": "number_1st_level",
+        "http://example.com/theme/a-b": "a_b",
+        "http://example.com/theme/class": "class_",
+        "http://example.com/theme/HEAL": "HEAL",
+        "http://example.com/theme/sub/HEAL": "HEAL_2",
+        "http://example.com/theme/AGRI": "AGRI",
+    }
+    assert all(name.isidentifier() and not keyword.iskeyword(name) for name in names.values())
+
+
+def test_output_writer_writes_only_changed_files(tmp_path: Path):
+    """Test that files are only replaced when their content changed."""
+    writer = OutputWriter()
+    path = tmp_path / "nested" / "file.txt"
+
+    assert writer.write_text(path, "content")
+    modified = path.stat().st_mtime_ns
+    assert not writer.write_text(path, "content")
+    assert path.stat().st_mtime_ns == modified
+    assert writer.write_text(path, "changed")
+    assert path.read_text() == "changed"
+
+    staged = tmp_path / "staged.txt"
+    staged.write_text("changed")
+    assert not writer.commit(staged, path)
+    assert not staged.exists()
+
+    assert writer.summary() == "2 written, 2 unchanged"
+    # No temporary files are left behind
+    assert [p.name for p in path.parent.iterdir()] == ["file.txt"]
+
+
+def test_workbook_snapshot_matches_read_excel(tmp_path: Path, test_input_dir: Path, monkeypatch):
+    """Test that sheets read from a cached snapshot equal those read by pd.read_excel."""
+    workbook_path = tmp_path / "metadata.xlsx"
+    workbook_path.write_bytes((test_input_dir / "test_metadata.xlsx").read_bytes())
+    cache_dir = tmp_path / "cache"
+
+    snapshot = WorkbookSnapshot.load(workbook_path, cache_dir)
+    assert len(list(cache_dir.glob("*.pickle"))) == 1
+    assert snapshot.sheet_names == pd.ExcelFile(workbook_path).sheet_names
+
+    # The second load does not parse the workbook
+    def parse_workbook(path):
+        raise AssertionError("The workbook is parsed again")
+
+    monkeypatch.setattr(WorkbookSnapshot, "from_excel", classmethod(lambda cls, path: parse_workbook(path)))
+    snapshot = WorkbookSnapshot.load(workbook_path, cache_dir)
+    for sheet_name in ["prefixes", "classes", "TestClass"]:
+        for options in [{}, {"header": None}, {"dtype": str, "usecols": lambda column: column != "description"}]:
+            pd.testing.assert_frame_equal(
+                snapshot.parse(sheet_name, **options), pd.read_excel(workbook_path, sheet_name=sheet_name, **options)
+            )
+    with pytest.raises(ValueError, match="Worksheet named 'missing' not found"):
+        snapshot.parse("missing")
+
+    # A changed workbook gets a new snapshot
+    monkeypatch.undo()
+    with pd.ExcelWriter(workbook_path) as writer:
+        pd.DataFrame({"prefix": ["ex"], "namespace": ["http://example.org/"]}).to_excel(
+            writer, sheet_name="prefixes", index=False
+        )
+    assert WorkbookSnapshot.load(workbook_path, cache_dir).sheet_names == ["prefixes"]
+    assert len(list(cache_dir.glob("*.pickle"))) == 2
+
+
+def test_reader_backends_parse_identically(test_input_dir: Path):
+    """Test that the calamine reader gives the same sheets as openpyxl."""
+    pytest.importorskip("python_calamine")
+    workbook_path = test_input_dir / "multi_metadata.xlsx"
+    openpyxl_snapshot = WorkbookSnapshot.from_excel(workbook_path, "openpyxl")
+    calamine_snapshot = WorkbookSnapshot.from_excel(workbook_path, "calamine")
+
+    assert calamine_snapshot.sheet_names == openpyxl_snapshot.sheet_names
+    for sheet_name in openpyxl_snapshot.sheet_names:
+        for options in [{}, {"header": None}, {"dtype": str}]:
+            pd.testing.assert_frame_equal(
+                calamine_snapshot.parse(sheet_name, **options), openpyxl_snapshot.parse(sheet_name, **options)
+            )
+
+
+def test_resolve_reader(monkeypatch):
+    monkeypatch.delenv("METADATA_AUTOMATION_EXCEL_READER", raising=False)
+    assert resolve_reader() == "openpyxl"
+    monkeypatch.setenv("METADATA_AUTOMATION_EXCEL_READER", "openpyxl")
+    assert resolve_reader() == "openpyxl"
+    with pytest.raises(ValueError, match="Unknown Excel reader 'xlrd'"):
+        resolve_reader("xlrd")
+
+
+def test_source_directory_round_trip(tmp_path: Path):
+    """Test that a workbook exported to a source directory and imported again keeps its cells."""
+    workbook_path = tmp_path / "metadata.xlsx"
+    with pd.ExcelWriter(workbook_path) as writer:
+        pd.DataFrame({"prefix": ["ex"], "namespace": ["http://example.org/"]}).to_excel(
+            writer, sheet_name="prefixes", index=False
+        )
+        pd.DataFrame({"sheet_name": ["Zeta", "Alpha"], "SeMPyRO_add_rdf_model": [True, None]}).to_excel(
+            writer, sheet_name="classes", index=False
+        )
+        for sheet_name in ["Alpha", "Zeta", "Notes"]:
+            pd.DataFrame({"Cardinality": [1, "0..n"], "weight": [0.5, None], "label": ['a, "b"', "c\td"]}).to_excel(
+                writer, sheet_name=sheet_name, index=False
+            )
+
+    for source_format in ["csv", "tsv"]:
+        source_dir = tmp_path / source_format
+        paths = export_source(workbook_path, source_dir, source_format)
+        assert sorted(path.name for path in paths) == sorted(
+            f"{sheet_name}.{source_format}" for sheet_name in ["prefixes", "classes", "Alpha", "Zeta", "Notes"]
+        )
+
+        snapshot = load_workbook(source_dir)
+        # Sheets are ordered as in a source workbook
+        assert snapshot.sheet_names == ["prefixes", "classes", "Zeta", "Alpha", "Notes"]
+        imported_path = tmp_path / f"{source_format}.xlsx"
+        import_source(source_dir, imported_path)
+        for sheet_name in snapshot.sheet_names:
+            expected = pd.read_excel(workbook_path, sheet_name=sheet_name)
+            pd.testing.assert_frame_equal(snapshot.parse(sheet_name), expected)
+            pd.testing.assert_frame_equal(pd.read_excel(imported_path, sheet_name=sheet_name), expected)
+
+    with pytest.raises(ValueError, match="has sheet files in another format"):
+        export_source(workbook_path, tmp_path / "csv", "tsv")
+
+
+def test_load_profile(tmp_path: Path):
+    """Test that a workbook is parsed into typed classes and properties."""
+    workbook_path = tmp_path / "metadata.xlsx"
+    class_sheet = pd.DataFrame(
+        {
+            "Property label": ["title", None, "identifier"],
+            "Property URI": ["dct:title", None, "adms:identifier"],
+            "Cardinality": ["1..n", None, 1],
+            "Range": ["rdfs:Literal", None, "xsd:string "],
+            "SHACL_sh:uniqueLang": [True, None, None],
+            "SeMPyRO_range": ["LiteralField, str", None, "str"],
+        }
+    )
+    with pd.ExcelWriter(workbook_path) as writer:
+        pd.DataFrame(
+            {"prefix": ["hri", "dct"], "namespace": ["http://example.com/", "http://purl.org/dc/terms/"]}
+        ).to_excel(writer, sheet_name="prefixes", index=False)
+        pd.DataFrame(
+            {
+                "sheet_name": ["Dataset"],
+                "class_URI": ["hri:Dataset"],
+                "SeMPyRO_import_classes": ["dcat:Resource, hri:Agent"],
+                "SeMPyRO_add_rdf_model": [True],
+            }
+        ).to_excel(writer, sheet_name="classes", index=False)
+        class_sheet.to_excel(writer, sheet_name="Dataset", index=False)
+
+    profile = load_profile(workbook_path)
+
+    assert profile.prefixes == {"hri": "http://example.com/", "dct": "http://purl.org/dc/terms/"}
+    (model_class,) = profile.classes
+    assert (model_class.prefix, model_class.name) == ("hri", "Dataset")
+    assert model_class.import_classes == ("dcat:Resource", "hri:Agent")
+    assert model_class.add_rdf_model
+    title, identifier = model_class.properties
+    assert title.cardinality == Cardinality(1, None)
+    assert title.cardinality.required and title.cardinality.multivalued
+    assert title.range.is_literal
+    assert title.unique_lang is True
+    assert title.sempyro_range == ("LiteralField", "str")
+    assert identifier.cardinality == Cardinality(1, 1)
+    assert not identifier.cardinality.multivalued
+    assert identifier.range == Range("xsd:string")
+    assert identifier.range.is_datatype and not identifier.range.is_class
+    assert identifier.unique_lang is None
+    assert not hasattr(identifier, "__dict__")
+
+    assert Range("dcat:Dataset (IRI)").is_iri
+    assert Range("hri:Agent").is_class
+    with pytest.raises(ValueError, match="Invalid cardinality 'one'"):
+        Cardinality.parse("one")
+    with pytest.raises(ValueError, match="Sheet 'Dataset', row 3: Property 'theme' has no 'Property URI'"):
+        Property.from_sheet(
+            pd.DataFrame({"Property label": ["title", "theme"], "Property URI": ["dct:title", None]}), "Dataset"
+        )
+    with pytest.raises(ValueError, match="no prefixed 'class_URI'"):
+        Class.from_row({"sheet_name": "Dataset", "class_URI": "Dataset"})
+
+
+def test_class_graph_levels():
+    """Test that classes are ordered in levels of their references, with dangling references and cycles found."""
+
+    def node(shape: str) -> Property:
+        return Property(label=shape, uri="hri:ref", range=Range("hri:Class"), node=shape)
+
+    classes = [
+        Class("Dataset", "hri:Dataset", properties=(node("hri:AgentShape"), node("hri:DatasetShape"))),
+        Class("Agent", "hri:Agent", inherits_from="foaf:Agent", properties=(node("KindShape"),)),
+        Class("Kind", "hri:Kind", import_classes=("hri:Missing",)),
+        Class("Catalog", "hri:Catalog", inherits_from="hri:Dataset"),
+    ]
+    graph = ClassGraph(classes)
+
+    assert [[model_class.uri for model_class in level] for level in graph.levels()] == [
+        ["hri:Kind"],
+        ["hri:Agent"],
+        ["hri:Dataset"],
+        ["hri:Catalog"],
+    ]
+    assert [str(reference) for reference in graph.dangling] == ["hri:Kind -> hri:Missing (SeMPyRO_import_classes)"]
+    assert graph.dependents(["hri:Agent"]) == {"hri:Dataset", "hri:Catalog"}
+
+    fingerprints = {model_class.uri: model_class.uri for model_class in classes}
+    changed = graph.chain_fingerprints({**fingerprints, "hri:Agent": "changed"})
+    unchanged = graph.chain_fingerprints(fingerprints)
+    assert {uri for uri in fingerprints if changed[uri] != unchanged[uri]} == {
+        "hri:Agent",
+        "hri:Dataset",
+        "hri:Catalog",
+    }
+
+    cyclic = ClassGraph([*classes[:2], Class("Kind", "hri:Kind", inherits_from="hri:Dataset")])
+    with pytest.raises(ValueError, match="Classes reference each other in a cycle"):
+        cyclic.levels()
+    with pytest.raises(ValueError, match="defined on sheets 'Agent' and 'Kind'"):
+        ClassGraph([*classes, Class("Kind", "hri:Agent")])
+
+
+def test_class_graph_nested_shape_cycle():
+    """Test that classes whose nested shapes reference each other are scheduled as one unit."""
+    classes = [
+        Class("A", "hri:A", properties=(Property("p", "hri:p", range=Range("hri:B"), node="hri:BShape"),)),
+        Class("B", "hri:B", properties=(Property("p", "hri:p", range=Range("hri:A"), node="hri:AShape"),)),
+        Class("C", "hri:C", inherits_from="hri:A"),
+        Class("D", "hri:D"),
+    ]
+    graph = ClassGraph(classes)
+
+    assert graph.cycles == [("hri:A", "hri:B")]
+    assert [[model_class.uri for model_class in level] for level in graph.levels()] == [
+        ["hri:A", "hri:B", "hri:D"],
+        ["hri:C"],
+    ]
+    assert graph.dependents(["hri:B"]) == {"hri:A", "hri:C"}
+
+    fingerprints = {model_class.uri: model_class.uri for model_class in classes}
+    changed = graph.chain_fingerprints({**fingerprints, "hri:B": "changed"})
+    unchanged = graph.chain_fingerprints(fingerprints)
+    assert {uri for uri in fingerprints if changed[uri] != unchanged[uri]} == {"hri:A", "hri:B", "hri:C"}
+
+    # A cycle that includes inheritance is still an error
+    with pytest.raises(ValueError, match="Classes reference each other in a cycle"):
+        ClassGraph([*classes[:2], Class("C", "hri:C", inherits_from="hri:C")]).levels()
+
+
+def test_linkml_creator_stream_sempyro(tmp_path: Path, test_input_dir: Path):
+    """Test that streamed schemas match the schemas written at once, without keeping them in memory."""
+    workbook_path = test_input_dir / "multi_metadata.xlsx"
+    creator = LinkMLCreator(tmp_path / "batch")
+    creator.load_excel(str(workbook_path))
+    creator.build_sempyro()
+    creator.write_to_file()
+
+    streaming = LinkMLCreator(tmp_path / "stream")
+    streaming.load_excel(str(workbook_path))
+    assert streaming.stream_sempyro() == 2
+    assert streaming.linkml_data == {}
+
+    batch_files = sorted(path.relative_to(tmp_path / "batch") for path in (tmp_path / "batch").rglob("*.yaml"))
+    assert batch_files == sorted(
+        path.relative_to(tmp_path / "stream") for path in (tmp_path / "stream").rglob("*.yaml")
+    )
+    assert Path("sempyro_types.yaml") in batch_files
+    for path in batch_files:
+        assert (tmp_path / "stream" / path).read_bytes() == (tmp_path / "batch" / path).read_bytes()
+
+
+def test_split_shapes():
+    """Test that a combined shapes graph is split into a graph per NodeShape."""
+    from rdflib import SH, Graph, URIRef
+
+    shapes = Graph().parse(
+        data="""
+        @prefix sh: <http://www.w3.org/ns/shacl#> .
+        @prefix owl: <http://www.w3.org/2002/07/owl#> .
+        @prefix hri: <http://example.com/> .
+        @prefix dct: <http://purl.org/dc/terms/> .
+
+        hri:aux-hriShapes a owl:Ontology .
+        hri:DatasetShape a sh:NodeShape ; sh:property hri:DatasetShape\\/dct:title, hri:DatasetShape\\/dct:type .
+        hri:DatasetShape\\/dct:title sh:path dct:title ; sh:minCount 1 .
+        hri:DatasetShape\\/dct:type sh:path dct:type ; sh:in ( hri:a hri:b ) .
+        hri:AgentShape a sh:NodeShape ; sh:property hri:AgentShape\\/dct:title .
+        hri:AgentShape\\/dct:title sh:path dct:title .
+        """,
+        format="turtle",
+    )
+
+    graphs = split_shapes(shapes)
+
+    assert sorted(graphs) == ["Agent", "Dataset"]
+    assert len(graphs["Dataset"]) + len(graphs["Agent"]) == len(shapes) + 1  # the ontology header is in both
+    assert (URIRef("http://example.com/aux-hriShapes"), None, None) in graphs["Agent"]
+    assert set(graphs["Agent"].subjects(SH.path, None)) == {URIRef("http://example.com/AgentShape/dct:title")}
+    assert dict(graphs["Dataset"].namespaces())["hri"] == URIRef("http://example.com/")
+
+
+def test_read_shaclplay(test_expected_dir: Path):
+    """Test that SHACLPlay files are read into the shapes graphs xls2rdf converts them to."""
+    from rdflib import Graph
+    from rdflib.compare import isomorphic
+
+    for workbook in sorted(test_expected_dir.glob("*/SHACL-*.xlsx")):
+        expected = workbook.parent / "hri" / f"hri-{workbook.stem.removeprefix('SHACL-')}.ttl"
+        if expected.exists():
+            assert isomorphic(read_shaclplay(workbook), Graph().parse(expected)), workbook
+
+    assert ColumnSpec.parse('^sh:property(separator=",")') == ColumnSpec("sh:property", True, separator=",")
+    assert ColumnSpec.parse("sh:minCount^^xsd:integer") == ColumnSpec("sh:minCount", datatype="xsd:integer")
+    assert ColumnSpec.parse("# comments") is None
+    sheet = pd.DataFrame([["Shapes URI", "ex:aux"], ["URI", "rdfs:label@en"], ["Section", None], ["ex:A", "A"]])
+    assert nodeshape_uri(sheet) == "ex:A"
+
+
+def test_xls2rdf_command_class_data_sharing(tmp_path: Path, monkeypatch):
+    """Test that xls2rdf runs create a class data sharing archive once and reuse it afterwards."""
+    import subprocess
+
+    jar_path = tmp_path / "xls2rdf.jar"
+    jar_path.write_bytes(b"jar")
+    monkeypatch.setattr(
+        subprocess,
+        "run",
+        lambda *args, **kwargs: subprocess.CompletedProcess(args, 0, "", 'openjdk version "17.0.2" 2022-01-18\n'),
+    )
+    assert java_version() == "17.0.2"
+
+    archive = cds_archive(jar_path, "17.0.2")
+    command = xls2rdf_command(jar_path, "SHACL-a.xlsx", "a.ttl", parse_jvm_options(None), "17.0.2")
+    assert command[:5] == ["java", *DEFAULT_JVM_OPTIONS, f"-XX:ArchiveClassesAtExit={archive}"]
+    assert command[5:] == ["-jar", str(jar_path), "convert", "-i", "SHACL-a.xlsx", "-o", "a.ttl", "-sh", "-np"]
+    archive.write_bytes(b"archive")
+    assert cds_options(jar_path, "17.0.2") == [f"-XX:SharedArchiveFile={archive}"]
+
+    assert cds_options(jar_path, "21.0.1")[0] == "-XX:+AutoCreateSharedArchive"
+    assert cds_options(jar_path, "1.8.0_292") == []
+    assert cds_options(jar_path, None) == []
+    # The archive is keyed on the JAR content
+    jar_path.write_bytes(b"other jar")
+    assert cds_archive(jar_path, "17.0.2") != archive
+    assert parse_jvm_options("-Xmx1g '-Dname=a b'") == ["-Xmx1g", "-Dname=a b"]